@@ -0,0 +1,82 @@
+"""Binary vs JSON canonical form: encode, decode, verify and size.
+
+    python benchmarks/bench_encoding.py --permissions 1 10 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.tokens import (
+    ALG_HMAC_SHA256,
+    ALG_HMAC_SHA256_BINARY,
+    _canonical_json,
+    decode_token,
+    encode_token,
+    issue_token,
+    verify_integrity,
+)
+
+SIGNING_KEY = b"bench-key"
+
+
+def _issue(permission_count: int, alg: str):
+    now = datetime.now(timezone.utc)
+    return issue_token(
+        permissions={("read", f"/home/alice/projects/p{i}/") for i in range(permission_count)},
+        exp=now + timedelta(hours=1),
+        aud="storage.example",
+        caveats=[],
+        holder_key_fingerprint="fp-7f3a",
+        signing_key=SIGNING_KEY,
+        now=now,
+        alg=alg,
+    )
+
+
+def _per_op_us(func, number: int) -> float:
+    return round(min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6, 2)
+
+
+def run(permission_count: int, number: int) -> dict:
+    json_token = _issue(permission_count, ALG_HMAC_SHA256)
+    bin_token = _issue(permission_count, ALG_HMAC_SHA256_BINARY)
+    json_wire = _canonical_json({**json_token.payload(), "signature": json_token.signature})
+    bin_wire = encode_token(bin_token)
+    return {
+        "permissions": permission_count,
+        "bytes": {"json": len(json_wire), "binary": len(bin_wire)},
+        "encode_us": {
+            "json": _per_op_us(lambda: replace(json_token).canonical_bytes(), number),
+            "binary": _per_op_us(lambda: replace(bin_token).signing_input(), number),
+        },
+        "decode_us": {
+            "json": _per_op_us(lambda: json.loads(json_wire), number),
+            "binary": _per_op_us(lambda: decode_token(bin_wire), number),
+        },
+        "verify_cold_us": {
+            "json": _per_op_us(lambda: verify_integrity(replace(json_token), SIGNING_KEY), number),
+            "binary": _per_op_us(lambda: verify_integrity(replace(bin_token), SIGNING_KEY), number),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--permissions", type=int, nargs="+", default=[1, 10, 500])
+    parser.add_argument("--number", type=int, default=500)
+    args = parser.parse_args()
+    json.dump([run(n, args.number) for n in args.permissions], sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Contention benchmark for RevocationList lookups, revocations and purges.
+
+Runs N reader threads doing ``is_revoked`` while one writer revokes and one
+thread purges, and reports aggregate lookup throughput per thread count.
+
+    python benchmarks/bench_revocation.py --threads 8 16 32 --size 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.revocation import RevocationList
+
+
+def run(threads: int, size: int, lookups: int, shards: int) -> dict:
+    now = datetime.now(timezone.utc)
+    revocations = RevocationList(shards=shards)
+    for i in range(size):
+        revocations.revoke(f"revoked-{i}", now, ttl_seconds=1 + i % 600)
+    probes = [f"revoked-{i}" if i % 1000 == 0 else f"live-{i}" for i in range(lookups)]
+    stop = threading.Event()
+    start_gate = threading.Barrier(threads + 1)
+
+    def reader() -> None:
+        start_gate.wait()
+        is_revoked = revocations.is_revoked
+        for token_id in probes:
+            is_revoked(token_id, now)
+
+    def writer() -> None:
+        i = 0
+        while not stop.is_set():
+            revocations.revoke(f"new-{i}", now, ttl_seconds=30)
+            i += 1
+
+    def purger() -> None:
+        offset = 0
+        while not stop.is_set():
+            offset = (offset + 1) % 600
+            revocations.purge(datetime.fromtimestamp(now.timestamp() + offset, timezone.utc))
+
+    background = [threading.Thread(target=writer), threading.Thread(target=purger)]
+    readers = [threading.Thread(target=reader) for _ in range(threads)]
+    for thread in background + readers:
+        thread.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for thread in readers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in background:
+        thread.join()
+    total = threads * lookups
+    return {
+        "threads": threads,
+        "size": size,
+        "shards": shards,
+        "lookups": total,
+        "seconds": round(elapsed, 4),
+        "lookups_per_second": round(total / elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=50_000)
+    parser.add_argument("--shards", type=int, default=16)
+    args = parser.parse_args()
+    results = [run(t, args.size, args.lookups, args.shards) for t in args.threads]
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
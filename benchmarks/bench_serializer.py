@@ -0,0 +1,68 @@
+"""EdDSA JWT batch verification throughput versus process-pool size.
+
+Requires PyJWT and cryptography.
+
+    python benchmarks/bench_serializer.py --tokens 20000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from proxion_core.serialization import TokenSerializer
+from proxion_core.tokens import issue_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    private_key = Ed25519PrivateKey.generate()
+    public_key = private_key.public_key()
+    now = datetime.now(timezone.utc)
+    tokens = [
+        issue_token(
+            permissions={("read", f"/data/{i}/")},
+            exp=now + timedelta(hours=1),
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=b"hmac-key",
+            now=now,
+        )
+        for i in range(args.tokens)
+    ]
+    serializer = TokenSerializer(issuer="bench")
+    jwts = [r.value for r in serializer.sign_batch(tokens, private_key, chunk_size=args.chunk_size)]
+
+    started = time.perf_counter()
+    serializer.verify_batch(jwts, public_key, chunk_size=args.chunk_size)
+    inline = time.perf_counter() - started
+    report = {"tokens": args.tokens, "inline_per_second": round(args.tokens / inline), "pool": []}
+    for workers in sorted(set(args.workers)):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            serializer.verify_batch(jwts[: workers * args.chunk_size], public_key, pool, args.chunk_size)
+            started = time.perf_counter()
+            results = serializer.verify_batch(jwts, public_key, pool, args.chunk_size)
+            elapsed = time.perf_counter() - started
+        assert all(r.ok for r in results)
+        report["pool"].append({"workers": workers, "verifies_per_second": round(args.tokens / elapsed)})
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
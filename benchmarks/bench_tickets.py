@@ -0,0 +1,119 @@
+"""Ticket store memory footprint and redeem throughput under contention.
+
+    python benchmarks/bench_tickets.py --tickets 200000 --threads 1 8 32 --processes 1 4
+
+``--processes`` also measures ``SQLiteTicketStore`` redemption with one
+worker process per store connection, all sharing one database file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.ticket_store import SQLiteTicketStore
+from proxion_core.tickets import MemoryTicketStore
+
+
+def bytes_per_ticket(count: int) -> float:
+    store = MemoryTicketStore()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(count):
+            store.mint(3600)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (current - baseline) / count
+
+
+def redeem_throughput(count: int, threads: int) -> dict:
+    store = MemoryTicketStore()
+    ids = [store.mint(3600).ticket_id for _ in range(count)]
+    now = datetime.now(timezone.utc)
+    chunks = [ids[i::threads] for i in range(threads)]
+    gate = threading.Barrier(threads + 1)
+
+    def worker(chunk) -> None:
+        gate.wait()
+        for ticket_id in chunk:
+            store.redeem(ticket_id, "rp", now)
+
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    for thread in workers:
+        thread.start()
+    gate.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {"threads": threads, "redeemed": count, "redeems_per_second": round(count / elapsed)}
+
+
+def _sqlite_worker(path: str, ticket_ids: list, gate, results) -> None:
+    now = datetime.now(timezone.utc)
+    with SQLiteTicketStore(path) as store:
+        redeem = store.redeem
+        redeem(ticket_ids[0], "rp", now)  # open the connection before timing
+        gate.wait()
+        started = time.perf_counter()
+        for ticket_id in ticket_ids[1:]:
+            redeem(ticket_id, "rp", now)
+        results.put((started, time.perf_counter()))
+
+
+def sqlite_redeem_throughput(count: int, processes: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tickets.db")
+        with SQLiteTicketStore(path) as store:
+            ids = [ticket.ticket_id for ticket in store.mint_many(count, 3600)]
+        ctx = multiprocessing.get_context("spawn")
+        gate = ctx.Barrier(processes)
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=_sqlite_worker, args=(path, ids[i::processes], gate, results))
+            for i in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        spans = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+    elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+    redeemed = count - processes
+    return {
+        "processes": processes,
+        "redeemed": redeemed,
+        "redeems_per_second": round(redeemed / elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--processes", type=int, nargs="*", default=[])
+    args = parser.parse_args()
+    report = {
+        "bytes_per_ticket": round(bytes_per_ticket(args.tickets), 1),
+        "redeem": [redeem_throughput(args.tickets, t) for t in args.threads],
+    }
+    if args.processes:
+        report["sqlite_redeem"] = [sqlite_redeem_throughput(args.tickets, p) for p in args.processes]
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Resident memory of many live tokens, as held by a validator cache.
+
+Builds ``--tokens`` tokens the way ``decode_token`` does, with every string
+freshly allocated. Each token gets one of ``--templates`` grant sets of
+``--permissions`` grants and one of ``--audiences`` audiences. Reports
+traced bytes per token and the process RSS growth.
+
+    python benchmarks/bench_token_memory.py --tokens 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import resource
+import secrets
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.tokens import ALG_HMAC_SHA256_BINARY, Token, resolve_caveats
+
+
+def _rss_bytes() -> int:
+    # Linux reports KiB, macOS bytes.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def build(count: int, templates: int, permissions: int, audiences: int) -> list:
+    exp = datetime.now(timezone.utc) + timedelta(hours=1)
+    nonce = secrets.token_hex(4)
+    tokens = []
+    for i in range(count):
+        template = i % templates
+        tokens.append(
+            Token(
+                token_id=secrets.token_urlsafe(24),
+                # Fresh strings per token, as a decoder produces them.
+                permissions=frozenset(
+                    ("read", f"/tenants/t{template}/projects/p{j}/") for j in range(permissions)
+                ),
+                exp=exp,
+                aud=f"storage-{i % audiences}.example",
+                caveats=resolve_caveats([f"nonce_matches:{nonce}-{template}"]),
+                holder_key_fingerprint=f"fp-{i % 4096:04x}",
+                alg=ALG_HMAC_SHA256_BINARY,
+                signature=secrets.token_urlsafe(32),
+            )
+        )
+    return tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=1_000_000)
+    parser.add_argument("--templates", type=int, default=64)
+    parser.add_argument("--permissions", type=int, default=4)
+    parser.add_argument("--audiences", type=int, default=8)
+    parser.add_argument("--trace", action="store_true", help="also measure with tracemalloc (slow)")
+    args = parser.parse_args()
+
+    gc.collect()
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    tokens = build(args.tokens, args.templates, args.permissions, args.audiences)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    report = {
+        "tokens": len(tokens),
+        "templates": args.templates,
+        "permissions": args.permissions,
+        "build_seconds": round(elapsed, 2),
+        "rss_growth_mib": round((_rss_bytes() - rss_before) / 2**20, 1),
+        "rss_bytes_per_token": round((_rss_bytes() - rss_before) / len(tokens), 1),
+    }
+    del tokens
+    if args.trace:
+        gc.collect()
+        tracemalloc.start()
+        sample = build(min(args.tokens, 100_000), args.templates, args.permissions, args.audiences)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report["traced_bytes_per_token"] = round(current / len(sample), 1)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
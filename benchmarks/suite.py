@@ -0,0 +1,318 @@
+"""Hot-path benchmark suite with JSON output and baseline comparison.
+
+Times ``issue_token``, ``validate_request``, ``derive_token``, chain
+verification, ``RevocationList.is_revoked`` and ticket redemption over a grid
+of permission counts, caveat counts, chain depths, revocation-list sizes and
+thread counts. Standard library only.
+
+    python benchmarks/suite.py --output baseline.json
+    python benchmarks/suite.py --compare baseline.json --threshold 0.15
+
+With ``--compare`` the exit status is 1 when any case's median time per
+operation grew by more than ``--threshold`` (a fraction) over the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.attenuation import attenuate, derive_token
+from proxion_core.chain import verify_chain
+from proxion_core.context import Caveat, RequestContext
+from proxion_core.revocation import RevocationList
+from proxion_core.tickets import MemoryTicketStore
+from proxion_core.tokens import issue_token
+from proxion_core.validator import validate_request
+
+SIGNING_KEY = b"bench-key"
+PROOF = {"holder_key_fingerprint": "fp-7f3a"}
+
+# Runs ``n`` operations and returns elapsed seconds.
+Runner = Callable[[int], float]
+
+
+def _permissions(count: int) -> set:
+    return {("read", f"/home/alice/projects/p{i}/") for i in range(count)}
+
+
+def _caveats(count: int) -> List[Caveat]:
+    return [Caveat(f"tag:{i}", lambda ctx: True) for i in range(count)]
+
+
+def _token(permissions: int, caveats: int, now: datetime):
+    return issue_token(
+        permissions=_permissions(permissions),
+        exp=now + timedelta(hours=1),
+        aud="storage.example",
+        caveats=_caveats(caveats),
+        holder_key_fingerprint="fp-7f3a",
+        signing_key=SIGNING_KEY,
+        now=now,
+    )
+
+
+def _loop(op: Callable[[], object]) -> Runner:
+    def run(n: int) -> float:
+        started = time.perf_counter()
+        for _ in range(n):
+            op()
+        return time.perf_counter() - started
+
+    return run
+
+
+def _threaded(threads: int, make_worker: Callable[[int], Callable[[], None]]) -> Runner:
+    """Split ``n`` operations over ``threads``; ``make_worker(count)`` prepares
+    one thread's share outside the timed region."""
+
+    def run(n: int) -> float:
+        shares = [n // threads + (1 if i < n % threads else 0) for i in range(threads)]
+        workers = [make_worker(share) for share in shares]
+        gate = threading.Barrier(threads + 1)
+
+        def body(work: Callable[[], None]) -> None:
+            gate.wait()
+            work()
+
+        pool = [threading.Thread(target=body, args=(work,)) for work in workers]
+        for thread in pool:
+            thread.start()
+        gate.wait()
+        started = time.perf_counter()
+        for thread in pool:
+            thread.join()
+        return time.perf_counter() - started
+
+    return run
+
+
+def bench_issue_token(permissions: int, caveats: int) -> Runner:
+    now = datetime.now(timezone.utc)
+    perms = _permissions(permissions)
+    cavs = _caveats(caveats)
+    return _loop(
+        lambda: issue_token(
+            permissions=perms,
+            exp=now + timedelta(hours=1),
+            aud="storage.example",
+            caveats=cavs,
+            holder_key_fingerprint="fp-7f3a",
+            signing_key=SIGNING_KEY,
+            now=now,
+        )
+    )
+
+
+def bench_validate_request(permissions: int, caveats: int, threads: int) -> Runner:
+    now = datetime.now(timezone.utc)
+    token = _token(permissions, caveats, now)
+    ctx = RequestContext("read", f"/home/alice/projects/p{permissions - 1}/", "storage.example", now)
+    revocations = RevocationList()
+
+    def worker(count: int) -> Callable[[], None]:
+        def work() -> None:
+            for _ in range(count):
+                validate_request(token, ctx, PROOF, SIGNING_KEY, revocations)
+
+        return work
+
+    return _threaded(threads, worker)
+
+
+def bench_derive_token(permissions: int, caveats: int) -> Runner:
+    now = datetime.now(timezone.utc)
+    parent = _token(permissions, caveats, now)
+    narrower = sorted(parent.permissions)[: max(1, permissions // 2)]
+    extra = _caveats(1)
+    return _loop(lambda: derive_token(parent, narrower, extra, now, SIGNING_KEY))
+
+
+def bench_verify_chain(depth: int) -> Runner:
+    now = datetime.now(timezone.utc)
+    token = _token(4, 0, now)
+    for level in range(depth):
+        token = attenuate(token, token.permissions, [Caveat(f"link:{level}", lambda ctx: True)], now)
+    return _loop(lambda: verify_chain(token, SIGNING_KEY))
+
+
+def bench_is_revoked(revocations: int, threads: int) -> Runner:
+    now = datetime.now(timezone.utc)
+    revocation_list = RevocationList()
+    for i in range(revocations):
+        revocation_list.revoke(f"revoked-{i}", now, ttl_seconds=3600)
+    probes = [f"revoked-{i}" if i % 10 == 0 else f"live-{i}" for i in range(1024)]
+
+    def worker(count: int) -> Callable[[], None]:
+        def work() -> None:
+            is_revoked = revocation_list.is_revoked
+            for i in range(count):
+                is_revoked(probes[i & 1023], now)
+
+        return work
+
+    return _threaded(threads, worker)
+
+
+def bench_redeem_ticket(threads: int) -> Runner:
+    now = datetime.now(timezone.utc)
+    store = MemoryTicketStore()
+
+    def worker(count: int) -> Callable[[], None]:
+        ids = [store.mint(3600, now).ticket_id for _ in range(count)]
+
+        def work() -> None:
+            redeem = store.redeem
+            for ticket_id in ids:
+                redeem(ticket_id, "rp", now)
+
+        return work
+
+    return _threaded(threads, worker)
+
+
+# name -> (factory, parameter names taken from the grid)
+CASES: Dict[str, Tuple[Callable[..., Runner], Tuple[str, ...]]] = {
+    "issue_token": (bench_issue_token, ("permissions", "caveats")),
+    "validate_request": (bench_validate_request, ("permissions", "caveats", "threads")),
+    "derive_token": (bench_derive_token, ("permissions", "caveats")),
+    "verify_chain": (bench_verify_chain, ("depth",)),
+    "is_revoked": (bench_is_revoked, ("revocations", "threads")),
+    "redeem_ticket": (bench_redeem_ticket, ("threads",)),
+}
+
+
+def measure(runner: Runner, repeats: int, min_time: float) -> dict:
+    """Calibrate an operation count taking ``min_time``, then time ``repeats`` runs."""
+    n = 1
+    while True:
+        elapsed = runner(n)
+        if elapsed >= min_time or n >= 1 << 24:
+            break
+        n = max(n * 2, int(n * min_time / max(elapsed, 1e-9) * 1.1))
+    per_op = sorted(runner(n) / n for _ in range(repeats))
+    median = statistics.median(per_op)
+    return {
+        "ops": n,
+        "repeats": repeats,
+        "median_us": round(median * 1e6, 3),
+        "min_us": round(per_op[0] * 1e6, 3),
+        "stdev_us": round(statistics.pstdev(per_op) * 1e6, 3),
+        "ops_per_second": round(1 / median) if median else None,
+    }
+
+
+def case_key(name: str, params: dict) -> str:
+    return name + "".join(f" {key}={params[key]}" for key in sorted(params))
+
+
+def run_suite(
+    grid: Dict[str, Sequence[int]],
+    cases: Iterable[str],
+    repeats: int,
+    min_time: float,
+) -> List[dict]:
+    results = []
+    for name in cases:
+        factory, names = CASES[name]
+        for values in itertools.product(*(grid[param] for param in names)):
+            params = dict(zip(names, values))
+            stats = measure(factory(**params), repeats, min_time)
+            results.append({"case": name, "params": params, "key": case_key(name, params), **stats})
+            print(f"{case_key(name, params):<60} {stats['median_us']:>12.3f} us", file=sys.stderr)
+    return results
+
+
+def compare(results: List[dict], baseline: dict, threshold: float) -> List[dict]:
+    """Median ratio per case shared with ``baseline``; ``regression`` marks
+    cases slower by more than ``threshold``."""
+    previous = {entry["key"]: entry for entry in baseline.get("results", ())}
+    rows = []
+    for entry in results:
+        before = previous.get(entry["key"])
+        if before is None or not before["median_us"]:
+            continue
+        ratio = entry["median_us"] / before["median_us"]
+        rows.append(
+            {
+                "key": entry["key"],
+                "baseline_us": before["median_us"],
+                "current_us": entry["median_us"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--permissions", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--caveats", type=int, nargs="+", default=[0, 4])
+    parser.add_argument("--depth", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--revocations", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON report from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    grid = {
+        "permissions": args.permissions,
+        "caveats": args.caveats,
+        "depth": args.depth,
+        "revocations": args.revocations,
+        "threads": args.threads,
+    }
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeats": args.repeats,
+            "min_time": args.min_time,
+        },
+        "results": run_suite(grid, args.cases, args.repeats, args.min_time),
+    }
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        report["comparison"] = {
+            "baseline": args.compare,
+            "threshold": args.threshold,
+            "cases": compare(report["results"], baseline, args.threshold),
+        }
+        regressions = [row for row in report["comparison"]["cases"] if row["regression"]]
+        for row in regressions:
+            print(f"REGRESSION {row['key']}: {row['ratio']:.2f}x baseline", file=sys.stderr)
+        status = 1 if regressions else 0
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,35 +2,135 @@
 
 __version__ = "0.1.0"
 
-from .attenuation import derive_token
-from .caveats import ip_allowlist, nonce_matches, time_window
+from .async_validator import (
+    AsyncRevocationBackend,
+    ThreadOffload,
+    async_validate_many,
+    async_validate_request,
+)
+from .attenuation import attenuate, derive_token, normalize_caveats
+from .bloom import BloomFilter
+from .cache import CacheStats, VerifiedTokenCache
+from .caveats import (
+    CompiledCaveats,
+    caveat_from_id,
+    cidr_allowlist,
+    compile_caveats,
+    ip_allowlist,
+    nonce_matches,
+    time_window,
+)
+from .chain import ChainedToken, ChainPrefixCache, decode_chain, encode_chain, verify_chain
 from .context import Caveat, RequestContext
 from .errors import AttenuationError, ProxionError, TicketError, TokenError, ValidationError
-from .tickets import mint_ticket, redeem_ticket
-from .tokens import Token, issue_token, token_canonical_bytes, verify_integrity
+from .ipranges import IpRangeSet
+from .metrics import HistogramSnapshot, InMemoryMetrics, MetricsSink
+from .parsing import LazyToken, parse_token
+from .ticket_store import SQLiteTicketStore
+from .tickets import (
+    MemoryTicketStore,
+    TicketBatch,
+    TicketStore,
+    get_ticket_store,
+    mint_ticket,
+    mint_tickets,
+    redeem_ticket,
+    set_ticket_store,
+    stream_tickets,
+    sweep_tickets,
+)
+from .tokens import (
+    ALG_HMAC_SHA256,
+    ALG_HMAC_SHA256_BINARY,
+    ALG_HMAC_SHA256_CHAIN,
+    Token,
+    decode_token,
+    encode_token,
+    issue_token,
+    token_canonical_bytes,
+    upgrade_token,
+    verify_integrity,
+)
 from .revocation import RevocationList
-from .validator import ALLOW, Decision, validate_request
+from .revocation_store import FileRevocationList
+from .validator import (
+    ALLOW,
+    DEFAULT_PIPELINE,
+    LEGACY_PIPELINE,
+    Decision,
+    ValidationEnv,
+    ValidationPipeline,
+    validate_many,
+    validate_request,
+    validate_serialized,
+)
 
 __all__ = [
+    "ALG_HMAC_SHA256",
+    "ALG_HMAC_SHA256_BINARY",
+    "ALG_HMAC_SHA256_CHAIN",
     "ALLOW",
+    "DEFAULT_PIPELINE",
+    "AsyncRevocationBackend",
     "AttenuationError",
+    "BloomFilter",
+    "CacheStats",
     "Caveat",
+    "ChainPrefixCache",
+    "ChainedToken",
+    "CompiledCaveats",
     "Decision",
+    "FileRevocationList",
+    "HistogramSnapshot",
+    "InMemoryMetrics",
+    "LEGACY_PIPELINE",
+    "IpRangeSet",
+    "LazyToken",
+    "MemoryTicketStore",
+    "MetricsSink",
     "ProxionError",
     "RequestContext",
+    "SQLiteTicketStore",
+    "ThreadOffload",
+    "TicketBatch",
     "TicketError",
+    "TicketStore",
     "Token",
     "TokenError",
     "RevocationList",
+    "ValidationEnv",
     "ValidationError",
+    "ValidationPipeline",
+    "VerifiedTokenCache",
+    "async_validate_many",
+    "attenuate",
+    "async_validate_request",
+    "caveat_from_id",
+    "cidr_allowlist",
+    "compile_caveats",
+    "decode_chain",
+    "decode_token",
     "derive_token",
+    "encode_chain",
+    "encode_token",
+    "get_ticket_store",
     "issue_token",
     "ip_allowlist",
     "mint_ticket",
+    "mint_tickets",
     "nonce_matches",
+    "normalize_caveats",
+    "parse_token",
     "redeem_ticket",
+    "set_ticket_store",
+    "stream_tickets",
+    "sweep_tickets",
     "token_canonical_bytes",
     "time_window",
+    "upgrade_token",
+    "validate_many",
     "validate_request",
+    "validate_serialized",
+    "verify_chain",
     "verify_integrity",
 ]
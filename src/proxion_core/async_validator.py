@@ -0,0 +1,228 @@
+"""asyncio validation path with awaitable verifiers and revocation backends."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+import inspect
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .cache import VerifiedTokenCache
+from .chain import ChainedToken
+from .context import RequestContext
+from .metrics import MetricsSink
+from .revocation import RevocationList
+from .tokens import Token
+from .validator import (
+    DEFAULT_PIPELINE,
+    Decision,
+    ValidationEnv,
+    _check_caveats,
+    _default_pop_check,
+    _deny,
+    _record,
+    _run_stages,
+    _verify,
+)
+
+_T = TypeVar("_T")
+
+# Expiry, audience and permission: the stages that need no awaitable work.
+_STRUCTURE_STAGES, _ = DEFAULT_PIPELINE._split("revocation")
+
+AsyncProofVerifier = Callable[[Token, RequestContext, object], Union[bool, Awaitable[bool]]]
+
+
+class AsyncRevocationBackend(Protocol):
+    async def is_revoked(self, token: Union[Token, str], now: Any) -> bool: ...
+
+
+class ThreadOffload:
+    """Runs CPU-heavy validation steps in an executor instead of on the loop.
+
+    With ``executor=None`` the loop's default thread pool is used. HMAC and
+    SHA-256 release the GIL on large inputs, so integrity checks for big
+    tokens overlap with other coroutines.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None) -> None:
+        self._executor = executor
+
+    async def run(self, func: Callable[..., _T], *args: Any) -> _T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+
+async def _maybe_await(value: Union[_T, Awaitable[_T]]) -> _T:
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def _revocation_task(
+    revocation_list: Union[RevocationList, AsyncRevocationBackend], token: Token, ctx: RequestContext
+) -> bool:
+    if isinstance(token, ChainedToken):
+        # A chained token is revoked with its root or any link above it.
+        for revocation_id in token.revocation_ids():
+            if await _maybe_await(revocation_list.is_revoked(revocation_id, ctx.now)):
+                return True
+        return False
+    return bool(await _maybe_await(revocation_list.is_revoked(token, ctx.now)))
+
+
+async def _proof_task(
+    proof_verifier: Optional[AsyncProofVerifier], token: Token, ctx: RequestContext, proof: object
+) -> bool:
+    if proof_verifier is None:
+        return _default_pop_check(token, proof)
+    return bool(await _maybe_await(proof_verifier(token, ctx, proof)))
+
+
+async def _integrity_task(
+    token: Token,
+    signing_key: bytes,
+    ctx: RequestContext,
+    integrity_cache: Optional[VerifiedTokenCache],
+    offload: Optional[ThreadOffload],
+) -> None:
+    if offload is None:
+        _verify(token, signing_key, ctx, integrity_cache)
+    else:
+        await offload.run(_verify, token, signing_key, ctx, integrity_cache)
+
+
+def _cancel(*tasks: Optional["asyncio.Task[Any]"]) -> None:
+    for task in tasks:
+        if task is not None and not task.done():
+            task.cancel()
+
+
+async def async_validate_request(
+    token: Token,
+    ctx: RequestContext,
+    proof: object,
+    signing_key: bytes,
+    revocation_list: Optional[Union[RevocationList, AsyncRevocationBackend]] = None,
+    proof_verifier: Optional[AsyncProofVerifier] = None,
+    integrity_cache: Optional[VerifiedTokenCache] = None,
+    offload: Optional[ThreadOffload] = None,
+    metrics: Optional[MetricsSink] = None,
+) -> Decision:
+    """Async counterpart of ``validate_request`` with the default pipeline.
+
+    Expiry, audience and permission are checked first, before any awaitable
+    work starts. The revocation lookup, integrity check and proof
+    verification then run concurrently, but their outcomes are consumed in
+    pipeline order, so the same inputs always yield the same deny reason.
+    Outstanding work is cancelled as soon as a decision is reached.
+    Stages overlap here, so ``metrics`` receives decisions and token shape
+    but no per-stage timings.
+    """
+    decision = await _async_validate(
+        token, ctx, proof, signing_key, revocation_list, proof_verifier, integrity_cache, offload
+    )
+    if metrics is not None:
+        _record(metrics, token, decision)
+    return decision
+
+
+async def _async_validate(
+    token: Token,
+    ctx: RequestContext,
+    proof: object,
+    signing_key: bytes,
+    revocation_list: Optional[Union[RevocationList, AsyncRevocationBackend]],
+    proof_verifier: Optional[AsyncProofVerifier],
+    integrity_cache: Optional[VerifiedTokenCache],
+    offload: Optional[ThreadOffload],
+) -> Decision:
+    revocation = integrity = pop = None
+    try:
+        denied = _run_stages(_STRUCTURE_STAGES, token, ctx, proof, ValidationEnv(signing_key))
+        if denied is not None:
+            return denied
+        if revocation_list is not None:
+            revocation = asyncio.ensure_future(_revocation_task(revocation_list, token, ctx))
+        integrity = asyncio.ensure_future(
+            _integrity_task(token, signing_key, ctx, integrity_cache, offload)
+        )
+        pop = asyncio.ensure_future(_proof_task(proof_verifier, token, ctx, proof))
+        if revocation is not None:
+            try:
+                revoked = await revocation
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                return _deny("revocation_error")
+            if revoked:
+                if integrity_cache is not None:
+                    integrity_cache.discard(token)
+                return _deny("revoked")
+        await integrity
+        if not await pop:
+            return _deny("invalid_proof")
+        if offload is None:
+            return _check_caveats(token, ctx)
+        return await offload.run(_check_caveats, token, ctx)
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        _ = exc
+        return _deny("error")
+    finally:
+        _cancel(revocation, integrity, pop)
+        # Retrieve exceptions from abandoned tasks so they are not logged as
+        # "never retrieved".
+        for task in (revocation, integrity, pop):
+            if task is not None and task.done() and not task.cancelled():
+                task.exception()
+
+
+async def async_validate_many(
+    requests: Iterable[Tuple[Token, RequestContext, object]],
+    signing_key: bytes,
+    revocation_list: Optional[Union[RevocationList, AsyncRevocationBackend]] = None,
+    proof_verifier: Optional[AsyncProofVerifier] = None,
+    integrity_cache: Optional[VerifiedTokenCache] = None,
+    offload: Optional[ThreadOffload] = None,
+    concurrency: int = 64,
+    metrics: Optional[MetricsSink] = None,
+) -> List[Decision]:
+    """Validate a batch with at most ``concurrency`` requests in flight."""
+    if concurrency <= 0:
+        raise ValueError("concurrency must be positive")
+    items = list(requests)
+    decisions: List[Decision] = []
+    for start in range(0, len(items), concurrency):
+        chunk = items[start:start + concurrency]
+        decisions.extend(
+            await asyncio.gather(
+                *(
+                    async_validate_request(
+                        token,
+                        ctx,
+                        proof,
+                        signing_key,
+                        revocation_list=revocation_list,
+                        proof_verifier=proof_verifier,
+                        integrity_cache=integrity_cache,
+                        offload=offload,
+                        metrics=metrics,
+                    )
+                    for token, ctx, proof in chunk
+                )
+            )
+        )
+    return decisions
@@ -2,14 +2,80 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Iterable, Tuple
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+from .caveats import (
+    CompiledCaveats,
+    _builtin_predicate,
+    _CidrAllowlist,
+    _IpAllowlist,
+    _NonceMatches,
+    _TimeWindow,
+    cidr_allowlist,
+    ip_allowlist,
+    nonce_matches,
+    time_window,
+)
+from .chain import ChainedToken, extend_chain
 from .context import Caveat
 from .errors import AttenuationError
 from .tokens import Token, issue_token
 
 
+def normalize_caveats(
+    caveats: Iterable[Caveat], now: Optional[datetime] = None
+) -> Tuple[Caveat, ...]:
+    """Reduce a caveat list to an equivalent one of bounded size.
+
+    Caveats with the same id are kept once, and built-in caveats of one kind
+    are intersected into a single caveat (a lone caveat of a kind is kept
+    as-is). Custom caveats follow the built-ins in their original order.
+    Raises ``AttenuationError`` if the caveats can never all hold, or if the
+    merged time window closed before ``now``.
+    """
+    unique: List[Caveat] = []
+    seen = set()
+    for caveat in caveats:
+        if caveat.id not in seen:
+            seen.add(caveat.id)
+            unique.append(caveat)
+
+    compiled = CompiledCaveats(unique)
+    if compiled.unsatisfiable:
+        raise AttenuationError("contradictory caveats")
+    if now is not None and compiled.not_after is not None:
+        now_dt = now if now.tzinfo is not None else now.replace(tzinfo=timezone.utc)
+        if compiled.not_after < now_dt.timestamp():
+            raise AttenuationError("caveat time window has already closed")
+
+    by_kind: Dict[type, List[Caveat]] = {}
+    for caveat in unique:
+        predicate = _builtin_predicate(caveat)
+        if predicate is not None:
+            by_kind.setdefault(type(predicate), []).append(caveat)
+
+    def sole(*kinds: type) -> Optional[Caveat]:
+        sources = [c for kind in kinds for c in by_kind.get(kind, ())]
+        return sources[0] if len(sources) == 1 else None
+
+    normalized: List[Caveat] = []
+    if compiled.not_before is not None:
+        normalized.append(
+            sole(_TimeWindow) or time_window(compiled.not_before, compiled.not_after)
+        )
+    if compiled.allowed_ips is not None:
+        normalized.append(
+            sole(_IpAllowlist, _CidrAllowlist) or ip_allowlist(set(compiled.allowed_ips))
+        )
+    if compiled.ip_ranges is not None:
+        normalized.append(sole(_CidrAllowlist) or cidr_allowlist(compiled.ip_ranges.networks()))
+    if compiled.nonce is not None:
+        normalized.append(sole(_NonceMatches) or nonce_matches(compiled.nonce))
+    normalized.extend(compiled.rest)
+    return tuple(normalized)
+
+
 def derive_token(
     parent: Token,
     narrower_perms: Iterable[Tuple[str, str]],
@@ -17,6 +83,8 @@ def derive_token(
     now: datetime,
     signing_key: bytes,
 ) -> Token:
+    if isinstance(parent, ChainedToken):
+        raise AttenuationError("derive_token needs an issuer-signed parent; use attenuate for chained tokens")
     narrower = frozenset(narrower_perms)
     if not narrower:
         raise AttenuationError("derived permissions must be non-empty")
@@ -24,7 +92,10 @@ def derive_token(
         raise AttenuationError("permission widening is not allowed")
     if now >= parent.exp:
         raise AttenuationError("parent token expired")
-    combined_caveats = tuple(parent.caveats) + tuple(extra_caveats)
+    combined_caveats = normalize_caveats(tuple(parent.caveats) + tuple(extra_caveats), now)
+    if combined_caveats == parent.caveats:
+        # Nothing new: share the parent's tuple (and its compiled form's inputs).
+        combined_caveats = parent.caveats
     return issue_token(
         permissions=narrower,
         exp=parent.exp,
@@ -33,4 +104,35 @@ def derive_token(
         holder_key_fingerprint=parent.holder_key_fingerprint,
         signing_key=signing_key,
         now=now,
+        alg=parent.alg,
     )
+
+
+def attenuate(
+    parent: Union[Token, ChainedToken],
+    narrower_perms: Iterable[Tuple[str, str]],
+    extra_caveats: Iterable[Caveat],
+    now: datetime,
+) -> ChainedToken:
+    """Derive a narrower token offline by extending the parent's HMAC chain.
+
+    Unlike ``derive_token`` this needs no issuer key, only the parent token.
+    The same widening, expiry and caveat-contradiction checks apply; extra
+    caveats already on the parent are not repeated.
+    """
+    narrower = frozenset(narrower_perms)
+    if not narrower:
+        raise AttenuationError("derived permissions must be non-empty")
+    if not narrower.issubset(parent.permissions):
+        raise AttenuationError("permission widening is not allowed")
+    if now >= parent.exp:
+        raise AttenuationError("parent token expired")
+    extra = tuple(extra_caveats)
+    normalize_caveats(tuple(parent.caveats) + extra, now)
+    seen = {c.id for c in parent.caveats}
+    added: List[Caveat] = []
+    for caveat in extra:
+        if caveat.id not in seen:
+            seen.add(caveat.id)
+            added.append(caveat)
+    return extend_chain(parent, narrower, tuple(added))
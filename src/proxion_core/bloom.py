@@ -0,0 +1,106 @@
+"""Bloom filter used as a negative pre-filter for revocation lookups."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import struct
+from typing import Iterable
+
+_MAGIC = b"PXBF"
+_VERSION = 1
+_HEADER = struct.Struct(">4sBBIQ")
+
+
+def _hashes(item: str) -> tuple[int, int]:
+    digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Sized from ``capacity`` and the target ``fp_rate``; membership answers are
+    "definitely absent" or "maybe present". Hashing is keyed only by the item,
+    so a serialized filter gives the same answers in any process.
+    """
+
+    __slots__ = ("_bits", "_size", "_hash_count", "_count")
+
+    def __init__(self, capacity: int = 100_000, fp_rate: float = 0.001) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0.0 < fp_rate < 1.0:
+            raise ValueError("fp_rate must be between 0 and 1")
+        size = max(8, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        hash_count = max(1, round(size / capacity * math.log(2)))
+        # Serialized as one byte; an fp_rate below ~2**-255 would need more.
+        if not 1 <= hash_count <= 255:
+            raise ValueError("fp_rate too small: hash_count must be between 1 and 255")
+        self._init(bytearray((size + 7) // 8), size, hash_count, 0)
+
+    def _init(self, bits: bytearray, size: int, hash_count: int, count: int) -> None:
+        self._bits = bits
+        self._size = size
+        self._hash_count = hash_count
+        self._count = count
+
+    @classmethod
+    def from_items(cls, items: Iterable[str], capacity: int, fp_rate: float) -> "BloomFilter":
+        bloom = cls(capacity, fp_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item: str) -> Iterable[int]:
+        h1, h2 = _hashes(item)
+        size = self._size
+        return ((h1 + i * h2) % size for i in range(self._hash_count))
+
+    def add(self, item: str) -> None:
+        bits = self._bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def hash_count(self) -> int:
+        return self._hash_count
+
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate for the items added so far."""
+        if self._count == 0:
+            return 0.0
+        return (1.0 - math.exp(-self._hash_count * self._count / self._size)) ** self._hash_count
+
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(_MAGIC, _VERSION, self._hash_count, self._count, self._size)
+        return header + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        if len(data) < _HEADER.size:
+            raise ValueError("bloom filter data truncated")
+        magic, version, hash_count, count, size = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("unsupported bloom filter encoding")
+        bits = bytearray(data[_HEADER.size:])
+        if len(bits) != (size + 7) // 8 or hash_count == 0:
+            raise ValueError("bloom filter data corrupted")
+        bloom = cls.__new__(cls)
+        bloom._init(bits, size, hash_count, count)
+        return bloom
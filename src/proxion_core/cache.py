@@ -0,0 +1,201 @@
+"""Optional bounded cache of verified token integrity results."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+from .chain import ChainedToken, ChainPrefixCache
+from .tokens import Token, verify_integrity
+
+# Rough fixed cost of one cache slot: OrderedDict node, key tuple and entry object.
+_ENTRY_OVERHEAD = 256
+# Distinct signing keys whose digests are remembered; deployments use a handful.
+_MAX_KEY_IDS = 16
+
+
+def _coerce_datetime(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _key_id(signing_key: bytes) -> bytes:
+    # Cache entries and their keys carry this digest, never the raw key.
+    return hashlib.sha256(signing_key).digest()[:16]
+
+
+def _estimate_size(token: Token, key: Tuple[str, bytes]) -> int:
+    size = _ENTRY_OVERHEAD + sys.getsizeof(key[0]) + sys.getsizeof(key[1])
+    size += sys.getsizeof(token.token_id) + sys.getsizeof(token.aud)
+    size += sys.getsizeof(token.holder_key_fingerprint)
+    size += sys.getsizeof(token.permissions) + sys.getsizeof(token.caveats)
+    for action, resource in token.permissions:
+        size += sys.getsizeof(action) + sys.getsizeof(resource)
+    return size
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+class _CacheEntry:
+    __slots__ = ("token", "expires_at", "size")
+
+    def __init__(self, token: Token, expires_at: float, size: int) -> None:
+        self.token = token
+        self.expires_at = expires_at
+        self.size = size
+
+
+class VerifiedTokenCache:
+    """LRU cache of tokens whose integrity has already been verified.
+
+    Entries are keyed by ``(signature, key identity)`` and only count as a hit
+    when the cached token is equal to the presented one, so a forged payload
+    carrying a copied signature always falls through to a full check. Entries
+    never outlive ``token.exp``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = None,
+        max_ttl_seconds: Optional[float] = None,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if max_ttl_seconds is not None and max_ttl_seconds <= 0:
+            raise ValueError("max_ttl_seconds must be positive")
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._max_ttl = max_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, bytes], _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # MACs of chain prefixes, so chained siblings only pay for their own links.
+        self._chain_prefixes = ChainPrefixCache(max_entries)
+        # signing key -> digest, so a hit does not re-hash the caller's key.
+        # This memo does hold the caller's key objects (at most _MAX_KEY_IDS);
+        # nothing derived from it is exposed through entries or stats.
+        self._key_ids: Dict[bytes, bytes] = {}
+        # key id -> number of entries under it, so ``discard`` can probe
+        # each live key id instead of scanning every entry.
+        self._entry_key_ids: Dict[bytes, int] = {}
+
+    def verify(self, token: Token, signing_key: bytes, now: datetime) -> bool:
+        """Drop-in for ``verify_integrity`` that skips repeated HMAC work."""
+        now_ts = _coerce_datetime(now).timestamp()
+        key = (token.signature, self._key_id(signing_key))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now_ts >= entry.expires_at:
+                    self._remove(key)
+                elif entry.token is token or entry.token == token:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return True
+                # A different token under the same key is left alone: it must
+                # verify on its own, and a failed attempt cannot evict the entry.
+            self._misses += 1
+        if isinstance(token, ChainedToken):
+            token.verify_chain(signing_key, self._chain_prefixes)
+        else:
+            verify_integrity(token, signing_key)
+        expires_at = _coerce_datetime(token.exp).timestamp()
+        if self._max_ttl is not None:
+            expires_at = min(expires_at, now_ts + self._max_ttl)
+        if now_ts < expires_at:
+            self._store(key, _CacheEntry(token, expires_at, _estimate_size(token, key)))
+        return True
+
+    def discard(self, token: Token) -> int:
+        """Drop every cached entry for ``token``, e.g. after it was revoked."""
+        removed = 0
+        with self._lock:
+            for key_id in list(self._entry_key_ids):
+                key = (token.signature, key_id)
+                if key in self._entries:
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def purge(self, now: datetime) -> int:
+        now_ts = _coerce_datetime(now).timestamp()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if now_ts >= e.expires_at]
+            for key in expired:
+                self._remove(key)
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._entry_key_ids.clear()
+            self._bytes = 0
+        self._chain_prefixes.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _key_id(self, signing_key: bytes) -> bytes:
+        if not isinstance(signing_key, bytes):
+            return _key_id(signing_key)
+        key_id = self._key_ids.get(signing_key)
+        if key_id is None:
+            key_id = _key_id(signing_key)
+            if len(self._key_ids) >= _MAX_KEY_IDS:
+                self._key_ids.clear()
+            self._key_ids[signing_key] = key_id
+        return key_id
+
+    def _store(self, key: Tuple[str, bytes], entry: _CacheEntry) -> None:
+        if self._max_bytes is not None and entry.size > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._entry_key_ids[key[1]] = self._entry_key_ids.get(key[1], 0) + 1
+            self._bytes += entry.size
+            while len(self._entries) > self._max_entries or (
+                self._max_bytes is not None and self._bytes > self._max_bytes
+            ):
+                oldest, _ = next(iter(self._entries.items()))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def _remove(self, key: Tuple[str, bytes]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        remaining = self._entry_key_ids[key[1]] - 1
+        if remaining:
+            self._entry_key_ids[key[1]] = remaining
+        else:
+            del self._entry_key_ids[key[1]]
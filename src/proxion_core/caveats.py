@@ -4,9 +4,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable, Optional, Set
+from typing import FrozenSet, Iterable, List, Optional, Set, Tuple
 
 from .context import Caveat, RequestContext
+from .ipranges import IpRangeSet, Network
 
 
 @dataclass(frozen=True)
@@ -33,6 +34,16 @@ class _IpAllowlist(_SafePredicate):
         return ctx.ip in self.allowed
 
 
+@dataclass(frozen=True)
+class _CidrAllowlist(_SafePredicate):
+    ranges: IpRangeSet
+
+    def __call__(self, ctx: RequestContext) -> bool:
+        if ctx is None or ctx.ip is None:
+            return False
+        return self.ranges.contains(ctx.ip)
+
+
 @dataclass(frozen=True)
 class _TimeWindow(_SafePredicate):
     not_before: float
@@ -64,6 +75,19 @@ def ip_allowlist(allowed: Set[str]) -> Caveat:
     return Caveat(id=name, predicate=predicate.safe_eval)
 
 
+def cidr_allowlist(networks: Iterable[Network]) -> Caveat:
+    """Allow requests from any address inside the given CIDR ranges.
+
+    IPv4 and IPv6 networks (or single addresses) may be mixed. The caveat id
+    carries the collapsed ranges in ``IpRangeSet.encode`` form, so a /22 costs
+    a few bytes instead of a thousand addresses.
+    """
+    ranges = IpRangeSet(networks)
+    name = f"cidr_allowlist:{ranges.encode()}"
+    predicate = _CidrAllowlist(name=name, ranges=ranges)
+    return Caveat(id=name, predicate=predicate.safe_eval)
+
+
 def time_window(not_before: float, not_after: float) -> Caveat:
     name = f"time_window:{not_before}:{not_after}"
     predicate = _TimeWindow(name=name, not_before=float(not_before), not_after=float(not_after))
@@ -74,3 +98,146 @@ def nonce_matches(expected: str) -> Caveat:
     name = f"nonce_matches:{expected}"
     predicate = _NonceMatches(name=name, expected=str(expected))
     return Caveat(id=name, predicate=predicate.safe_eval)
+
+
+def caveat_from_id(caveat_id: str) -> Optional[Caveat]:
+    """Rebuild a built-in caveat from its id, or ``None`` if it is not one.
+
+    The returned caveat keeps ``caveat_id`` verbatim so signatures over caveat
+    ids still match.
+    """
+    kind, sep, body = caveat_id.partition(":")
+    if not sep:
+        return None
+    try:
+        if kind == "ip_allowlist":
+            allowed = set(body.split(",")) if body else set()
+            predicate: _SafePredicate = _IpAllowlist(name=caveat_id, allowed=allowed)
+        elif kind == "cidr_allowlist":
+            predicate = _CidrAllowlist(name=caveat_id, ranges=IpRangeSet.decode(body))
+        elif kind == "time_window":
+            not_before, not_after = body.split(":")
+            predicate = _TimeWindow(
+                name=caveat_id, not_before=float(not_before), not_after=float(not_after)
+            )
+        elif kind == "nonce_matches":
+            predicate = _NonceMatches(name=caveat_id, expected=body)
+        else:
+            return None
+    except ValueError:
+        return None
+    return Caveat(id=caveat_id, predicate=predicate.safe_eval)
+
+
+_BUILTIN_PREDICATES = (_IpAllowlist, _CidrAllowlist, _TimeWindow, _NonceMatches)
+
+
+def _builtin_predicate(caveat: Caveat) -> Optional[_SafePredicate]:
+    """Return the built-in predicate behind ``caveat``, if it is an unmodified one."""
+    predicate = caveat.predicate
+    owner = getattr(predicate, "__self__", None)
+    if type(owner) in _BUILTIN_PREDICATES and getattr(predicate, "__func__", None) is _SafePredicate.safe_eval:
+        return owner
+    return None
+
+
+class CompiledCaveats:
+    """A token's built-in caveats folded into one check.
+
+    Time windows are intersected into a single numeric range, IP allowlists
+    into a single set, CIDR allowlists into a single range set (or used to
+    filter the IP set) and nonce constraints into one expected value; an
+    unsatisfiable combination compiles to a check that always fails. Other
+    caveats are kept, in order, in ``rest`` for the caller to evaluate.
+    """
+
+    __slots__ = (
+        "not_before",
+        "not_after",
+        "allowed_ips",
+        "ip_ranges",
+        "nonce",
+        "unsatisfiable",
+        "rest",
+    )
+
+    def __init__(self, caveats: Iterable[Caveat]) -> None:
+        self.not_before: Optional[float] = None
+        self.not_after: Optional[float] = None
+        self.allowed_ips: Optional[FrozenSet[str]] = None
+        self.ip_ranges: Optional[IpRangeSet] = None
+        self.nonce: Optional[str] = None
+        self.unsatisfiable = False
+        rest: List[Caveat] = []
+        for caveat in caveats:
+            predicate = _builtin_predicate(caveat)
+            if isinstance(predicate, _TimeWindow):
+                self._add_window(predicate.not_before, predicate.not_after)
+            elif isinstance(predicate, _IpAllowlist):
+                self._add_ips(predicate.allowed)
+            elif isinstance(predicate, _CidrAllowlist):
+                self._add_ranges(predicate.ranges)
+            elif isinstance(predicate, _NonceMatches):
+                self._add_nonce(predicate.expected)
+            else:
+                rest.append(caveat)
+        self.rest: Tuple[Caveat, ...] = tuple(rest)
+        if self.allowed_ips is not None and self.ip_ranges is not None:
+            # Exact addresses inside every range are all that can still match.
+            self.allowed_ips = frozenset(ip for ip in self.allowed_ips if ip in self.ip_ranges)
+            self.ip_ranges = None
+            if not self.allowed_ips:
+                self.unsatisfiable = True
+
+    def _add_window(self, not_before: float, not_after: float) -> None:
+        if self.not_before is None:
+            self.not_before, self.not_after = not_before, not_after
+        else:
+            self.not_before = max(self.not_before, not_before)
+            self.not_after = min(self.not_after, not_after)
+        if not self.not_before <= self.not_after:
+            self.unsatisfiable = True
+
+    def _add_ips(self, allowed: Iterable[str]) -> None:
+        allowed = frozenset(allowed)
+        self.allowed_ips = allowed if self.allowed_ips is None else self.allowed_ips & allowed
+        if not self.allowed_ips:
+            self.unsatisfiable = True
+
+    def _add_ranges(self, ranges: IpRangeSet) -> None:
+        self.ip_ranges = ranges if self.ip_ranges is None else self.ip_ranges.intersection(ranges)
+        if not self.ip_ranges:
+            self.unsatisfiable = True
+
+    def _add_nonce(self, expected: str) -> None:
+        if self.nonce is None:
+            self.nonce = expected
+        elif self.nonce != expected:
+            self.unsatisfiable = True
+
+    def allows(self, ctx: RequestContext) -> bool:
+        """Evaluate the folded built-ins, cheapest first; errors count as a failure."""
+        if self.unsatisfiable:
+            return False
+        try:
+            if self.nonce is not None and ctx.device_nonce != self.nonce:
+                return False
+            if self.allowed_ips is not None and (ctx.ip is None or ctx.ip not in self.allowed_ips):
+                return False
+            if self.ip_ranges is not None and (ctx.ip is None or not self.ip_ranges.contains(ctx.ip)):
+                return False
+            if self.not_before is not None:
+                now_dt = ctx.now
+                if not isinstance(now_dt, datetime):
+                    return False
+                if now_dt.tzinfo is None:
+                    now_dt = now_dt.replace(tzinfo=timezone.utc)
+                if not self.not_before <= now_dt.timestamp() <= self.not_after:
+                    return False
+        except Exception:
+            return False
+        return True
+
+
+def compile_caveats(caveats: Iterable[Caveat]) -> CompiledCaveats:
+    return CompiledCaveats(caveats)
@@ -0,0 +1,399 @@
+"""Macaroon-style attenuation: derived tokens extend the parent's HMAC chain."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+import hashlib
+import hmac
+import json
+import threading
+from typing import ClassVar, Dict, FrozenSet, List, Optional, Tuple, Union
+
+from .caveats import CompiledCaveats
+from .context import Caveat
+from .encoding import MAGIC, SIGNATURE_SIZE, _write_varint, read_varint
+from .errors import TokenError
+from .permissions import PermissionIndex
+from .tokens import (
+    ALG_HMAC_SHA256,
+    ALG_HMAC_SHA256_BINARY,
+    ALG_HMAC_SHA256_CHAIN,
+    CaveatResolver,
+    Token,
+    _b64url,
+    _b64url_decode,
+    _canonical_json,
+    _token_from_signed,
+    resolve_caveats,
+)
+
+_ROOT_ALGS = (ALG_HMAC_SHA256, ALG_HMAC_SHA256_BINARY)
+
+CHAIN_MAGIC = b"PXC"
+CHAIN_VERSION = 1
+
+
+def _key_id(signing_key: bytes) -> bytes:
+    return hashlib.sha256(signing_key).digest()[:16]
+
+
+def _link_bytes(permissions: FrozenSet[Tuple[str, str]], caveats: Tuple[Caveat, ...]) -> bytes:
+    return _canonical_json(
+        {
+            "permissions": sorted([list(p) for p in permissions]),
+            "caveats": [c.id for c in caveats],
+        }
+    )
+
+
+@dataclass(frozen=True)
+class ChainedToken:
+    """A token attenuated by its holder, without the issuer's key.
+
+    ``signature`` is HMAC-SHA256 keyed by the parent's raw signature over this
+    link's grants and added caveats. The root's id, exp, audience and holder
+    are inherited; grants only narrow and caveats only accumulate. Each link
+    has its own revocation id, derived from its parent's id and its link
+    bytes, so revoking a token revokes everything derived from it but never
+    its parent or siblings.
+    """
+
+    parent: Union[Token, "ChainedToken"]
+    permissions: FrozenSet[Tuple[str, str]]
+    added_caveats: Tuple[Caveat, ...]
+    signature: str
+    _link: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _revocation_id: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _caveats: Optional[Tuple[Caveat, ...]] = field(default=None, init=False, repr=False, compare=False)
+    _permission_index: Optional[PermissionIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _compiled_caveats: Optional[CompiledCaveats] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    alg: ClassVar[str] = ALG_HMAC_SHA256_CHAIN
+
+    @property
+    def root(self) -> Token:
+        node: Union[Token, ChainedToken] = self
+        while isinstance(node, ChainedToken):
+            node = node.parent
+        return node
+
+    @property
+    def token_id(self) -> str:
+        return self.root.token_id
+
+    @property
+    def exp(self) -> datetime:
+        return self.root.exp
+
+    @property
+    def aud(self) -> str:
+        return self.root.aud
+
+    @property
+    def holder_key_fingerprint(self) -> str:
+        return self.root.holder_key_fingerprint
+
+    @property
+    def caveats(self) -> Tuple[Caveat, ...]:
+        cached = self._caveats
+        if cached is None:
+            cached = tuple(self.parent.caveats) + self.added_caveats
+            object.__setattr__(self, "_caveats", cached)
+        return cached
+
+    def links(self) -> List["ChainedToken"]:
+        """Chain links from the one nearest the root down to this token."""
+        links = []
+        node: Union[Token, ChainedToken] = self
+        while isinstance(node, ChainedToken):
+            links.append(node)
+            node = node.parent
+        links.reverse()
+        return links
+
+    def link_bytes(self) -> bytes:
+        cached = self._link
+        if cached is None:
+            cached = _link_bytes(self.permissions, self.added_caveats)
+            object.__setattr__(self, "_link", cached)
+        return cached
+
+    def payload(self) -> dict:
+        payload = self.root.payload()
+        payload["root_alg"] = self.root.alg
+        payload["chain"] = [
+            {
+                "permissions": sorted([list(p) for p in link.permissions]),
+                "caveats": [c.id for c in link.added_caveats],
+            }
+            for link in self.links()
+        ]
+        return payload
+
+    def revocation_id(self) -> str:
+        # Built from content rather than the link MAC: decoded chains carry no
+        # intermediate signatures, yet their ancestors' ids must be derivable.
+        cached = self._revocation_id
+        if cached is None:
+            parent_id = self.parent.revocation_id().encode("ascii")
+            cached = hashlib.sha256(parent_id + self.link_bytes()).hexdigest()
+            object.__setattr__(self, "_revocation_id", cached)
+        return cached
+
+    def revocation_ids(self) -> List[str]:
+        """Revocation ids of the root and every link down to this token."""
+        links = self.links()
+        return [links[0].parent.revocation_id()] + [link.revocation_id() for link in links]
+
+    def permission_index(self) -> PermissionIndex:
+        cached = self._permission_index
+        if cached is None:
+            cached = PermissionIndex(self.permissions)
+            object.__setattr__(self, "_permission_index", cached)
+        return cached
+
+    def compiled_caveats(self) -> CompiledCaveats:
+        cached = self._compiled_caveats
+        if cached is None:
+            cached = CompiledCaveats(self.caveats)
+            object.__setattr__(self, "_compiled_caveats", cached)
+        return cached
+
+    def verify_chain(
+        self, signing_key: bytes, prefixes: Optional["ChainPrefixCache"] = None
+    ) -> bool:
+        return verify_chain(self, signing_key, prefixes)
+
+
+class _PrefixEntry:
+    __slots__ = ("node", "macs")
+
+    def __init__(self, node: Union[Token, ChainedToken]) -> None:
+        self.node = node
+        self.macs: Dict[bytes, bytes] = {}
+
+
+class ChainPrefixCache:
+    """Bounded LRU of chain prefixes the verifier has already seen.
+
+    Keys are the exact bytes of the root and of each link, so a hit always
+    corresponds to identical content. Each entry keeps the decoded node and
+    its chain MAC per signing-key digest; sibling tokens derived from one
+    parent then only pay to decode and MAC their own links.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[bytes, ...], _PrefixEntry]" = OrderedDict()
+
+    def get(self, parts: Tuple[bytes, ...]) -> Optional[_PrefixEntry]:
+        with self._lock:
+            entry = self._entries.get(parts)
+            if entry is not None:
+                self._entries.move_to_end(parts)
+            return entry
+
+    def put(
+        self, parts: Tuple[bytes, ...], node: Union[Token, ChainedToken], key_id: bytes, mac: bytes
+    ) -> None:
+        with self._lock:
+            entry = self._entries.get(parts)
+            if entry is None:
+                entry = self._entries[parts] = _PrefixEntry(node)
+            else:
+                self._entries.move_to_end(parts)
+            entry.macs[key_id] = mac
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def extend_chain(
+    parent: Union[Token, ChainedToken],
+    permissions: FrozenSet[Tuple[str, str]],
+    caveats: Tuple[Caveat, ...],
+) -> ChainedToken:
+    """Append one link keyed by ``parent.signature``; no issuer key needed."""
+    if not isinstance(parent, ChainedToken) and parent.alg not in _ROOT_ALGS:
+        raise TokenError("unsupported alg")
+    link = _link_bytes(permissions, caveats)
+    mac = hmac.new(_b64url_decode(parent.signature), link, hashlib.sha256).digest()
+    token = ChainedToken(
+        parent=parent, permissions=permissions, added_caveats=caveats, signature=_b64url(mac)
+    )
+    object.__setattr__(token, "_link", link)
+    return token
+
+
+def _chain_parts(token: ChainedToken) -> Tuple[List[ChainedToken], List[bytes]]:
+    links = token.links()
+    root = links[0].parent
+    if root.alg not in _ROOT_ALGS:
+        raise TokenError("unsupported alg")
+    return links, [root.signing_input()] + [link.link_bytes() for link in links]
+
+
+def verify_chain(
+    token: ChainedToken, signing_key: bytes, prefixes: Optional[ChainPrefixCache] = None
+) -> bool:
+    """Recompute the chain from the root with the issuer key.
+
+    Every link must narrow its parent's grants. The root's own ``signature``
+    is not consulted, so decoded chains verify without it. Prefixes whose MAC
+    is already in ``prefixes`` were checked when stored and are skipped.
+    Raises ``TokenError`` on mismatch.
+    """
+    links, parts = _chain_parts(token)
+    nodes: List[Union[Token, ChainedToken]] = [links[0].parent, *links]
+    key_id = _key_id(signing_key)
+
+    mac = None
+    start = 0
+    if prefixes is not None:
+        for depth in range(len(parts), 0, -1):
+            entry = prefixes.get(tuple(parts[:depth]))
+            mac = entry.macs.get(key_id) if entry is not None else None
+            if mac is not None:
+                start = depth
+                break
+    if mac is None:
+        mac = hmac.new(signing_key, parts[0], hashlib.sha256).digest()
+        start = 1
+        if prefixes is not None:
+            prefixes.put((parts[0],), nodes[0], key_id, mac)
+    for depth in range(start, len(parts)):
+        link = links[depth - 1]
+        # Whoever holds a parent can compute any link, so narrowing is enforced here.
+        if not link.permissions <= link.parent.permissions:
+            raise TokenError("chain link widens permissions")
+        mac = hmac.new(mac, parts[depth], hashlib.sha256).digest()
+        if prefixes is not None:
+            prefixes.put(tuple(parts[:depth + 1]), link, key_id, mac)
+    if not hmac.compare_digest(mac, _b64url_decode(token.signature)):
+        raise TokenError("signature mismatch")
+    return True
+
+
+def encode_chain(token: ChainedToken) -> bytes:
+    """Transport form: the root's signed bytes, each link's bytes, final MAC.
+
+    Intermediate signatures are never included, since any of them would let
+    the bearer strip later caveats.
+    """
+    _, parts = _chain_parts(token)
+    signature = _b64url_decode(token.signature)
+    if len(signature) != SIGNATURE_SIZE:
+        raise TokenError("malformed signature")
+    out = bytearray(CHAIN_MAGIC)
+    out.append(CHAIN_VERSION)
+    _write_varint(out, len(parts))
+    for part in parts:
+        _write_varint(out, len(part))
+        out += part
+    return bytes(out) + signature
+
+
+def _split_parts(data: bytes) -> Tuple[List[bytes], bytes]:
+    if len(data) <= len(CHAIN_MAGIC) + 1 + SIGNATURE_SIZE or data[:len(CHAIN_MAGIC)] != CHAIN_MAGIC:
+        raise TokenError("malformed chained token")
+    if data[len(CHAIN_MAGIC)] != CHAIN_VERSION:
+        raise TokenError("unsupported chained token version")
+    body = data[:-SIGNATURE_SIZE]
+    count, offset = read_varint(body, len(CHAIN_MAGIC) + 1)
+    if count < 2:
+        raise TokenError("malformed chained token")
+    parts = []
+    for _ in range(count):
+        length, offset = read_varint(body, offset)
+        if offset + length > len(body):
+            raise TokenError("malformed chained token")
+        parts.append(body[offset:offset + length])
+        offset += length
+    if offset != len(body):
+        raise TokenError("malformed chained token")
+    return parts, data[-SIGNATURE_SIZE:]
+
+
+def _decode_root(part: bytes, caveat_resolver: Optional[CaveatResolver]) -> Token:
+    if part.startswith(MAGIC):
+        return _token_from_signed(part, "", caveat_resolver)
+    try:
+        payload = json.loads(part)
+        token = Token(
+            token_id=payload["token_id"],
+            permissions=frozenset(tuple(p) for p in payload["permissions"]),
+            exp=datetime.fromisoformat(payload["exp"]),
+            aud=payload["aud"],
+            caveats=resolve_caveats(payload["caveats"], caveat_resolver),
+            holder_key_fingerprint=payload["holder_key_fingerprint"],
+            alg=ALG_HMAC_SHA256,
+            signature="",
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        raise TokenError("malformed chained token") from exc
+    # The chain MAC covers exactly these bytes.
+    object.__setattr__(token, "_canonical", part)
+    return token
+
+
+def _decode_link(
+    parent: Union[Token, ChainedToken],
+    part: bytes,
+    signature: str,
+    caveat_resolver: Optional[CaveatResolver],
+) -> ChainedToken:
+    try:
+        payload = json.loads(part)
+        link = ChainedToken(
+            parent=parent,
+            permissions=frozenset(tuple(p) for p in payload["permissions"]),
+            added_caveats=resolve_caveats(payload["caveats"], caveat_resolver),
+            signature=signature,
+        )
+    except (KeyError, TypeError, ValueError) as exc:
+        raise TokenError("malformed chained token") from exc
+    object.__setattr__(link, "_link", part)
+    return link
+
+
+def decode_chain(
+    data: Union[bytes, bytearray, memoryview],
+    caveat_resolver: Optional[CaveatResolver] = None,
+    prefixes: Optional[ChainPrefixCache] = None,
+) -> ChainedToken:
+    """Rebuild a chain from ``encode_chain`` output (not yet verified).
+
+    With ``prefixes``, the longest already-seen prefix is reused as-is, so
+    only the new links are parsed; pass the same cache to ``verify_chain``.
+    """
+    parts, raw_signature = _split_parts(bytes(data))
+    node: Optional[Union[Token, ChainedToken]] = None
+    start = 0
+    if prefixes is not None:
+        for depth in range(len(parts) - 1, 0, -1):
+            entry = prefixes.get(tuple(parts[:depth]))
+            if entry is not None:
+                node, start = entry.node, depth
+                break
+    if node is None:
+        node = _decode_root(parts[0], caveat_resolver)
+        start = 1
+    for depth in range(start, len(parts)):
+        signature = _b64url(raw_signature) if depth == len(parts) - 1 else ""
+        node = _decode_link(node, parts[depth], signature, caveat_resolver)
+    return node
@@ -0,0 +1,215 @@
+"""Deterministic, versioned binary canonical form for capability tokens.
+
+Layout of the signed part (version 1); integers marked ``varint`` are unsigned
+LEB128, strings are a varint byte length followed by UTF-8::
+
+    magic   b"PXT"
+    version u8
+    exp     int64, big-endian epoch seconds
+    aud, holder_key_fingerprint, token_id       (strings)
+    table   varint count, then strings in sorted order
+    perms   varint count, then (action index, resource index) varint pairs
+    caveats varint count, then caveat id strings in token order
+
+Actions and resources are interned into the sorted table, so repeated path
+components cost one varint each. The transport form appends the raw 32-byte
+HMAC-SHA256 signature to the signed part.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import struct
+from typing import Iterable, List, Sequence, Tuple, Union
+
+from .errors import TokenError
+
+MAGIC = b"PXT"
+VERSION = 1
+SIGNATURE_SIZE = 32
+
+_EXP = struct.Struct(">q")
+_EXP_OFFSET = len(MAGIC) + 1
+HEADER_SIZE = _EXP_OFFSET + _EXP.size
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class DecodedToken:
+    exp: int
+    aud: str
+    holder_key_fingerprint: str
+    token_id: str
+    permissions: Tuple[Tuple[str, str], ...]
+    caveat_ids: Tuple[str, ...]
+    signed_size: int
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    data = value.encode("utf-8")
+    _write_varint(out, len(data))
+    out += data
+
+
+def read_varint(data: Buffer, offset: int) -> Tuple[int, int]:
+    if offset < len(data) and data[offset] < 0x80:
+        return data[offset], offset + 1
+    result = 0
+    shift = 0
+    while True:
+        if offset >= len(data) or shift > 63:
+            raise TokenError("malformed token")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, offset
+        shift += 7
+
+
+def read_str(data: Buffer, offset: int) -> Tuple[str, int]:
+    length, offset = read_varint(data, offset)
+    end = offset + length
+    if end > len(data):
+        raise TokenError("malformed token")
+    try:
+        return str(data[offset:end], "utf-8"), end
+    except UnicodeDecodeError as exc:
+        raise TokenError("malformed token") from exc
+
+
+def skip_str(data: Buffer, offset: int) -> int:
+    length, offset = read_varint(data, offset)
+    if offset + length > len(data):
+        raise TokenError("malformed token")
+    return offset + length
+
+
+def encode_signed(
+    exp: int,
+    aud: str,
+    holder_key_fingerprint: str,
+    token_id: str,
+    permissions: Iterable[Tuple[str, str]],
+    caveat_ids: Sequence[str],
+) -> bytes:
+    perms = sorted(permissions)
+    table = sorted({s for pair in perms for s in pair})
+    index = {value: i for i, value in enumerate(table)}
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    out += _EXP.pack(exp)
+    _write_str(out, aud)
+    _write_str(out, holder_key_fingerprint)
+    _write_str(out, token_id)
+    _write_varint(out, len(table))
+    for value in table:
+        data = value.encode("utf-8")
+        if len(data) < 0x80:
+            out.append(len(data))
+        else:
+            _write_varint(out, len(data))
+        out += data
+    _write_varint(out, len(perms))
+    if len(table) < 0x80:
+        out += bytes(i for pair in perms for i in (index[pair[0]], index[pair[1]]))
+    else:
+        for action, resource in perms:
+            _write_varint(out, index[action])
+            _write_varint(out, index[resource])
+    _write_varint(out, len(caveat_ids))
+    for caveat_id in caveat_ids:
+        _write_str(out, caveat_id)
+    return bytes(out)
+
+
+def check_header(data: Buffer) -> int:
+    """Validate magic and version; return ``exp`` without decoding further."""
+    if len(data) < HEADER_SIZE or bytes(data[:len(MAGIC)]) != MAGIC:
+        raise TokenError("malformed token")
+    if data[len(MAGIC)] != VERSION:
+        raise TokenError("unsupported token encoding version")
+    return _EXP.unpack_from(data, _EXP_OFFSET)[0]
+
+
+def decode_permissions(data: Buffer, offset: int) -> Tuple[Tuple[Tuple[str, str], ...], int]:
+    # Hot path for large grant sets: inline the single-byte varint case
+    # instead of calling ``read_varint``/``read_str`` per element.
+    size = len(data)
+    count, offset = read_varint(data, offset)
+    table: List[str] = []
+    append = table.append
+    try:
+        for _ in range(count):
+            length = data[offset]
+            if length < 0x80:
+                offset += 1
+            else:
+                length, offset = read_varint(data, offset)
+            end = offset + length
+            if end > size:
+                raise TokenError("malformed token")
+            append(str(data[offset:end], "utf-8"))
+            offset = end
+        count, offset = read_varint(data, offset)
+        perms = []
+        for _ in range(count):
+            action = data[offset]
+            if action < 0x80:
+                offset += 1
+            elif data[offset + 1] < 0x80:
+                action = (action & 0x7F) | (data[offset + 1] << 7)
+                offset += 2
+            else:
+                action, offset = read_varint(data, offset)
+            resource = data[offset]
+            if resource < 0x80:
+                offset += 1
+            elif data[offset + 1] < 0x80:
+                resource = (resource & 0x7F) | (data[offset + 1] << 7)
+                offset += 2
+            else:
+                resource, offset = read_varint(data, offset)
+            perms.append((table[action], table[resource]))
+    except IndexError as exc:
+        raise TokenError("malformed token") from exc
+    except UnicodeDecodeError as exc:
+        raise TokenError("malformed token") from exc
+    return tuple(perms), offset
+
+
+def skip_permissions(data: Buffer, offset: int) -> int:
+    count, offset = read_varint(data, offset)
+    for _ in range(count):
+        offset = skip_str(data, offset)
+    count, offset = read_varint(data, offset)
+    for _ in range(2 * count):
+        _, offset = read_varint(data, offset)
+    return offset
+
+
+def decode_caveat_ids(data: Buffer, offset: int) -> Tuple[Tuple[str, ...], int]:
+    count, offset = read_varint(data, offset)
+    ids = []
+    for _ in range(count):
+        caveat_id, offset = read_str(data, offset)
+        ids.append(caveat_id)
+    return tuple(ids), offset
+
+
+def decode_signed(data: Buffer) -> DecodedToken:
+    exp = check_header(data)
+    aud, offset = read_str(data, HEADER_SIZE)
+    holder, offset = read_str(data, offset)
+    token_id, offset = read_str(data, offset)
+    permissions, offset = decode_permissions(data, offset)
+    caveat_ids, offset = decode_caveat_ids(data, offset)
+    return DecodedToken(exp, aud, holder, token_id, permissions, caveat_ids, offset)
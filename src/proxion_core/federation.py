@@ -3,7 +3,15 @@ import uuid
 import time
 import secrets
 from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable, Sequence, Tuple, Union
+
+# (public_key, signature, message) -> bool
+Verifier = Callable[[str, bytes, bytes], bool]
+# One call for many (public_key, signature, message) triples -> one bool each.
+BatchVerifier = Callable[[Sequence[Tuple[str, bytes, bytes]]], Sequence[bool]]
+
+# Same output as json.dumps(..., sort_keys=True), without a new encoder per call.
+_ENCODER = json.JSONEncoder(sort_keys=True)
 
 @dataclass
 class Capability:
@@ -15,8 +23,62 @@ class Capability:
     def to_dict(self):
         return {"with": self.with_, "can": self.can, "caveats": self.caveats}
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Capability":
+        return cls(with_=data["with"], can=data["can"], caveats=data.get("caveats", {}))
+
+class _Signed:
+    """Signing helpers shared by the federation objects.
+
+    ``canonical_bytes()`` is cached for writers (``sign``, registry
+    snapshots) and reset whenever a field is assigned (other than
+    ``signature``). In-place edits to nested lists or dicts, e.g.
+    ``cert.capabilities.append(...)``, are not seen by the cache; call
+    ``invalidate()`` before re-signing. ``verify`` never uses the cache: it
+    re-encodes the current content, so such edits make it fail.
+    """
+
+    _UNSIGNED_FIELDS = ("signature", "_canonical")
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name not in self._UNSIGNED_FIELDS:
+            object.__setattr__(self, "_canonical", None)
+
+    def invalidate(self) -> None:
+        """Drop the cached canonical bytes after an in-place nested mutation."""
+        object.__setattr__(self, "_canonical", None)
+
+    def _public_key(self) -> str:
+        raise NotImplementedError
+
+    def _encode(self) -> bytes:
+        data = self.to_dict()
+        del data['signature']
+        return _ENCODER.encode(data).encode()
+
+    def canonical_bytes(self) -> bytes:
+        """The signed message: ``to_dict()`` minus ``signature`` as sorted-key JSON."""
+        cached = self._canonical
+        if cached is None:
+            cached = self._encode()
+            object.__setattr__(self, "_canonical", cached)
+        return cached
+
+    def sign(self, identity_key):
+        """Sign with Identity Key (anything with ``.sign(bytes)``)."""
+        if hasattr(identity_key, 'sign'):
+            sig_bytes = identity_key.sign(self.canonical_bytes())
+            self.signature = sig_bytes.hex() if isinstance(sig_bytes, bytes) else str(sig_bytes)
+
+    def verify(self, verifier_func: Verifier) -> bool:
+        """Verify signature using a provided verifier function (pubkey, sig, data)."""
+        if not self.signature: return False
+        return verifier_func(self._public_key(), bytes.fromhex(self.signature), self._encode())
+
+
 @dataclass
-class FederationInvite:
+class FederationInvite(_Signed):
     """A signed invitation to federate."""
     issuer: Dict[str, str] # {public_key, did}
     endpoint_hints: List[str]
@@ -29,6 +91,7 @@ class FederationInvite:
     nonce: str = field(default_factory=lambda: secrets.token_hex(32))
     challenge_marker: str = field(default_factory=lambda: secrets.token_hex(32))
     signature: Optional[str] = None
+    _canonical: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> dict:
         return {
@@ -44,28 +107,11 @@ class FederationInvite:
             "signature": self.signature
         }
 
-    def sign(self, identity_key):
-        """Sign the invite with Identity Key."""
-        data = self.to_dict()
-        if 'signature' in data: del data['signature']
-        
-        canonical = json.dumps(data, sort_keys=True)
-        # Assuming identity_key has .sign() returning hex or bytes
-        # For simplicity in this mock, we use a placeholder if no key provided
-        if hasattr(identity_key, 'sign'):
-            sig_bytes = identity_key.sign(canonical.encode())
-            self.signature = sig_bytes.hex() if isinstance(sig_bytes, bytes) else str(sig_bytes)
-
-    def verify(self, verifier_func) -> bool:
-        """Verify signature using a provided verifier function (pubkey, sig, data)."""
-        if not self.signature: return False
-        data = self.to_dict()
-        del data['signature']
-        canonical = json.dumps(data, sort_keys=True)
-        return verifier_func(self.issuer['public_key'], bytes.fromhex(self.signature), canonical.encode())
+    def _public_key(self) -> str:
+        return self.issuer['public_key']
 
 @dataclass
-class InviteAcceptance:
+class InviteAcceptance(_Signed):
     """Response to an invite, proving possession."""
     invitation_id: str
     responder: Dict[str, Any] # {public_key, endpoint_hints}
@@ -73,6 +119,7 @@ class InviteAcceptance:
     
     timestamp: int = field(default_factory=lambda: int(time.time()))
     signature: Optional[str] = None
+    _canonical: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> dict:
         return {
@@ -83,16 +130,11 @@ class InviteAcceptance:
             "signature": self.signature
         }
 
-    def sign(self, identity_key):
-        data = self.to_dict()
-        if 'signature' in data: del data['signature']
-        canonical = json.dumps(data, sort_keys=True)
-        if hasattr(identity_key, 'sign'):
-             sig_bytes = identity_key.sign(canonical.encode())
-             self.signature = sig_bytes.hex() if isinstance(sig_bytes, bytes) else str(sig_bytes)
+    def _public_key(self) -> str:
+        return self.responder['public_key']
 
 @dataclass
-class RelationshipCertificate:
+class RelationshipCertificate(_Signed):
     """The mutual capability token."""
     issuer: str # pubkey
     subject: str # pubkey
@@ -104,6 +146,7 @@ class RelationshipCertificate:
     created_at: int = field(default_factory=lambda: int(time.time()))
     expires_at: int = field(default_factory=lambda: int(time.time()) + (90 * 86400)) # 90 days
     signature: Optional[str] = None
+    _canonical: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> dict:
         return {
@@ -118,10 +161,87 @@ class RelationshipCertificate:
             "signature": self.signature
         }
 
-    def sign(self, identity_key):
-        data = self.to_dict()
-        if 'signature' in data: del data['signature']
-        canonical = json.dumps(data, sort_keys=True)
-        if hasattr(identity_key, 'sign'):
-             sig_bytes = identity_key.sign(canonical.encode())
-             self.signature = sig_bytes.hex() if isinstance(sig_bytes, bytes) else str(sig_bytes)
+    @classmethod
+    def from_dict(cls, data: dict) -> "RelationshipCertificate":
+        """Inverse of ``to_dict``; the signature is kept, not checked."""
+        return cls(
+            issuer=data["issuer"],
+            subject=data["subject"],
+            capabilities=[Capability.from_dict(c) for c in data["capabilities"]],
+            wireguard=data["wireguard"],
+            version=data["version"],
+            certificate_id=data["certificate_id"],
+            created_at=data["created_at"],
+            expires_at=data["expires_at"],
+            signature=data.get("signature"),
+        )
+
+    def _public_key(self) -> str:
+        return self.issuer
+
+@dataclass(frozen=True)
+class VerificationResult:
+    valid: bool
+    reason: Optional[str] = None
+
+VALID = VerificationResult(True)
+
+def verify_many(
+    items: Sequence[Union[FederationInvite, InviteAcceptance, RelationshipCertificate]],
+    verifier: Optional[Verifier] = None,
+    batch_verifier: Optional[BatchVerifier] = None,
+    now: Optional[int] = None,
+) -> List[VerificationResult]:
+    """Check many signed objects; one ``VerificationResult`` per item, in order.
+
+    Items past ``expires_at`` (invites and certificates) or without a usable
+    signature are rejected before any signature work. The rest go to
+    ``batch_verifier`` in a single call if given, else to ``verifier`` one
+    by one; like ``verify``, each is checked against a fresh encoding of its
+    current content, never the cached ``canonical_bytes()``. A verifier that
+    raises, or a batch verifier that returns the wrong number of results,
+    yields ``"error"`` rather than an exception.
+    """
+    if (verifier is None) == (batch_verifier is None):
+        raise ValueError("pass exactly one of verifier or batch_verifier")
+    now_ts = int(time.time()) if now is None else now
+    results: List[Optional[VerificationResult]] = [None] * len(items)
+    pending: List[int] = []
+    requests: List[Tuple[str, bytes, bytes]] = []
+    for index, item in enumerate(items):
+        expires_at = getattr(item, 'expires_at', None)
+        if expires_at is not None and now_ts >= expires_at:
+            results[index] = VerificationResult(False, "expired")
+            continue
+        if not item.signature:
+            results[index] = VerificationResult(False, "unsigned")
+            continue
+        try:
+            request = (item._public_key(), bytes.fromhex(item.signature), item._encode())
+        except (KeyError, TypeError, ValueError):
+            results[index] = VerificationResult(False, "malformed")
+            continue
+        pending.append(index)
+        requests.append(request)
+
+    if batch_verifier is not None:
+        try:
+            outcomes = list(batch_verifier(requests)) if requests else []
+            if len(outcomes) != len(requests):
+                outcomes = [None] * len(requests)
+        except Exception:
+            outcomes = [None] * len(requests)
+    else:
+        outcomes = []
+        for request in requests:
+            try:
+                outcomes.append(verifier(*request))
+            except Exception:
+                outcomes.append(None)
+
+    for index, outcome in zip(pending, outcomes):
+        if outcome is None:
+            results[index] = VerificationResult(False, "error")
+        else:
+            results[index] = VALID if outcome else VerificationResult(False, "bad_signature")
+    return results
@@ -0,0 +1,220 @@
+"""Compiled matching of federation ``Capability`` resources and actions.
+
+A capability ``with_`` URI is split into scheme, authority and path
+segments (a trailing slash does not matter) and stored in a trie. A
+capability covers its own resource and everything below it. URIs are
+rejected if a segment is ``.`` or ``..`` (plain or percent-encoded),
+holds a ``\\`` or an encoded ``/`` or ``\\``, or is empty inside the
+path: a server decoding or normalizing them would act on a different
+resource than the one matched. A ``*`` component matches any single
+scheme, authority or path segment. Actions match exactly, ``ns/*``
+matches every action under ``ns/`` (``crud/*`` covers ``crud/read``),
+and ``*`` matches any action. Both wildcard forms can be turned off with
+``patterns=False``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .federation import Capability
+
+WILDCARD = "*"
+
+_SELF = object()
+
+# (capability, value returned by queries)
+_Entry = Tuple[Capability, Any]
+
+
+def _is_unsafe_segment(segment: str) -> bool:
+    if "\\" in segment:
+        return True
+    if "%" in segment:
+        segment = segment.lower()
+        if "%2f" in segment or "%5c" in segment:
+            return True
+        segment = segment.replace("%2e", ".")
+    return segment == "." or segment == ".."
+
+
+def _components(uri: str) -> List[str]:
+    """Scheme, authority and path segments of ``uri``.
+
+    Raises ``ValueError`` for dot segments, for segments holding a
+    backslash or an encoded separator, and for empty path segments other
+    than a trailing slash.
+    """
+    scheme, sep, rest = uri.partition("://")
+    if not sep:
+        scheme, rest = "", uri
+    authority, _, path = rest.partition("/")
+    segments = path.split("/")
+    if not segments[-1]:
+        segments.pop()
+    if _is_unsafe_segment(authority):
+        raise ValueError(f"unsafe resource: {uri!r}")
+    for segment in segments:
+        if not segment or _is_unsafe_segment(segment):
+            raise ValueError(f"unsafe resource: {uri!r}")
+    return [scheme, authority, *segments]
+
+
+def _action_keys(action: str) -> List[str]:
+    """Capability ``can`` patterns that cover ``action``:
+    ``a/b/c`` -> ``["a/b/c", "a/*", "a/b/*", "*"]``."""
+    keys = [action]
+    pos = action.find("/")
+    while pos >= 0:
+        keys.append(action[:pos + 1] + WILDCARD)
+        pos = action.find("/", pos + 1)
+    keys.append(WILDCARD)
+    return list(dict.fromkeys(keys))
+
+
+class _Node:
+    __slots__ = ("children", "wildcard", "actions")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.wildcard: Optional[_Node] = None
+        # ``can`` pattern -> entries
+        self.actions: Dict[str, List[_Entry]] = {}
+
+    def is_empty(self) -> bool:
+        return not (self.children or self.wildcard or self.actions)
+
+
+class CapabilityMatcher:
+    """Trie of capabilities answering "who covers this action on this URI".
+
+    Each query walks the URI once, following the literal child and the
+    ``*`` child at every component, so its cost depends on the URI's depth
+    rather than on the number of capabilities. ``add`` takes an optional
+    ``value`` (for instance a certificate id) that queries return in place
+    of the capability. With ``patterns=False``, ``*`` is an ordinary
+    segment and actions only match exactly; resources still cover
+    everything below them.
+    """
+
+    def __init__(self, capabilities: Iterable[Capability] = (), patterns: bool = True) -> None:
+        self._root = _Node()
+        self._size = 0
+        self._patterns = patterns
+        for capability in capabilities:
+            self.add(capability)
+
+    def add(self, capability: Capability, value: Any = _SELF) -> None:
+        """Raises ``ValueError`` if ``capability.with_`` is an unsafe resource."""
+        node = self._root
+        for part in _components(capability.with_):
+            if part == WILDCARD and self._patterns:
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+                node = node.wildcard
+            else:
+                child = node.children.get(part)
+                if child is None:
+                    child = node.children[part] = _Node()
+                node = child
+        entries = node.actions.get(capability.can)
+        if entries is None:
+            entries = node.actions[capability.can] = []
+        entries.append((capability, capability if value is _SELF else value))
+        self._size += 1
+
+    def discard(self, capability: Capability, value: Any = _SELF) -> bool:
+        """Remove one entry added with the same capability and value."""
+        value = capability if value is _SELF else value
+        try:
+            parts = _components(capability.with_)
+        except ValueError:
+            return False
+        # (parent, part, whether the step took the wildcard child)
+        path: List[Tuple[_Node, str, bool]] = []
+        node = self._root
+        for part in parts:
+            wildcard = part == WILDCARD and self._patterns
+            child = node.wildcard if wildcard else node.children.get(part)
+            if child is None:
+                return False
+            path.append((node, part, wildcard))
+            node = child
+        entries = node.actions.get(capability.can, [])
+        for index, (entry_capability, entry_value) in enumerate(entries):
+            if entry_value == value and entry_capability == capability:
+                del entries[index]
+                break
+        else:
+            return False
+        if not entries:
+            del node.actions[capability.can]
+        # Prune now-empty nodes back towards the root.
+        for parent, part, wildcard in reversed(path):
+            if not node.is_empty():
+                break
+            if wildcard:
+                parent.wildcard = None
+            else:
+                del parent.children[part]
+            node = parent
+        self._size -= 1
+        return True
+
+    def __len__(self) -> int:
+        return self._size
+
+    def iter_matching(self, resource: str, action: Optional[str] = None) -> Iterator[Any]:
+        """Values of capabilities covering ``resource`` (and ``action`` if given),
+        shallowest resource first. An unsafe ``resource`` matches nothing."""
+        try:
+            parts = _components(resource)
+        except ValueError:
+            return
+        if action is None:
+            keys = None
+        else:
+            keys = _action_keys(action) if self._patterns else (action,)
+        active = [self._root]
+        for part in parts:
+            following = []
+            for node in active:
+                child = node.children.get(part)
+                if child is not None:
+                    following.append(child)
+                if node.wildcard is not None:
+                    following.append(node.wildcard)
+            if not following:
+                return
+            active = following
+            for node in active:
+                actions = node.actions
+                if not actions:
+                    continue
+                if keys is None:
+                    for entries in actions.values():
+                        for _, value in entries:
+                            yield value
+                    continue
+                for key in keys:
+                    for _, value in actions.get(key, ()):
+                        yield value
+
+    def allows(self, action: str, resource: str) -> bool:
+        return next(self.iter_matching(resource, action), _SELF) is not _SELF
+
+    def matching(self, resource: str, action: Optional[str] = None) -> List[Any]:
+        return list(self.iter_matching(resource, action))
+
+    def matching_many(
+        self, resources: Iterable[str], action: Optional[str] = None
+    ) -> List[List[Any]]:
+        """``matching`` for each resource; repeated resources are walked once."""
+        seen: Dict[str, List[Any]] = {}
+        results = []
+        for resource in resources:
+            found = seen.get(resource)
+            if found is None:
+                found = seen[resource] = self.matching(resource, action)
+            results.append(list(found))
+        return results
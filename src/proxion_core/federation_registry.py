@@ -0,0 +1,216 @@
+"""In-memory index of relationship certificates for peer-capability lookups."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .federation import RelationshipCertificate
+from .federation_matcher import CapabilityMatcher, _components
+
+_SNAPSHOT_HEADER = b"proxion-certificates/1"
+
+class CertificateRegistry:
+    """Relationship certificates indexed by issuer, subject and grant.
+
+    A certificate lets its ``subject`` perform each capability's ``can``
+    action on the ``with_`` resource and everything below it, until
+    ``expires_at``. Actions and path segments match literally unless
+    ``patterns=True``, which applies ``CapabilityMatcher``'s ``*`` segment
+    and ``ns/*`` action wildcards; enable it only for certificates issued
+    under those rules, since it widens what a literal ``*`` grants. Each
+    subject's grants live in one matcher, so ``allows`` walks the requested
+    URI once, independent of how many certificates are held. Expired
+    certificates are ignored by lookups and removed in bulk by
+    ``evict_expired`` through an expiry heap.
+
+    The registry does not check signatures; verify certificates (for example
+    with ``federation.verify_many``) before adding them. Certificates must not
+    be mutated while registered.
+    """
+
+    def __init__(self, patterns: bool = False) -> None:
+        self._patterns = patterns
+        self._lock = threading.Lock()
+        self._certificates: Dict[str, RelationshipCertificate] = {}
+        self._by_issuer: Dict[str, Set[str]] = {}
+        self._by_subject: Dict[str, Set[str]] = {}
+        self._grants: Dict[str, CapabilityMatcher] = {}
+        self._expiry: List[Tuple[int, str]] = []
+
+    # -- mutation -------------------------------------------------------------
+
+    def add(self, certificate: RelationshipCertificate) -> None:
+        """Register ``certificate``, replacing one with the same id.
+
+        Raises ``ValueError`` if a capability's resource has ``.``, ``..`` or
+        empty path segments.
+        """
+        with self._lock:
+            self._add_locked(certificate)
+
+    def add_many(self, certificates: List[RelationshipCertificate]) -> None:
+        with self._lock:
+            for certificate in certificates:
+                self._add_locked(certificate)
+
+    def remove(self, certificate_id: str) -> bool:
+        with self._lock:
+            return self._remove_locked(certificate_id) is not None
+
+    def evict_expired(self, now: Optional[int] = None) -> int:
+        """Remove every certificate whose ``expires_at`` is at or before ``now``."""
+        now_ts = int(time.time()) if now is None else now
+        removed = 0
+        with self._lock:
+            heap = self._expiry
+            while heap and heap[0][0] <= now_ts:
+                expires_at, certificate_id = heapq.heappop(heap)
+                current = self._certificates.get(certificate_id)
+                # Skip heap entries left behind by a replaced or removed certificate.
+                if current is not None and current.expires_at == expires_at:
+                    self._remove_locked(certificate_id)
+                    removed += 1
+        return removed
+
+    # -- lookups --------------------------------------------------------------
+
+    def get(self, certificate_id: str) -> Optional[RelationshipCertificate]:
+        return self._certificates.get(certificate_id)
+
+    def by_issuer(self, issuer: str) -> List[RelationshipCertificate]:
+        with self._lock:
+            return [self._certificates[i] for i in self._by_issuer.get(issuer, ())]
+
+    def by_subject(self, subject: str) -> List[RelationshipCertificate]:
+        with self._lock:
+            return [self._certificates[i] for i in self._by_subject.get(subject, ())]
+
+    def certificates_for(
+        self,
+        subject: str,
+        action: str,
+        resource: str,
+        now: Optional[int] = None,
+        issuer: Optional[str] = None,
+    ) -> List[RelationshipCertificate]:
+        """Unexpired certificates letting ``subject`` do ``action`` on ``resource``."""
+        with self._lock:
+            unique = {c.certificate_id: c for c in self._matching(subject, action, resource, now, issuer)}
+        return list(unique.values())
+
+    def allows(
+        self,
+        subject: str,
+        action: str,
+        resource: str,
+        now: Optional[int] = None,
+        issuer: Optional[str] = None,
+    ) -> bool:
+        with self._lock:
+            return next(self._matching(subject, action, resource, now, issuer), None) is not None
+
+    def __len__(self) -> int:
+        return len(self._certificates)
+
+    def __contains__(self, certificate_id: object) -> bool:
+        return certificate_id in self._certificates
+
+    # -- persistence ----------------------------------------------------------
+
+    def snapshot(self) -> bytes:
+        """Serialize every registered certificate, signatures included.
+
+        Each line is the signature and the certificate's canonical signing
+        bytes, so certificates that were signed or restored in this process
+        are written without re-encoding.
+        """
+        with self._lock:
+            certificates = list(self._certificates.values())
+        lines = [_SNAPSHOT_HEADER]
+        for certificate in certificates:
+            signature = (certificate.signature or "-").encode()
+            lines.append(signature + b" " + certificate.canonical_bytes())
+        return b"\n".join(lines)
+
+    @classmethod
+    def restore(
+        cls, data: bytes, now: Optional[int] = None, patterns: bool = False
+    ) -> "CertificateRegistry":
+        """Rebuild a registry from ``snapshot`` output, dropping certificates
+        already expired at ``now`` (when given)."""
+        lines = data.split(b"\n")
+        if lines[0] != _SNAPSHOT_HEADER:
+            raise ValueError("unsupported certificate snapshot")
+        registry = cls(patterns=patterns)
+        for line in lines[1:]:
+            signature, _, canonical = line.partition(b" ")
+            record = json.loads(canonical)
+            if now is not None and now >= record["expires_at"]:
+                continue
+            record["signature"] = None if signature == b"-" else signature.decode()
+            certificate = RelationshipCertificate.from_dict(record)
+            object.__setattr__(certificate, "_canonical", canonical)
+            registry._add_locked(certificate)
+        return registry
+
+    # -- internals ------------------------------------------------------------
+
+    def _matching(
+        self,
+        subject: str,
+        action: str,
+        resource: str,
+        now: Optional[int],
+        issuer: Optional[str],
+    ) -> Iterator[RelationshipCertificate]:
+        # Caller holds self._lock.
+        matcher = self._grants.get(subject)
+        if matcher is None:
+            return
+        now_ts = int(time.time()) if now is None else now
+        for certificate_id in matcher.iter_matching(resource, action):
+            certificate = self._certificates[certificate_id]
+            if now_ts < certificate.expires_at and (issuer is None or certificate.issuer == issuer):
+                yield certificate
+
+    def _add_locked(self, certificate: RelationshipCertificate) -> None:
+        # Reject unsafe resources before touching any index.
+        for capability in certificate.capabilities:
+            _components(capability.with_)
+        certificate_id = certificate.certificate_id
+        if certificate_id in self._certificates:
+            self._remove_locked(certificate_id)
+        self._certificates[certificate_id] = certificate
+        self._by_issuer.setdefault(certificate.issuer, set()).add(certificate_id)
+        self._by_subject.setdefault(certificate.subject, set()).add(certificate_id)
+        matcher = self._grants.get(certificate.subject)
+        if matcher is None:
+            matcher = self._grants[certificate.subject] = CapabilityMatcher(patterns=self._patterns)
+        for capability in certificate.capabilities:
+            matcher.add(capability, certificate_id)
+        heapq.heappush(self._expiry, (certificate.expires_at, certificate_id))
+
+    def _remove_locked(self, certificate_id: str) -> Optional[RelationshipCertificate]:
+        certificate = self._certificates.pop(certificate_id, None)
+        if certificate is None:
+            return None
+        _discard(self._by_issuer, certificate.issuer, certificate_id)
+        _discard(self._by_subject, certificate.subject, certificate_id)
+        matcher = self._grants[certificate.subject]
+        for capability in certificate.capabilities:
+            matcher.discard(capability, certificate_id)
+        if not len(matcher):
+            del self._grants[certificate.subject]
+        return certificate
+
+
+def _discard(index: Dict, key: object, certificate_id: str) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(certificate_id)
+        if not ids:
+            del index[key]
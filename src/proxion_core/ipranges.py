@@ -0,0 +1,179 @@
+"""Compact sets of IPv4/IPv6 ranges with logarithmic membership tests."""
+
+from __future__ import annotations
+
+import base64
+from bisect import bisect_right
+import ipaddress
+import socket
+import struct
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+Network = Union[str, ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+_COUNT = struct.Struct(">I")
+_WIDTH = {4: 32, 6: 128}
+_NETWORK = {4: ipaddress.IPv4Network, 6: ipaddress.IPv6Network}
+_V4_MAPPED_PREFIX = b"\0" * 10 + b"\xff\xff"
+
+
+def _parse_address(address: Union[str, ipaddress.IPv4Address, ipaddress.IPv6Address]) -> Tuple[int, int]:
+    """Return ``(version, integer)``, folding IPv4-mapped IPv6 onto IPv4."""
+    if isinstance(address, str):
+        # inet_pton is several times faster than ipaddress.ip_address.
+        try:
+            return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+        except OSError:
+            pass
+        try:
+            packed = socket.inet_pton(socket.AF_INET6, address)
+        except OSError:
+            raise ValueError(f"{address!r} is not an IP address") from None
+    else:
+        packed = ipaddress.ip_address(address).packed
+        if len(packed) == 4:
+            return 4, int.from_bytes(packed, "big")
+    if packed[:12] == _V4_MAPPED_PREFIX:
+        return 4, int.from_bytes(packed[12:], "big")
+    return 6, int.from_bytes(packed, "big")
+
+
+def _merge(intervals: List[Tuple[int, int]]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Sort and coalesce overlapping or adjacent ``(first, last)`` intervals."""
+    starts: List[int] = []
+    ends: List[int] = []
+    for first, last in sorted(intervals):
+        if ends and first <= ends[-1] + 1:
+            if last > ends[-1]:
+                ends[-1] = last
+        else:
+            starts.append(first)
+            ends.append(last)
+    return tuple(starts), tuple(ends)
+
+
+def _intersect(
+    a: Tuple[Sequence[int], Sequence[int]], b: Tuple[Sequence[int], Sequence[int]]
+) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    starts: List[int] = []
+    ends: List[int] = []
+    i = j = 0
+    while i < len(a[0]) and j < len(b[0]):
+        first = max(a[0][i], b[0][j])
+        last = min(a[1][i], b[1][j])
+        if first <= last:
+            starts.append(first)
+            ends.append(last)
+        if a[1][i] < b[1][j]:
+            i += 1
+        else:
+            j += 1
+    return tuple(starts), tuple(ends)
+
+
+class IpRangeSet:
+    """Immutable set of address ranges, stored as sorted disjoint intervals.
+
+    Entries may be CIDR networks or single addresses, IPv4 or IPv6. Lookups
+    bisect the interval starts, so membership costs O(log n) regardless of
+    how many ranges were given. IPv4-mapped IPv6 addresses match IPv4
+    ranges.
+    """
+
+    __slots__ = ("_ranges",)
+
+    def __init__(self, networks: Iterable[Network] = ()) -> None:
+        collected: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+        for network in networks:
+            net = ipaddress.ip_network(network, strict=False)
+            collected[net.version].append(
+                (int(net.network_address), int(net.broadcast_address))
+            )
+        self._ranges = {version: _merge(items) for version, items in collected.items()}
+
+    @classmethod
+    def _from_ranges(cls, ranges: dict) -> "IpRangeSet":
+        result = cls.__new__(cls)
+        result._ranges = ranges
+        return result
+
+    def __contains__(self, address: object) -> bool:
+        try:
+            return self.contains(address)
+        except (TypeError, ValueError):
+            return False
+
+    def contains(self, address: Union[str, ipaddress.IPv4Address, ipaddress.IPv6Address]) -> bool:
+        """Membership test; raises ``ValueError`` for an unparseable address."""
+        version, value = _parse_address(address)
+        starts, ends = self._ranges[version]
+        index = bisect_right(starts, value) - 1
+        return index >= 0 and value <= ends[index]
+
+    def intersection(self, other: "IpRangeSet") -> "IpRangeSet":
+        return IpRangeSet._from_ranges(
+            {version: _intersect(self._ranges[version], other._ranges[version]) for version in (4, 6)}
+        )
+
+    def networks(self) -> Iterator[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+        """Minimal CIDR cover of the set, IPv4 first, in ascending order."""
+        for version, address in ((4, ipaddress.IPv4Address), (6, ipaddress.IPv6Address)):
+            starts, ends = self._ranges[version]
+            for first, last in zip(starts, ends):
+                yield from ipaddress.summarize_address_range(address(first), address(last))
+
+    def __len__(self) -> int:
+        """Number of disjoint intervals (not addresses)."""
+        return len(self._ranges[4][0]) + len(self._ranges[6][0])
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IpRangeSet):
+            return NotImplemented
+        return self._ranges == other._ranges
+
+    def __hash__(self) -> int:
+        return hash((self._ranges[4], self._ranges[6]))
+
+    def __repr__(self) -> str:
+        return f"IpRangeSet({[str(n) for n in self.networks()]!r})"
+
+    def encode(self) -> str:
+        """Compact text form: per family a count, then prefix length and the
+        network's significant bytes for each CIDR block, base64url encoded."""
+        out = bytearray()
+        for version in (4, 6):
+            nets = [n for n in self.networks() if n.version == version]
+            out += _COUNT.pack(len(nets))
+            for net in nets:
+                out.append(net.prefixlen)
+                out += net.network_address.packed[:(net.prefixlen + 7) // 8]
+        return base64.urlsafe_b64encode(bytes(out)).rstrip(b"=").decode("ascii")
+
+    @classmethod
+    def decode(cls, text: str) -> "IpRangeSet":
+        """Inverse of ``encode``; raises ``ValueError`` on malformed input."""
+        data = base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+        networks = []
+        offset = 0
+        for version in (4, 6):
+            if offset + _COUNT.size > len(data):
+                raise ValueError("truncated range set")
+            (count,) = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            width = _WIDTH[version] // 8
+            for _ in range(count):
+                if offset >= len(data):
+                    raise ValueError("truncated range set")
+                prefix = data[offset]
+                size = (prefix + 7) // 8
+                if prefix > _WIDTH[version] or offset + 1 + size > len(data):
+                    raise ValueError("malformed range set")
+                packed = data[offset + 1:offset + 1 + size].ljust(width, b"\0")
+                offset += 1 + size
+                networks.append(_NETWORK[version]((packed, prefix), strict=False))
+        if offset != len(data):
+            raise ValueError("trailing bytes in range set")
+        return cls(networks)
@@ -0,0 +1,136 @@
+"""Optional instrumentation hooks for the validator."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+# Stage latency buckets in seconds (1 us .. 100 ms).
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 1e-1,
+)
+# Permission / caveat count buckets.
+SIZE_BUCKETS: Tuple[float, ...] = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 1024)
+
+
+class MetricsSink:
+    """Receives validator events; every hook is a no-op by default.
+
+    Subclass and override the hooks you need. ``validate_request`` and
+    friends call a sink only when one is passed, so the disabled path does
+    no timing at all.
+    """
+
+    def stage(self, name: str, seconds: float) -> None:
+        """Wall time of one pipeline stage (``revocation``, ``integrity``, ...)."""
+
+    def stage_error(self, name: str, exc: BaseException) -> None:
+        """A stage raised; the request was denied with ``"error"``."""
+
+    def decision(self, allowed: bool, reason: Optional[str]) -> None:
+        """Final outcome of one request."""
+
+    def token_shape(self, permissions: int, caveats: int) -> None:
+        """Grant and caveat counts of the token being validated."""
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    bounds: Tuple[float, ...]
+    counts: Tuple[int, ...]  # len(bounds) + 1; the last bucket is overflow
+    count: int
+    total: float
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile ``q`` (``inf`` if overflow)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket in zip(self.bounds, self.counts):
+            seen += bucket
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is a bisect plus two additions."""
+
+    __slots__ = ("bounds", "_counts", "_count", "_total")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._count = 0
+        self._total = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self.bounds, value)] += 1
+        self._count += 1
+        self._total += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(self.bounds, tuple(self._counts), self._count, self._total)
+
+
+class InMemoryMetrics(MetricsSink):
+    """Thread-safe in-process sink: stage histograms, counters, token shapes."""
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = SIZE_BUCKETS,
+    ) -> None:
+        self._latency_buckets = tuple(latency_buckets)
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._errors: Counter = Counter()
+        self._decisions: Counter = Counter()
+        self._permissions = Histogram(size_buckets)
+        self._caveats = Histogram(size_buckets)
+
+    def stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._stages.get(name)
+            if histogram is None:
+                histogram = self._stages[name] = Histogram(self._latency_buckets)
+            histogram.observe(seconds)
+
+    def stage_error(self, name: str, exc: BaseException) -> None:
+        with self._lock:
+            self._errors[(name, type(exc).__name__)] += 1
+
+    def decision(self, allowed: bool, reason: Optional[str]) -> None:
+        with self._lock:
+            self._decisions["allow" if allowed else reason or "deny"] += 1
+
+    def token_shape(self, permissions: int, caveats: int) -> None:
+        with self._lock:
+            self._permissions.observe(permissions)
+            self._caveats.observe(caveats)
+
+    def stage_latency(self) -> Dict[str, HistogramSnapshot]:
+        with self._lock:
+            return {name: h.snapshot() for name, h in self._stages.items()}
+
+    def decisions(self) -> Dict[str, int]:
+        """Counts keyed by ``"allow"`` or the deny reason."""
+        with self._lock:
+            return dict(self._decisions)
+
+    def stage_errors(self) -> Dict[Tuple[str, str], int]:
+        """Counts keyed by ``(stage, exception type name)``."""
+        with self._lock:
+            return dict(self._errors)
+
+    def permission_counts(self) -> HistogramSnapshot:
+        with self._lock:
+            return self._permissions.snapshot()
+
+    def caveat_counts(self) -> HistogramSnapshot:
+        with self._lock:
+            return self._caveats.snapshot()
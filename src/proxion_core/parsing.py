@@ -0,0 +1,212 @@
+"""Zero-copy, lazily decoded views over binary-form tokens."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import hashlib
+import hmac
+from typing import FrozenSet, Optional, Tuple, Union
+
+from .caveats import CompiledCaveats
+from .context import Caveat
+from .encoding import (
+    HEADER_SIZE,
+    SIGNATURE_SIZE,
+    check_header,
+    decode_caveat_ids,
+    decode_permissions,
+    read_str,
+    skip_permissions,
+)
+from .errors import TokenError
+from .permissions import PermissionIndex
+from .tokens import (
+    ALG_HMAC_SHA256_BINARY,
+    CaveatResolver,
+    Token,
+    _b64url,
+    _coerce_datetime,
+    resolve_caveats,
+)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _as_view(data: Buffer) -> memoryview:
+    view = memoryview(data)
+    if view.ndim != 1 or view.format != "B":
+        view = view.cast("B")
+    return view
+
+
+class LazyToken:
+    """Read-only view over ``encode_token`` output.
+
+    Only the fixed header is read up front. Strings, grants and caveats are
+    decoded from the underlying buffer the first time they are accessed, and
+    integrity is checked over the raw signed slice. The buffer must not be
+    mutated while the view is in use.
+    """
+
+    __slots__ = (
+        "_view",
+        "_signed_end",
+        "_exp_ts",
+        "_caveat_resolver",
+        "_head",
+        "_permissions",
+        "_permission_index",
+        "_caveats",
+        "_compiled_caveats",
+        "_revocation_id",
+    )
+
+    alg = ALG_HMAC_SHA256_BINARY
+
+    def __init__(self, data: Buffer, caveat_resolver: Optional[CaveatResolver] = None) -> None:
+        view = _as_view(data)
+        if len(view) <= SIGNATURE_SIZE:
+            raise TokenError("malformed token")
+        self._view = view
+        self._signed_end = len(view) - SIGNATURE_SIZE
+        self._exp_ts = check_header(view[:self._signed_end])
+        self._caveat_resolver = caveat_resolver
+        self._head: Optional[Tuple[str, str, str, int]] = None
+        self._permissions: Optional[FrozenSet[Tuple[str, str]]] = None
+        self._permission_index: Optional[PermissionIndex] = None
+        self._caveats: Optional[Tuple[Caveat, ...]] = None
+        self._compiled_caveats: Optional[CompiledCaveats] = None
+        self._revocation_id: Optional[str] = None
+
+    def _signed(self) -> memoryview:
+        return self._view[:self._signed_end]
+
+    def _read_head(self) -> Tuple[str, str, str, int]:
+        head = self._head
+        if head is None:
+            signed = self._signed()
+            aud, offset = read_str(signed, HEADER_SIZE)
+            holder, offset = read_str(signed, offset)
+            token_id, offset = read_str(signed, offset)
+            head = self._head = (aud, holder, token_id, offset)
+        return head
+
+    @property
+    def exp_timestamp(self) -> int:
+        return self._exp_ts
+
+    @property
+    def exp(self) -> datetime:
+        return datetime.fromtimestamp(self._exp_ts, timezone.utc)
+
+    @property
+    def aud(self) -> str:
+        return self._read_head()[0]
+
+    @property
+    def holder_key_fingerprint(self) -> str:
+        return self._read_head()[1]
+
+    @property
+    def token_id(self) -> str:
+        return self._read_head()[2]
+
+    @property
+    def signature(self) -> str:
+        return _b64url(bytes(self._view[self._signed_end:]))
+
+    @property
+    def permissions(self) -> FrozenSet[Tuple[str, str]]:
+        perms = self._permissions
+        if perms is None:
+            decoded, _ = decode_permissions(self._signed(), self._read_head()[3])
+            perms = self._permissions = frozenset(decoded)
+        return perms
+
+    @property
+    def caveats(self) -> Tuple[Caveat, ...]:
+        caveats = self._caveats
+        if caveats is None:
+            signed = self._signed()
+            offset = skip_permissions(signed, self._read_head()[3])
+            caveat_ids, offset = decode_caveat_ids(signed, offset)
+            if offset != len(signed):
+                raise TokenError("malformed token")
+            caveats = self._caveats = resolve_caveats(caveat_ids, self._caveat_resolver)
+        return caveats
+
+    def permission_index(self) -> PermissionIndex:
+        index = self._permission_index
+        if index is None:
+            index = self._permission_index = PermissionIndex(self.permissions)
+        return index
+
+    def compiled_caveats(self) -> CompiledCaveats:
+        compiled = self._compiled_caveats
+        if compiled is None:
+            compiled = self._compiled_caveats = CompiledCaveats(self.caveats)
+        return compiled
+
+    def is_expired(self, now: datetime) -> bool:
+        return _coerce_datetime(now).timestamp() >= self._exp_ts
+
+    def signing_input(self) -> bytes:
+        return bytes(self._signed())
+
+    def revocation_id(self) -> str:
+        cached = self._revocation_id
+        if cached is None:
+            cached = self._revocation_id = hashlib.sha256(self._signed()).hexdigest()
+        return cached
+
+    def verify(self, signing_key: bytes) -> bool:
+        """Check the HMAC over the raw signed bytes; raises ``TokenError``."""
+        digest = hmac.new(signing_key, self._signed(), hashlib.sha256).digest()
+        if not hmac.compare_digest(digest, bytes(self._view[self._signed_end:])):
+            raise TokenError("signature mismatch")
+        return True
+
+    def to_token(self) -> Token:
+        """Materialize a full ``Token``; decodes every remaining field."""
+        caveats = self.caveats
+        token = Token(
+            token_id=self.token_id,
+            permissions=self.permissions,
+            exp=self.exp,
+            aud=self.aud,
+            caveats=caveats,
+            holder_key_fingerprint=self.holder_key_fingerprint,
+            alg=ALG_HMAC_SHA256_BINARY,
+            signature=self.signature,
+        )
+        object.__setattr__(token, "_signing_input", self.signing_input())
+        if self._revocation_id is not None:
+            object.__setattr__(token, "_revocation_id", self._revocation_id)
+        if self._permission_index is not None:
+            object.__setattr__(token, "_permission_index", self._permission_index)
+        if self._compiled_caveats is not None:
+            object.__setattr__(token, "_compiled_caveats", self._compiled_caveats)
+        return token
+
+
+def parse_token(
+    data: Buffer,
+    signing_key: bytes,
+    now: Optional[datetime] = None,
+    aud: Optional[str] = None,
+    caveat_resolver: Optional[CaveatResolver] = None,
+) -> LazyToken:
+    """Parse and verify a binary token without materializing it.
+
+    Checks run cheapest first: header and ``exp`` (when ``now`` is given),
+    then audience (when ``aud`` is given), then the HMAC over the signed
+    slice. Each failure raises ``TokenError`` before grants or caveats are
+    decoded.
+    """
+    token = LazyToken(data, caveat_resolver)
+    if now is not None and token.is_expired(now):
+        raise TokenError("token expired")
+    if aud is not None and token.aud != aud:
+        raise TokenError("audience mismatch")
+    token.verify(signing_key)
+    return token
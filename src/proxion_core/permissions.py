@@ -0,0 +1,109 @@
+"""Compiled permission matching for capability tokens."""
+
+from __future__ import annotations
+
+import sys
+from typing import Dict, FrozenSet, Iterable, Set, Tuple
+import weakref
+
+ROOT_WILDCARD = "/"
+
+
+# Weak values: a pooled grant set is freed with its last token. Keyed by the
+# set's hash; on the rare collision the newcomer is simply not pooled, which
+# costs memory, never correctness.
+_PERMISSION_POOL: "weakref.WeakValueDictionary[int, FrozenSet[Tuple[str, str]]]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def _intern(value: str) -> str:
+    # sys.intern rejects str subclasses; leave those alone.
+    return sys.intern(value) if type(value) is str else value
+
+
+def intern_permissions(permissions: Iterable[Tuple[str, str]]) -> FrozenSet[Tuple[str, str]]:
+    """Return the pooled frozenset equal to ``permissions``.
+
+    Tokens carrying the same grants share one set, and its action and
+    resource strings are interned.
+    """
+    perms = permissions if type(permissions) is frozenset else frozenset(permissions)
+    key = hash(perms)
+    pooled = _PERMISSION_POOL.get(key)
+    if pooled is not None:
+        return pooled if pooled is perms or pooled == perms else perms
+    pooled = frozenset((_intern(action), _intern(resource)) for action, resource in perms)
+    _PERMISSION_POOL[key] = pooled
+    return pooled
+
+
+class _PrefixNode:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _PrefixNode] = {}
+        self.terminal = False
+
+
+class _ActionRule:
+    __slots__ = ("exact", "prefixes", "root")
+
+    def __init__(self) -> None:
+        self.exact: Set[str] = set()
+        self.prefixes = _PrefixNode()
+        self.root = False
+
+    def add(self, resource: str) -> None:
+        if resource == ROOT_WILDCARD:
+            self.root = True
+            return
+        self.exact.add(resource)
+        if resource.endswith("/"):
+            node = self.prefixes
+            for segment in resource[:-1].split("/"):
+                node = node.children.setdefault(segment, _PrefixNode())
+            node.terminal = True
+
+    def allows(self, resource: str) -> bool:
+        if self.root or resource in self.exact:
+            return True
+        node = self.prefixes
+        if not node.children:
+            return False
+        # A "/"-terminated prefix P matches R exactly when R's segments start
+        # with P's segments and R continues past P's trailing slash.
+        segments = resource.split("/")
+        last = len(segments) - 1
+        for depth, segment in enumerate(segments):
+            node = node.children.get(segment)
+            if node is None:
+                return False
+            if node.terminal and depth < last:
+                return True
+        return False
+
+
+class PermissionIndex:
+    """Per-action exact set plus path-segment trie for hierarchical grants.
+
+    Semantics match the linear scan it replaces: a permission grants its exact
+    resource, any resource under a ``/``-terminated prefix, and ``/`` grants
+    everything for that action.
+    """
+
+    __slots__ = ("_rules",)
+
+    def __init__(self, permissions: Iterable[Tuple[str, str]]) -> None:
+        self._rules: Dict[str, _ActionRule] = {}
+        for action, resource in permissions:
+            rule = self._rules.get(action)
+            if rule is None:
+                rule = self._rules[action] = _ActionRule()
+            rule.add(resource)
+
+    def allows(self, action: str, resource: str) -> bool:
+        rule = self._rules.get(action)
+        if rule is None:
+            return False
+        return rule.allows(resource)
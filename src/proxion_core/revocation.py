@@ -4,11 +4,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-import hashlib
+import heapq
 import threading
-from typing import Dict, Optional, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-from .tokens import Token, token_canonical_bytes
+from .bloom import BloomFilter
+from .chain import ChainedToken
+from .tokens import Token
 
 
 def _coerce_datetime(value: datetime) -> datetime:
@@ -17,12 +19,33 @@ def _coerce_datetime(value: datetime) -> datetime:
     return value.astimezone(timezone.utc)
 
 
-def _hash_token_bytes(token_bytes: bytes) -> str:
-    return hashlib.sha256(token_bytes).hexdigest()
+def _derive_revocation_id(token: Union[Token, ChainedToken]) -> str:
+    return token.revocation_id()
 
 
-def _derive_revocation_id(token: Token) -> str:
-    return _hash_token_bytes(token_canonical_bytes(token))
+def _resolve_token(
+    token_or_token_id: Union[Token, ChainedToken, str]
+) -> tuple[str, Optional[datetime]]:
+    if isinstance(token_or_token_id, (Token, ChainedToken)):
+        return _derive_revocation_id(token_or_token_id), token_or_token_id.exp
+    if isinstance(token_or_token_id, str):
+        return token_or_token_id, None
+    raise TypeError("token_or_token_id must be Token or str")
+
+
+def _revoked_until(
+    token_exp: Optional[datetime], now: datetime, ttl_seconds: Optional[int]
+) -> datetime:
+    if ttl_seconds is None:
+        if token_exp is None:
+            raise ValueError("ttl_seconds required when token expiration is unknown")
+        return _coerce_datetime(token_exp)
+    if ttl_seconds <= 0:
+        raise ValueError("ttl_seconds must be positive")
+    revoked_until = _coerce_datetime(now) + timedelta(seconds=ttl_seconds)
+    if token_exp is not None and _coerce_datetime(token_exp) < revoked_until:
+        revoked_until = _coerce_datetime(token_exp)
+    return revoked_until
 
 
 @dataclass(frozen=True)
@@ -30,10 +53,51 @@ class RevocationEntry:
     revoked_until: datetime
 
 
-class RevocationList:
+class _Shard:
+    __slots__ = ("lock", "entries", "expiry")
+
     def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._entries: Dict[str, RevocationEntry] = {}
+        self.lock = threading.Lock()
+        self.entries: Dict[str, RevocationEntry] = {}
+        # Min-heap of (revoked_until timestamp, token_id). Superseded pairs are
+        # skipped lazily by purge().
+        self.expiry: List[Tuple[float, str]] = []
+
+
+class RevocationList:
+    """Lock-striped revocation list.
+
+    Writers lock one stripe chosen by the revocation id; readers never take a
+    lock, since a single dict lookup is atomic and entries are immutable once
+    published. Expired entries are reclaimed only by ``purge``, which pops a
+    per-stripe expiry heap and so costs O(expired * log n).
+
+    With ``prefilter_capacity`` set, a Bloom filter sized for that many ids at
+    ``prefilter_fp_rate`` answers "definitely not revoked" before any stripe
+    is touched. It is rebuilt from live entries when it overflows or when
+    purges leave it mostly stale, and ``export_prefilter`` serializes it for
+    edge resource servers.
+    """
+
+    def __init__(
+        self,
+        shards: int = 16,
+        prefilter_capacity: Optional[int] = None,
+        prefilter_fp_rate: float = 0.001,
+    ) -> None:
+        if shards <= 0:
+            raise ValueError("shards must be positive")
+        self._shards = tuple(_Shard() for _ in range(shards))
+        self._prefilter: Optional[BloomFilter] = None
+        self._prefilter_lock = threading.Lock()
+        self._prefilter_min_capacity = prefilter_capacity or 0
+        self._prefilter_capacity = prefilter_capacity or 0
+        self._prefilter_fp_rate = prefilter_fp_rate
+        if prefilter_capacity is not None:
+            self._prefilter = BloomFilter(prefilter_capacity, prefilter_fp_rate)
+
+    def _shard(self, token_id: str) -> _Shard:
+        return self._shards[hash(token_id) % len(self._shards)]
 
     def revoke(
         self,
@@ -41,51 +105,97 @@ class RevocationList:
         now: datetime,
         ttl_seconds: Optional[int] = None,
     ) -> str:
-        now_dt = _coerce_datetime(now)
         token_id, token_exp = self._resolve_token(token_or_token_id)
-        if ttl_seconds is None:
-            if token_exp is None:
-                raise ValueError("ttl_seconds required when token expiration is unknown")
-            revoked_until = token_exp
-        else:
-            if ttl_seconds <= 0:
-                raise ValueError("ttl_seconds must be positive")
-            revoked_until = now_dt + timedelta(seconds=ttl_seconds)
-            if token_exp is not None and token_exp < revoked_until:
-                revoked_until = token_exp
-        with self._lock:
-            self._entries[token_id] = RevocationEntry(revoked_until=revoked_until)
+        revoked_until = _revoked_until(token_exp, now, ttl_seconds)
+        if self._prefilter is None:
+            self._insert(token_id, revoked_until)
+            return token_id
+        # The filter bit must be visible before the entry, and a concurrent
+        # rebuild must not snapshot entries between the two steps.
+        with self._prefilter_lock:
+            self._prefilter.add(token_id)
+            self._insert(token_id, revoked_until)
+            if len(self._prefilter) > self._prefilter_capacity:
+                self._rebuild_prefilter()
         return token_id
 
+    def _insert(self, token_id: str, revoked_until: datetime) -> None:
+        shard = self._shard(token_id)
+        with shard.lock:
+            shard.entries[token_id] = RevocationEntry(revoked_until=revoked_until)
+            heapq.heappush(shard.expiry, (revoked_until.timestamp(), token_id))
+
     def is_revoked(self, token_or_token_id: Union[Token, str], now: datetime) -> bool:
-        now_dt = _coerce_datetime(now)
         token_id, _ = self._resolve_token(token_or_token_id)
-        with self._lock:
-            entry = self._entries.get(token_id)
-            if entry is None:
-                return False
-            if now_dt >= _coerce_datetime(entry.revoked_until):
-                del self._entries[token_id]
-                return False
-            return True
+        prefilter = self._prefilter
+        if prefilter is not None and token_id not in prefilter:
+            return False
+        entry = self._shard(token_id).entries.get(token_id)
+        if entry is None:
+            return False
+        return _coerce_datetime(now) < entry.revoked_until
+
+    def is_revoked_many(
+        self, queries: Sequence[Tuple[Union[Token, str], datetime]]
+    ) -> List[bool]:
+        """Answer several ``is_revoked`` queries in one pass."""
+        results: List[bool] = []
+        prefilter = self._prefilter
+        for token_or_token_id, now in queries:
+            token_id, _ = self._resolve_token(token_or_token_id)
+            if prefilter is not None and token_id not in prefilter:
+                results.append(False)
+                continue
+            entry = self._shard(token_id).entries.get(token_id)
+            results.append(entry is not None and _coerce_datetime(now) < entry.revoked_until)
+        return results
+
+    def revocation_id(self, token_or_token_id: Union[Token, str]) -> str:
+        return self._resolve_token(token_or_token_id)[0]
 
     def purge(self, now: datetime) -> int:
-        now_dt = _coerce_datetime(now)
+        now_ts = _coerce_datetime(now).timestamp()
         removed = 0
-        with self._lock:
-            expired = [
-                token_id
-                for token_id, entry in self._entries.items()
-                if now_dt >= _coerce_datetime(entry.revoked_until)
-            ]
-            for token_id in expired:
-                del self._entries[token_id]
-                removed += 1
+        for shard in self._shards:
+            with shard.lock:
+                heap = shard.expiry
+                while heap and heap[0][0] <= now_ts:
+                    expires_ts, token_id = heapq.heappop(heap)
+                    entry = shard.entries.get(token_id)
+                    # A re-revocation pushes a fresh pair; only the live one evicts.
+                    if entry is not None and entry.revoked_until.timestamp() == expires_ts:
+                        del shard.entries[token_id]
+                        removed += 1
+        if removed and self._prefilter is not None:
+            with self._prefilter_lock:
+                if len(self._prefilter) > 2 * len(self):
+                    self._rebuild_prefilter()
         return removed
 
+    @property
+    def prefilter(self) -> Optional[BloomFilter]:
+        return self._prefilter
+
+    def export_prefilter(self) -> bytes:
+        """Serialized Bloom filter of revoked ids; see ``BloomFilter.from_bytes``."""
+        if self._prefilter is None:
+            raise ValueError("revocation list has no prefilter")
+        with self._prefilter_lock:
+            return self._prefilter.to_bytes()
+
+    def _rebuild_prefilter(self) -> None:
+        # Caller holds self._prefilter_lock, which also blocks revoke().
+        live: List[str] = []
+        for shard in self._shards:
+            with shard.lock:
+                live.extend(shard.entries)
+        self._prefilter_capacity = max(self._prefilter_min_capacity, 2 * len(live))
+        self._prefilter = BloomFilter.from_items(
+            live, self._prefilter_capacity, self._prefilter_fp_rate
+        )
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
     def _resolve_token(self, token_or_token_id: Union[Token, str]) -> tuple[str, Optional[datetime]]:
-        if isinstance(token_or_token_id, Token):
-            return _derive_revocation_id(token_or_token_id), token_or_token_id.exp
-        if isinstance(token_or_token_id, str):
-            return token_or_token_id, None
-        raise TypeError("token_or_token_id must be Token or str")
+        return _resolve_token(token_or_token_id)
@@ -0,0 +1,375 @@
+"""File-backed revocation list shared by processes on one host.
+
+Layout for a store at ``path``:
+
+* ``path.snap`` -- open-addressing hash table, memory-mapped read-only by every
+  process. Slots are a 32-byte key plus a big-endian float64 ``revoked_until``
+  epoch; an all-zero key marks an empty slot.
+* ``path.log`` -- append-only records in the same 40-byte format, holding
+  revocations made since the snapshot of the same generation was written.
+* ``path.lock`` -- ``flock`` target serializing appends and compaction.
+
+Lookups probe the mapped snapshot and an in-process overlay of the log tail
+without taking any lock; opening a store maps the snapshot instead of
+replaying history. ``purge`` compacts the log into a new snapshot generation.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import weakref
+
+from .revocation import _coerce_datetime, _resolve_token, _revoked_until
+from .tokens import Token
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to in-process locking
+    fcntl = None  # type: ignore[assignment]
+
+_SNAP_HEADER = struct.Struct(">4sHHQQQ")  # magic, version, reserved, generation, capacity, count
+_LOG_HEADER = struct.Struct(">4sHHQ")  # magic, version, reserved, generation
+_RECORD = struct.Struct(">32sd")
+_SNAP_MAGIC = b"PXRS"
+_LOG_MAGIC = b"PXRL"
+_VERSION = 1
+_EMPTY_KEY = bytes(32)
+_MIN_CAPACITY = 16
+
+
+def _key(token_id: str) -> bytes:
+    # Token-derived revocation ids are hex SHA-256; other ids are hashed.
+    if len(token_id) == 64:
+        try:
+            return bytes.fromhex(token_id)
+        except ValueError:
+            pass
+    return hashlib.sha256(token_id.encode("utf-8")).digest()
+
+
+def _capacity_for(count: int) -> int:
+    capacity = _MIN_CAPACITY
+    while capacity < count * 2:
+        capacity *= 2
+    return capacity
+
+
+def _build_table(entries: Dict[bytes, float], generation: int) -> bytes:
+    capacity = _capacity_for(len(entries))
+    mask = capacity - 1
+    table = bytearray(_SNAP_HEADER.size + capacity * _RECORD.size)
+    _SNAP_HEADER.pack_into(table, 0, _SNAP_MAGIC, _VERSION, 0, generation, capacity, len(entries))
+    for key, revoked_until in entries.items():
+        slot = int.from_bytes(key[:8], "big") & mask
+        while True:
+            offset = _SNAP_HEADER.size + slot * _RECORD.size
+            if table[offset:offset + 32] == _EMPTY_KEY:
+                _RECORD.pack_into(table, offset, key, revoked_until)
+                break
+            slot = (slot + 1) & mask
+    return bytes(table)
+
+
+def _read_records(
+    fd: int, offset: int, overlay: Dict[bytes, float]
+) -> Tuple[Dict[bytes, float], int]:
+    size = os.fstat(fd).st_size
+    complete = offset + (size - offset) // _RECORD.size * _RECORD.size
+    if complete <= offset:
+        return overlay, offset
+    data = os.pread(fd, complete - offset, offset)
+    # Single-key dict stores are atomic, so lock-free readers may probe the
+    # overlay while it is being extended.
+    for key, revoked_until in _RECORD.iter_unpack(data):
+        overlay[key] = revoked_until
+    return overlay, complete
+
+
+# Open stores, so a forked child can replace thread locks a parent thread
+# may have held at the moment of the fork.
+_OPEN_STORES: "weakref.WeakSet[FileRevocationList]" = weakref.WeakSet()
+
+
+def _reset_locks_after_fork() -> None:
+    for store in list(_OPEN_STORES):
+        store._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+
+
+class FileRevocationList:
+    """``RevocationList`` API over an mmap snapshot plus an append-only log.
+
+    Every process opening the same ``path`` sees revocations made by the
+    others on its next lookup. The log is folded into a new snapshot by
+    ``purge`` and automatically once it exceeds ``compact_after`` records.
+    A store built before ``fork()`` reopens its files in the child on first
+    use: ``flock`` does not exclude holders of one inherited descriptor.
+    """
+
+    def __init__(self, path: str, compact_after: int = 100_000) -> None:
+        if compact_after <= 0:
+            raise ValueError("compact_after must be positive")
+        self._path = path
+        self._snap_path = f"{path}.snap"
+        self._log_path = f"{path}.log"
+        self._compact_after = compact_after
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._lock_fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        # (mmap, probe mask) swapped as one tuple so lock-free readers never
+        # pair a new mapping with an old capacity.
+        self._table: Optional[Tuple[mmap.mmap, int]] = None
+        self._log_fd: Optional[int] = None
+        self._snap_ino = -1
+        self._generation = -1
+        self._log_offset = 0
+        self._overlay: Dict[bytes, float] = {}
+        with self._lock, self._file_lock(exclusive=True):
+            self._recover()
+            self._reopen()
+        _OPEN_STORES.add(self)
+
+    # -- public API ---------------------------------------------------------
+
+    def revoke(
+        self,
+        token_or_token_id: Union[Token, str],
+        now: datetime,
+        ttl_seconds: Optional[int] = None,
+    ) -> str:
+        token_id, token_exp = _resolve_token(token_or_token_id)
+        revoked_until = _revoked_until(token_exp, now, ttl_seconds).timestamp()
+        record = _RECORD.pack(_key(token_id), revoked_until)
+        self._ensure_process()
+        with self._lock:
+            with self._file_lock(exclusive=False):
+                self._refresh_locked(file_locked=True)
+                os.write(self._log_fd, record)
+                self._read_log_tail()
+            if len(self._overlay) >= self._compact_after:
+                self._compact_locked(None)
+        return token_id
+
+    def is_revoked(self, token_or_token_id: Union[Token, str], now: datetime) -> bool:
+        token_id, _ = _resolve_token(token_or_token_id)
+        self._refresh()
+        revoked_until = self._lookup(_key(token_id))
+        return revoked_until is not None and _coerce_datetime(now).timestamp() < revoked_until
+
+    def is_revoked_many(
+        self, queries: Sequence[Tuple[Union[Token, str], datetime]]
+    ) -> List[bool]:
+        self._refresh()
+        results: List[bool] = []
+        for token_or_token_id, now in queries:
+            token_id, _ = _resolve_token(token_or_token_id)
+            revoked_until = self._lookup(_key(token_id))
+            results.append(
+                revoked_until is not None and _coerce_datetime(now).timestamp() < revoked_until
+            )
+        return results
+
+    def revocation_id(self, token_or_token_id: Union[Token, str]) -> str:
+        return _resolve_token(token_or_token_id)[0]
+
+    def purge(self, now: datetime) -> int:
+        """Compact into a new snapshot without entries expired at ``now``."""
+        self._ensure_process()
+        with self._lock:
+            return self._compact_locked(_coerce_datetime(now).timestamp())
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._live_entries())
+
+    def close(self) -> None:
+        _OPEN_STORES.discard(self)
+        with self._lock:
+            if self._table is not None:
+                self._table[0].close()
+                self._table = None
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+            if self._lock_fd >= 0:
+                os.close(self._lock_fd)
+                self._lock_fd = -1
+
+    def __enter__(self) -> "FileRevocationList":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -- internals ----------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _lookup(self, key: bytes) -> Optional[float]:
+        revoked_until = self._overlay.get(key)
+        if revoked_until is not None:
+            return revoked_until
+        mm, mask = self._table
+        slot = int.from_bytes(key[:8], "big") & mask
+        while True:
+            offset = _SNAP_HEADER.size + slot * _RECORD.size
+            slot_key = mm[offset:offset + 32]
+            if slot_key == key:
+                return _RECORD.unpack_from(mm, offset)[1]
+            if slot_key == _EMPTY_KEY:
+                return None
+            slot = (slot + 1) & mask
+
+    def _ensure_process(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Inherited descriptors share the parent's open file descriptions,
+            # and with them its flock state and log offset: start afresh.
+            old_fds = (self._lock_fd, self._log_fd)
+            self._lock_fd = os.open(f"{self._path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+            self._log_fd = None
+            for fd in old_fds:
+                if fd is not None and fd >= 0:
+                    os.close(fd)
+            with self._file_lock(exclusive=False):
+                self._reopen()
+            self._pid = os.getpid()
+
+    def _refresh(self) -> None:
+        self._ensure_process()
+        # Fast path: two stat calls and no lock when nothing changed on disk.
+        try:
+            snap_ino = os.stat(self._snap_path).st_ino
+            log_size = os.fstat(self._log_fd).st_size
+        except OSError:
+            snap_ino, log_size = -1, -1
+        if snap_ino == self._snap_ino and log_size == self._log_offset:
+            return
+        with self._lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self, file_locked: bool = False) -> None:
+        if os.stat(self._snap_path).st_ino != self._snap_ino:
+            # Taking the shared lock waits out an in-flight compaction.
+            if file_locked:
+                self._reopen()
+            else:
+                with self._file_lock(exclusive=False):
+                    self._reopen()
+            return
+        self._read_log_tail()
+
+    def _recover(self) -> None:
+        # Caller holds the exclusive file lock. A crash between the snapshot
+        # and log replacement leaves an older log whose records are already in
+        # the snapshot, so it is safe to start a fresh one.
+        if not os.path.exists(self._snap_path):
+            self._write_generation({}, 0)
+            return
+        with open(self._snap_path, "rb") as handle:
+            generation = _SNAP_HEADER.unpack(handle.read(_SNAP_HEADER.size))[3]
+        try:
+            with open(self._log_path, "rb") as handle:
+                log_generation = _LOG_HEADER.unpack(handle.read(_LOG_HEADER.size))[3]
+        except (OSError, struct.error):
+            log_generation = -1
+        if log_generation < generation:
+            _write_atomic(self._log_path, _LOG_HEADER.pack(_LOG_MAGIC, _VERSION, 0, generation))
+
+    def _reopen(self) -> None:
+        # Caller holds self._lock and a shared or exclusive file lock, so the
+        # snapshot and log generations agree.
+        with open(self._snap_path, "rb") as handle:
+            mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            snap_ino = os.fstat(handle.fileno()).st_ino
+        magic, version, _, generation, capacity, _ = _SNAP_HEADER.unpack_from(mm)
+        if magic != _SNAP_MAGIC or version != _VERSION:
+            mm.close()
+            raise ValueError("unsupported revocation snapshot")
+        log_fd = os.open(self._log_path, os.O_RDWR | os.O_APPEND)
+        header = os.pread(log_fd, _LOG_HEADER.size, 0)
+        log_magic, log_version, _, log_generation = _LOG_HEADER.unpack(header)
+        if log_magic != _LOG_MAGIC or log_version != _VERSION or log_generation != generation:
+            os.close(log_fd)
+            mm.close()
+            raise ValueError("revocation log does not match snapshot")
+        overlay, offset = _read_records(log_fd, _LOG_HEADER.size, {})
+        old_fd = self._log_fd
+        # Publish the table before its overlay: a lock-free reader that sees
+        # the new overlay is then guaranteed to probe the new table. Old
+        # mappings are left to the garbage collector since a reader may still
+        # be probing one.
+        self._table = (mm, capacity - 1)
+        self._overlay = overlay
+        self._log_fd, self._log_offset = log_fd, offset
+        self._snap_ino, self._generation = snap_ino, generation
+        if old_fd is not None:
+            os.close(old_fd)
+
+    def _read_log_tail(self) -> None:
+        self._overlay, self._log_offset = _read_records(
+            self._log_fd, self._log_offset, self._overlay
+        )
+
+    def _live_entries(self) -> Dict[bytes, float]:
+        entries: Dict[bytes, float] = {}
+        mm, mask = self._table
+        for slot in range(mask + 1):
+            offset = _SNAP_HEADER.size + slot * _RECORD.size
+            key, revoked_until = _RECORD.unpack_from(mm, offset)
+            if key != _EMPTY_KEY:
+                entries[key] = revoked_until
+        entries.update(self._overlay)
+        return entries
+
+    def _compact_locked(self, now_ts: Optional[float]) -> int:
+        with self._file_lock(exclusive=True):
+            self._refresh_locked(file_locked=True)
+            entries = self._live_entries()
+            removed = 0
+            if now_ts is not None:
+                expired = [key for key, until in entries.items() if now_ts >= until]
+                for key in expired:
+                    del entries[key]
+                removed = len(expired)
+            self._write_generation(entries, self._generation + 1)
+            self._reopen()
+        return removed
+
+    def _write_generation(self, entries: Dict[bytes, float], generation: int) -> None:
+        # Caller holds the exclusive file lock. The snapshot goes first so a
+        # crash never loses logged records (see _recover); readers switch once
+        # the snapshot inode changes, under the shared lock.
+        _write_atomic(self._snap_path, _build_table(entries, generation))
+        _write_atomic(self._log_path, _LOG_HEADER.pack(_LOG_MAGIC, _VERSION, 0, generation))
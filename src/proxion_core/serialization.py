@@ -1,7 +1,86 @@
 import json
 import jwt
+from jwt.algorithms import get_default_algorithms
+from concurrent.futures import Executor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 import base64
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .tokens import _coerce_datetime
+
+# Parsed key objects, cached per process so pool workers parse each PEM once.
+_KEY_CACHE: Dict[Any, Any] = {}
+_KEY_CACHE_LIMIT = 32
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Outcome of one item in ``sign_batch`` / ``verify_batch``."""
+    value: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _key_material(key) -> Any:
+    """Return a picklable form of ``key`` (PEM bytes for cryptography keys)."""
+    if isinstance(key, (bytes, str)):
+        return key
+    from cryptography.hazmat.primitives import serialization
+
+    if hasattr(key, "private_bytes"):
+        return key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    return key.public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+
+
+def _prepared_key(material) -> Any:
+    key = _KEY_CACHE.get(material)
+    if key is None:
+        algorithm = get_default_algorithms()["EdDSA"]
+        key = algorithm.prepare_key(material)
+        if len(_KEY_CACHE) >= _KEY_CACHE_LIMIT:
+            _KEY_CACHE.clear()
+        _KEY_CACHE[material] = key
+    return key
+
+
+def _error(exc: Exception) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _sign_chunk(material, items: Sequence[Tuple[dict, dict]]) -> List[BatchResult]:
+    key = _prepared_key(material)
+    results = []
+    for payload, headers in items:
+        try:
+            results.append(BatchResult(jwt.encode(payload, key, algorithm="EdDSA", headers=headers)))
+        except Exception as exc:
+            results.append(BatchResult(error=_error(exc)))
+    return results
+
+
+def _verify_chunk(material, token_strs: Sequence[str]) -> List[BatchResult]:
+    key = _prepared_key(material)
+    results = []
+    for token_str in token_strs:
+        try:
+            results.append(BatchResult(
+                jwt.decode(token_str, key, algorithms=["EdDSA"], options={"verify_aud": False})
+            ))
+        except Exception as exc:
+            results.append(BatchResult(error=_error(exc)))
+    return results
+
 
 class TokenSerializer:
     """Standard JWT-based serializer for Proxion Capability Tokens."""
@@ -9,20 +88,81 @@ class TokenSerializer:
     def __init__(self, issuer: str):
         self.issuer = issuer
 
-    def sign(self, token, signing_key) -> str:
-        """Sign a Token object into a JWT string."""
+    def _claims(self, token) -> Tuple[dict, dict]:
         payload = token.payload()
+        # JWT "exp" is NumericDate; PyJWT rejects the payload's ISO-8601 form.
+        payload["exp"] = int(_coerce_datetime(token.exp).timestamp())
         # Add standard JWT claims
         payload.update({
             "iss": self.issuer,
             "iat": int(datetime.now(timezone.utc).timestamp()),
             "jti": token.token_id
         })
-        
+
         # We use EdDSA as standard for Proxion
         headers = {"kid": token.token_id[:16]} # Optional: use token_id as kid
+        return payload, headers
+
+    def sign(self, token, signing_key) -> str:
+        """Sign a Token object into a JWT string."""
+        payload, headers = self._claims(token)
         return jwt.encode(payload, signing_key, algorithm="EdDSA", headers=headers)
 
     def verify(self, token_str: str, public_key) -> dict:
         """Verify a Proxion JWT and return the payload."""
         return jwt.decode(token_str, public_key, algorithms=["EdDSA"], options={"verify_aud": False})
+
+    def sign_batch(
+        self,
+        tokens: Sequence,
+        signing_key,
+        executor: Optional[Executor] = None,
+        chunk_size: int = 64,
+    ) -> List[BatchResult]:
+        """Sign many tokens, optionally fanned out over a process pool.
+
+        Claims are built here; only plain payload dicts and PEM key material
+        cross the process boundary. Results are in input order, with one
+        ``BatchResult`` per token carrying either the JWT or an error.
+        """
+        items = []
+        results: List[Optional[BatchResult]] = [None] * len(tokens)
+        positions = []
+        for index, token in enumerate(tokens):
+            try:
+                items.append(self._claims(token))
+                positions.append(index)
+            except Exception as exc:
+                results[index] = BatchResult(error=_error(exc))
+        signed = self._run(_sign_chunk, signing_key, items, executor, chunk_size)
+        for index, result in zip(positions, signed):
+            results[index] = result
+        return results
+
+    def verify_batch(
+        self,
+        token_strs: Sequence[str],
+        public_key,
+        executor: Optional[Executor] = None,
+        chunk_size: int = 64,
+    ) -> List[BatchResult]:
+        """Verify many JWTs, optionally fanned out over a process pool.
+
+        Each worker parses ``public_key`` once and reuses it for every later
+        chunk. Results are in input order; a bad token yields an error result
+        rather than failing the batch.
+        """
+        return self._run(_verify_chunk, public_key, list(token_strs), executor, chunk_size)
+
+    @staticmethod
+    def _run(func, key, items: list, executor: Optional[Executor], chunk_size: int) -> List[BatchResult]:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        material = _key_material(key)
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        if executor is None:
+            chunk_results = [func(material, chunk) for chunk in chunks]
+        else:
+            futures = [executor.submit(func, material, chunk) for chunk in chunks]
+            chunk_results = [future.result() for future in futures]
+        return [result for chunk in chunk_results for result in chunk]
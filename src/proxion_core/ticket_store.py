@@ -0,0 +1,192 @@
+"""SQLite-backed ticket store shared by processes on one host.
+
+The database runs in WAL mode so readers never block the single writer, and
+each thread keeps its own connection in autocommit mode. Redemption is one
+conditional ``UPDATE``; SQLite serializes writers, so exactly one of any
+number of concurrent redeemers sees a changed row. Expiry is indexed, which
+keeps ``sweep`` proportional to the number of tickets it removes. A forked
+child opens its own connections; SQLite handles must not cross a fork.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+import os
+import sqlite3
+import threading
+import weakref
+from typing import Iterator, List, Optional
+
+from .errors import TicketError
+from .tickets import Ticket, TicketBatch, _coerce_datetime, _ticket_id_block
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS tickets (
+        ticket_id TEXT PRIMARY KEY,
+        expires_at REAL NOT NULL,
+        redeemed INTEGER NOT NULL DEFAULT 0,
+        rp_pubkey TEXT
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS tickets_expires_at ON tickets (expires_at)",
+)
+_INSERT = "INSERT INTO tickets (ticket_id, expires_at) VALUES (?, ?)"
+_REDEEM = (
+    "UPDATE tickets SET redeemed = 1, rp_pubkey = ? "
+    "WHERE ticket_id = ? AND redeemed = 0 AND expires_at > ?"
+)
+_LOOKUP = "SELECT expires_at, redeemed FROM tickets WHERE ticket_id = ?"
+_SWEEP = "DELETE FROM tickets WHERE expires_at <= ?"
+_SWEEP_LIMITED = (
+    "DELETE FROM tickets WHERE ticket_id IN "
+    "(SELECT ticket_id FROM tickets WHERE expires_at <= ? ORDER BY expires_at LIMIT ?)"
+)
+
+
+# Open stores, so a forked child can replace thread locks a parent thread
+# may have held at the moment of the fork.
+_OPEN_STORES: "weakref.WeakSet[SQLiteTicketStore]" = weakref.WeakSet()
+
+
+def _reset_locks_after_fork() -> None:
+    for store in list(_OPEN_STORES):
+        store._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+class SQLiteTicketStore:
+    """``TicketStore`` over a SQLite database in WAL mode.
+
+    Every process opening the same ``path`` mints into and redeems from the
+    same table. The default ``synchronous="NORMAL"`` cannot corrupt the
+    database, but a power loss may roll back the latest commits, redemptions
+    included; pass ``"FULL"`` to fsync every commit.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0, synchronous: str = "NORMAL") -> None:
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError("synchronous must be OFF, NORMAL, FULL or EXTRA")
+        self._path = path
+        self._timeout = timeout
+        self._synchronous = synchronous.upper()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        # Connections inherited across fork. Closing one from the child could
+        # remove the parent's WAL, so they are kept referenced, never closed.
+        self._inherited: List[sqlite3.Connection] = []
+        self._pid = os.getpid()
+        self._closed = False
+        _OPEN_STORES.add(self)
+        conn = self._connection()
+        with self._transaction(conn):
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    # -- TicketStore API ----------------------------------------------------
+
+    def mint(self, ttl_seconds: int, now: Optional[datetime] = None) -> Ticket:
+        return self.mint_many(1, ttl_seconds, now)[0]
+
+    def mint_many(self, count: int, ttl_seconds: int, now: Optional[datetime] = None) -> TicketBatch:
+        """Mint ``count`` tickets with one ``executemany`` in one transaction."""
+        if ttl_seconds <= 0:
+            raise TicketError("ttl_seconds must be positive")
+        if count < 0:
+            raise TicketError("count must be non-negative")
+        now_dt = _coerce_datetime(now or datetime.now(timezone.utc))
+        expires_at = now_dt + timedelta(seconds=ttl_seconds)
+        expires_ts = expires_at.timestamp()
+        batch = TicketBatch(_ticket_id_block(count), expires_at)
+        conn = self._connection()
+        with self._transaction(conn):
+            conn.executemany(_INSERT, ((ticket_id, expires_ts) for ticket_id in batch.ticket_ids()))
+        return batch
+
+    def redeem(self, ticket_id: str, rp_pubkey: str, now: datetime) -> bool:
+        now_ts = _coerce_datetime(now).timestamp()
+        conn = self._connection()
+        if conn.execute(_REDEEM, (rp_pubkey, ticket_id, now_ts)).rowcount == 1:
+            return True
+        # Slow path only: explain why the conditional update matched nothing.
+        row = conn.execute(_LOOKUP, (ticket_id,)).fetchone()
+        if row is None:
+            raise TicketError("ticket not found")
+        if now_ts >= row[0]:
+            raise TicketError("ticket expired")
+        raise TicketError("ticket already redeemed")
+
+    def sweep(self, now: datetime, limit: Optional[int] = None) -> int:
+        """Delete tickets expired at ``now``, at most ``limit`` of them."""
+        now_ts = _coerce_datetime(now).timestamp()
+        conn = self._connection()
+        with self._transaction(conn):
+            if limit is None:
+                return conn.execute(_SWEEP, (now_ts,)).rowcount
+            return conn.execute(_SWEEP_LIMITED, (now_ts, limit)).rowcount
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+    def close(self) -> None:
+        """Close every thread's connection; the store is unusable afterwards."""
+        with self._lock:
+            self._closed = True
+            self._forget_inherited()
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        _OPEN_STORES.discard(self)
+
+    def __enter__(self) -> "SQLiteTicketStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -- internals ----------------------------------------------------------
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn: sqlite3.Connection) -> Iterator[None]:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _forget_inherited(self) -> None:
+        pid = os.getpid()
+        if self._pid != pid:
+            self._inherited.extend(self._connections)
+            self._connections = []
+            self._pid = pid
+
+    def _connection(self) -> sqlite3.Connection:
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is not None and local.pid == os.getpid() and not self._closed:
+            return conn
+        with self._lock:
+            if self._closed:
+                raise TicketError("ticket store is closed")
+            self._forget_inherited()
+            # Autocommit: each statement outside _transaction is its own
+            # transaction, which is all a single conditional UPDATE needs.
+            conn = sqlite3.connect(
+                self._path, timeout=self._timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self._synchronous}")
+            self._connections.append(conn)
+        local.conn = conn
+        local.pid = self._pid
+        return conn
+
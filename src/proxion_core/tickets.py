@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+import base64
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+import heapq
+import os
 import secrets
 import threading
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Protocol, Sequence, Tuple, Union, overload
 
 from .errors import TicketError
 
@@ -23,10 +26,136 @@ def _coerce_datetime(value: datetime) -> datetime:
     return value.astimezone(timezone.utc)
 
 
-class _TicketStore:
+# Same entropy and alphabet as secrets.token_urlsafe(24). 24 bytes encode to
+# exactly 32 characters without padding, so a batch is one urandom read and
+# one base64 pass whose output splits into ids at fixed offsets.
+_ID_BYTES = 24
+_ID_CHARS = 32
+
+
+def _ticket_id_block(count: int) -> str:
+    """``count`` concatenated ticket ids."""
+    return base64.urlsafe_b64encode(os.urandom(_ID_BYTES * count)).decode("ascii")
+
+
+class TicketBatch(Sequence[Ticket]):
+    """Tickets minted together, stored as one string of ids and one expiry.
+
+    Indexing builds a ``Ticket`` on demand; ``ticket_ids`` iterates the ids
+    without creating ``Ticket`` objects.
+    """
+
+    __slots__ = ("_ids", "expires_at")
+
+    def __init__(self, ids: str, expires_at: datetime) -> None:
+        if len(ids) % _ID_CHARS:
+            raise TicketError("malformed ticket id block")
+        self._ids = ids
+        self.expires_at = expires_at
+
+    def __len__(self) -> int:
+        return len(self._ids) // _ID_CHARS
+
+    @overload
+    def __getitem__(self, index: int) -> Ticket: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TicketBatch": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Ticket, "TicketBatch"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return TicketBatch("".join(self._id(i) for i in range(start, stop, step)), self.expires_at)
+            return TicketBatch(self._ids[start * _ID_CHARS:max(start, stop) * _ID_CHARS], self.expires_at)
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("ticket index out of range")
+        return Ticket(ticket_id=self._id(index), expires_at=self.expires_at)
+
+    def _id(self, index: int) -> str:
+        return self._ids[index * _ID_CHARS:(index + 1) * _ID_CHARS]
+
+    def ticket_ids(self) -> Iterator[str]:
+        ids = self._ids
+        return (ids[i:i + _ID_CHARS] for i in range(0, len(ids), _ID_CHARS))
+
+    def __repr__(self) -> str:
+        return f"TicketBatch(<{len(self)} tickets>, expires_at={self.expires_at!r})"
+
+
+class TicketStore(Protocol):
+    """Backend for ``mint_ticket`` / ``redeem_ticket`` / ``sweep_tickets``.
+
+    ``redeem`` must be atomic: of concurrent redemptions of one ticket,
+    across every thread or process sharing the store, exactly one returns
+    ``True`` and the rest raise ``TicketError``.
+    """
+
+    def mint(self, ttl_seconds: int, now: Optional[datetime] = None) -> Ticket: ...
+
+    def mint_many(
+        self, count: int, ttl_seconds: int, now: Optional[datetime] = None
+    ) -> TicketBatch: ...
+
+    def redeem(self, ticket_id: str, rp_pubkey: str, now: datetime) -> bool: ...
+
+    def sweep(self, now: datetime, limit: Optional[int] = None) -> int: ...
+
+
+# Expired tickets reclaimed by each mint on its stripe, keeping memory bounded
+# without a background thread.
+_MINT_SWEEP_BUDGET = 4
+
+
+class _TicketRecord:
+    __slots__ = ("expires_at", "redeemed", "rp_pubkey")
+
+    def __init__(self, expires_at: float) -> None:
+        self.expires_at = expires_at
+        self.redeemed = False
+        self.rp_pubkey: Optional[str] = None
+
+
+class _Shard:
+    __slots__ = ("lock", "records", "expiry")
+
     def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._store: Dict[str, Dict[str, object]] = {}
+        self.lock = threading.Lock()
+        self.records: Dict[str, _TicketRecord] = {}
+        self.expiry: List[Tuple[float, str]] = []
+
+    def sweep(self, now_ts: float, limit: Optional[int]) -> int:
+        # Caller holds self.lock. Ticket ids are never reused, so a popped id
+        # either still maps to its own record or was already removed.
+        removed = 0
+        heap = self.expiry
+        while heap and heap[0][0] <= now_ts and (limit is None or removed < limit):
+            _, ticket_id = heapq.heappop(heap)
+            if self.records.pop(ticket_id, None) is not None:
+                removed += 1
+        return removed
+
+
+class MemoryTicketStore:
+    """In-process, lock-striped ticket store with an expiry heap per stripe.
+
+    Each live ticket costs roughly 260 bytes: the 32-character id, a slotted
+    record with a float expiry, its dict slot and its heap tuple (see
+    benchmarks/bench_tickets.py). Redeemed tickets keep their record until
+    expiry so a replay is reported as "already redeemed"; ``sweep`` then
+    reclaims expired tickets whether or not they were redeemed.
+    """
+
+    def __init__(self, shards: int = 16) -> None:
+        if shards <= 0:
+            raise ValueError("shards must be positive")
+        self._shards = tuple(_Shard() for _ in range(shards))
+
+    def _shard(self, ticket_id: str) -> _Shard:
+        return self._shards[hash(ticket_id) % len(self._shards)]
 
     def mint(self, ttl_seconds: int, now: Optional[datetime] = None) -> Ticket:
         if ttl_seconds <= 0:
@@ -34,39 +163,120 @@ class _TicketStore:
         now_dt = _coerce_datetime(now or datetime.now(timezone.utc))
         ticket_id = secrets.token_urlsafe(24)
         expires_at = now_dt + timedelta(seconds=ttl_seconds)
-        with self._lock:
-            self._store[ticket_id] = {
-                "expires_at": expires_at,
-                "redeemed": False,
-                "rp_pubkey": None,
-            }
+        expires_ts = expires_at.timestamp()
+        shard = self._shard(ticket_id)
+        with shard.lock:
+            shard.records[ticket_id] = _TicketRecord(expires_ts)
+            heapq.heappush(shard.expiry, (expires_ts, ticket_id))
+            shard.sweep(now_dt.timestamp(), _MINT_SWEEP_BUDGET)
         return Ticket(ticket_id=ticket_id, expires_at=expires_at)
 
+    def mint_many(self, count: int, ttl_seconds: int, now: Optional[datetime] = None) -> TicketBatch:
+        """Mint ``count`` tickets sharing one expiry, locking each stripe once."""
+        if ttl_seconds <= 0:
+            raise TicketError("ttl_seconds must be positive")
+        if count < 0:
+            raise TicketError("count must be non-negative")
+        now_dt = _coerce_datetime(now or datetime.now(timezone.utc))
+        expires_at = now_dt + timedelta(seconds=ttl_seconds)
+        expires_ts = expires_at.timestamp()
+        batch = TicketBatch(_ticket_id_block(count), expires_at)
+        shards = self._shards
+        grouped: List[List[str]] = [[] for _ in shards]
+        for ticket_id in batch.ticket_ids():
+            grouped[hash(ticket_id) % len(shards)].append(ticket_id)
+        now_ts = now_dt.timestamp()
+        for shard, ids in zip(shards, grouped):
+            if not ids:
+                continue
+            entries = [(expires_ts, ticket_id) for ticket_id in ids]
+            records = {ticket_id: _TicketRecord(expires_ts) for ticket_id in ids}
+            with shard.lock:
+                shard.records.update(records)
+                heap = shard.expiry
+                if len(entries) > len(heap):
+                    heap.extend(entries)
+                    heapq.heapify(heap)
+                else:
+                    for entry in entries:
+                        heapq.heappush(heap, entry)
+                shard.sweep(now_ts, _MINT_SWEEP_BUDGET * len(ids))
+        return batch
+
     def redeem(self, ticket_id: str, rp_pubkey: str, now: datetime) -> bool:
-        now_dt = _coerce_datetime(now)
-        with self._lock:
-            record = self._store.get(ticket_id)
+        now_ts = _coerce_datetime(now).timestamp()
+        shard = self._shard(ticket_id)
+        with shard.lock:
+            record = shard.records.get(ticket_id)
             if record is None:
                 raise TicketError("ticket not found")
-            expires_at = record["expires_at"]
-            if not isinstance(expires_at, datetime):
-                raise TicketError("ticket store corrupted")
-            if now_dt >= _coerce_datetime(expires_at):
-                del self._store[ticket_id]
+            if now_ts >= record.expires_at:
+                del shard.records[ticket_id]
                 raise TicketError("ticket expired")
-            if record["redeemed"]:
+            if record.redeemed:
                 raise TicketError("ticket already redeemed")
-            record["redeemed"] = True
-            record["rp_pubkey"] = rp_pubkey
+            record.redeemed = True
+            record.rp_pubkey = rp_pubkey
             return True
 
+    def sweep(self, now: datetime, limit: Optional[int] = None) -> int:
+        """Reclaim expired tickets, at most ``limit`` per stripe."""
+        now_ts = _coerce_datetime(now).timestamp()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.sweep(now_ts, limit)
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(shard.records) for shard in self._shards)
 
-_STORE = _TicketStore()
+
+_STORE: TicketStore = MemoryTicketStore()
+
+
+def get_ticket_store() -> TicketStore:
+    return _STORE
+
+
+def set_ticket_store(store: TicketStore) -> TicketStore:
+    """Route the module-level functions to ``store``; returns the previous one.
+
+    Use a shared backend such as ``SQLiteTicketStore`` when tickets minted
+    by one worker process must be redeemable in another.
+    """
+    global _STORE
+    previous, _STORE = _STORE, store
+    return previous
 
 
 def mint_ticket(ttl_seconds: int) -> Ticket:
     return _STORE.mint(ttl_seconds=ttl_seconds)
 
 
+def mint_tickets(count: int, ttl_seconds: int) -> TicketBatch:
+    """Mint ``count`` tickets in one batch on the configured store."""
+    return _STORE.mint_many(count, ttl_seconds)
+
+
+def stream_tickets(count: int, ttl_seconds: int, chunk_size: int = 65536) -> Iterator[Ticket]:
+    """Yield ``count`` tickets, minting ``chunk_size`` at a time.
+
+    Each chunk is minted (and redeemable) just before its first ticket is
+    yielded and gets its own expiry, so memory stays bounded by one chunk.
+    """
+    if chunk_size <= 0:
+        raise TicketError("chunk_size must be positive")
+    remaining = count
+    while remaining > 0:
+        batch = _STORE.mint_many(min(chunk_size, remaining), ttl_seconds)
+        remaining -= len(batch)
+        yield from batch
+
+
 def redeem_ticket(ticket_id: str, rp_pubkey: str, now: datetime) -> bool:
     return _STORE.redeem(ticket_id=ticket_id, rp_pubkey=rp_pubkey, now=now)
+
+
+def sweep_tickets(now: Optional[datetime] = None, limit: Optional[int] = None) -> int:
+    return _STORE.sweep(now=now or datetime.now(timezone.utc), limit=limit)
@@ -2,21 +2,41 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
 import hmac
 import hashlib
 import json
 import secrets
 import base64
-from typing import FrozenSet, Iterable, List, Optional, Tuple
+from typing import Callable, FrozenSet, Iterable, List, Optional, Tuple, Union
 
+from .caveats import CompiledCaveats, caveat_from_id
 from .context import Caveat
+from .encoding import SIGNATURE_SIZE, decode_signed, encode_signed
 from .errors import TokenError
+from .permissions import PermissionIndex, _intern, intern_permissions
 
+ALG_HMAC_SHA256 = "HMAC-SHA256"
+# Same MAC over the binary canonical form in ``encoding`` instead of JSON.
+ALG_HMAC_SHA256_BINARY = "HMAC-SHA256/pxt1"
+_HMAC_ALGS = (ALG_HMAC_SHA256, ALG_HMAC_SHA256_BINARY)
+# Holder-attenuated tokens (``chain.ChainedToken``): HMAC keyed by the parent signature.
+ALG_HMAC_SHA256_CHAIN = "HMAC-SHA256/chain"
 
-@dataclass(frozen=True)
+CaveatResolver = Callable[[str], Optional[Caveat]]
+
+
+@dataclass(frozen=True, slots=True)
 class Token:
+    """Issued capability token.
+
+    Slotted, with grant sets pooled through ``intern_permissions`` and the
+    audience and holder fingerprint interned, so a cache holding many tokens
+    for the same grants stores those strings and sets once.
+    """
+
     token_id: str
     permissions: FrozenSet[Tuple[str, str]]
     exp: datetime
@@ -25,6 +45,21 @@ class Token:
     holder_key_fingerprint: str
     alg: str
     signature: str
+    # Lazily computed derivations; the token is immutable so they never go stale.
+    _canonical: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _signing_input: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _revocation_id: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _permission_index: Optional[PermissionIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _compiled_caveats: Optional[CompiledCaveats] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "permissions", intern_permissions(self.permissions))
+        object.__setattr__(self, "aud", _intern(self.aud))
+        object.__setattr__(self, "holder_key_fingerprint", _intern(self.holder_key_fingerprint))
 
     def payload(self) -> dict:
         return {
@@ -36,6 +71,50 @@ class Token:
             "holder_key_fingerprint": self.holder_key_fingerprint,
         }
 
+    def canonical_bytes(self) -> bytes:
+        cached = self._canonical
+        if cached is None:
+            cached = _canonical_json(self.payload())
+            object.__setattr__(self, "_canonical", cached)
+        return cached
+
+    def signing_input(self) -> bytes:
+        if self.alg != ALG_HMAC_SHA256_BINARY:
+            return self.canonical_bytes()
+        cached = self._signing_input
+        if cached is None:
+            cached = _binary_signed_part(
+                self.exp,
+                self.aud,
+                self.holder_key_fingerprint,
+                self.token_id,
+                self.permissions,
+                self.caveats,
+            )
+            object.__setattr__(self, "_signing_input", cached)
+        return cached
+
+    def revocation_id(self) -> str:
+        cached = self._revocation_id
+        if cached is None:
+            cached = hashlib.sha256(self.signing_input()).hexdigest()
+            object.__setattr__(self, "_revocation_id", cached)
+        return cached
+
+    def permission_index(self) -> PermissionIndex:
+        cached = self._permission_index
+        if cached is None:
+            cached = PermissionIndex(self.permissions)
+            object.__setattr__(self, "_permission_index", cached)
+        return cached
+
+    def compiled_caveats(self) -> CompiledCaveats:
+        cached = self._compiled_caveats
+        if cached is None:
+            cached = CompiledCaveats(self.caveats)
+            object.__setattr__(self, "_compiled_caveats", cached)
+        return cached
+
 
 def _coerce_datetime(value: datetime) -> datetime:
     if value.tzinfo is None:
@@ -47,12 +126,33 @@ def _canonical_json(payload: dict) -> bytes:
     return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
 
 
+def _binary_signed_part(
+    exp: datetime,
+    aud: str,
+    holder_key_fingerprint: str,
+    token_id: str,
+    permissions: Iterable[Tuple[str, str]],
+    caveats: Iterable[Caveat],
+) -> bytes:
+    exp_dt = _coerce_datetime(exp)
+    if exp_dt.microsecond:
+        raise TokenError("binary tokens require a whole-second exp")
+    return encode_signed(
+        int(exp_dt.timestamp()),
+        aud,
+        holder_key_fingerprint,
+        token_id,
+        permissions,
+        [c.id for c in caveats],
+    )
+
+
 def token_canonical_bytes(token: "Token") -> bytes:
-    return _canonical_json(token.payload())
+    return token.canonical_bytes()
 
 
-def _sign(payload: dict, signing_key: bytes) -> str:
-    digest = hmac.new(signing_key, _canonical_json(payload), hashlib.sha256).digest()
+def _sign(data: bytes, signing_key: bytes) -> str:
+    digest = hmac.new(signing_key, data, hashlib.sha256).digest()
     return _b64url(digest)
 
 
@@ -69,9 +169,15 @@ def issue_token(
     signing_key: bytes,
     now: Optional[datetime] = None,
     token_id: Optional[str] = None,
+    alg: str = ALG_HMAC_SHA256,
 ) -> Token:
+    if alg not in _HMAC_ALGS:
+        raise TokenError("unsupported alg")
     now_dt = _coerce_datetime(now or datetime.now(timezone.utc))
     exp_dt = _coerce_datetime(exp)
+    if alg == ALG_HMAC_SHA256_BINARY:
+        # The binary form carries an integer epoch; round down, never extend.
+        exp_dt = exp_dt.replace(microsecond=0)
     if exp_dt <= now_dt:
         raise TokenError("expiration must be in the future")
     perms = frozenset(permissions)
@@ -79,6 +185,22 @@ def issue_token(
         raise TokenError("permissions must be non-empty")
     caveat_tuple = tuple(caveats)
     tok_id = token_id or secrets.token_urlsafe(24)
+    if alg == ALG_HMAC_SHA256_BINARY:
+        signed = _binary_signed_part(
+            exp_dt, aud, holder_key_fingerprint, tok_id, perms, caveat_tuple
+        )
+        token = Token(
+            token_id=tok_id,
+            permissions=perms,
+            exp=exp_dt,
+            aud=aud,
+            caveats=caveat_tuple,
+            holder_key_fingerprint=holder_key_fingerprint,
+            alg=alg,
+            signature=_sign(signed, signing_key),
+        )
+        object.__setattr__(token, "_signing_input", signed)
+        return token
     payload = {
         "token_id": tok_id,
         "permissions": sorted([list(p) for p in perms]),
@@ -87,23 +209,128 @@ def issue_token(
         "caveats": [c.id for c in caveat_tuple],
         "holder_key_fingerprint": holder_key_fingerprint,
     }
-    signature = _sign(payload, signing_key)
-    return Token(
+    canonical = _canonical_json(payload)
+    signature = _sign(canonical, signing_key)
+    token = Token(
         token_id=tok_id,
         permissions=perms,
         exp=exp_dt,
         aud=aud,
         caveats=caveat_tuple,
         holder_key_fingerprint=holder_key_fingerprint,
-        alg="HMAC-SHA256",
+        alg=ALG_HMAC_SHA256,
         signature=signature,
     )
+    object.__setattr__(token, "_canonical", canonical)
+    return token
 
 
 def verify_integrity(token: Token, signing_key: bytes) -> bool:
-    if token.alg != "HMAC-SHA256":
+    if token.alg == ALG_HMAC_SHA256_CHAIN:
+        return token.verify_chain(signing_key)
+    if token.alg not in _HMAC_ALGS:
         raise TokenError("unsupported alg")
-    expected = _sign(token.payload(), signing_key)
+    expected = _sign(token.signing_input(), signing_key)
     if not hmac.compare_digest(expected, token.signature):
         raise TokenError("signature mismatch")
     return True
+
+
+def upgrade_token(token: Token, signing_key: bytes, now: Optional[datetime] = None) -> Token:
+    """Re-issue a verified JSON-form token in the binary form.
+
+    The conversion is one-way: the result keeps the token id, grants and
+    caveats, with ``exp`` rounded down to a whole second.
+    """
+    if token.alg == ALG_HMAC_SHA256_BINARY:
+        return token
+    verify_integrity(token, signing_key)
+    return issue_token(
+        permissions=token.permissions,
+        exp=token.exp,
+        aud=token.aud,
+        caveats=token.caveats,
+        holder_key_fingerprint=token.holder_key_fingerprint,
+        signing_key=signing_key,
+        now=now,
+        token_id=token.token_id,
+        alg=ALG_HMAC_SHA256_BINARY,
+    )
+
+
+def _b64url_decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def encode_token(token: Token) -> bytes:
+    """Transport form of a binary token: signed part plus raw signature."""
+    if token.alg != ALG_HMAC_SHA256_BINARY:
+        raise TokenError("only binary-form tokens have a binary transport encoding")
+    signature = _b64url_decode(token.signature)
+    if len(signature) != SIGNATURE_SIZE:
+        raise TokenError("malformed signature")
+    return token.signing_input() + signature
+
+
+def resolve_caveats(
+    caveat_ids: Iterable[str], caveat_resolver: Optional[CaveatResolver] = None
+) -> Tuple[Caveat, ...]:
+    if caveat_resolver is None:
+        return _resolve_builtin_caveats(tuple(caveat_ids))
+    caveats = []
+    for caveat_id in caveat_ids:
+        caveat = caveat_resolver(caveat_id)
+        if caveat is None:
+            caveat = caveat_from_id(caveat_id)
+        if caveat is None:
+            raise TokenError(f"unknown caveat: {caveat_id}")
+        caveats.append(caveat)
+    return tuple(caveats)
+
+
+# Built-in caveats are immutable, so tokens decoded with the same caveat ids
+# can share one tuple of caveats instead of rebuilding predicates per token.
+@lru_cache(maxsize=4096)
+def _resolve_builtin_caveats(caveat_ids: Tuple[str, ...]) -> Tuple[Caveat, ...]:
+    caveats = []
+    for caveat_id in caveat_ids:
+        caveat = caveat_from_id(caveat_id)
+        if caveat is None:
+            raise TokenError(f"unknown caveat: {caveat_id}")
+        caveats.append(caveat)
+    return tuple(caveats)
+
+
+def decode_token(
+    data: Union[bytes, bytearray, memoryview],
+    caveat_resolver: Optional[CaveatResolver] = None,
+) -> Token:
+    """Rebuild a ``Token`` from ``encode_token`` output (not yet verified).
+
+    Built-in caveats are reconstructed from their ids; ``caveat_resolver``
+    supplies any others and must return a ``Caveat`` with the same id.
+    """
+    if len(data) <= SIGNATURE_SIZE:
+        raise TokenError("malformed token")
+    signed = bytes(data[:-SIGNATURE_SIZE])  # one copy; bytes index faster than memoryview
+    return _token_from_signed(signed, _b64url(bytes(data[-SIGNATURE_SIZE:])), caveat_resolver)
+
+
+def _token_from_signed(
+    signed: bytes, signature: str, caveat_resolver: Optional[CaveatResolver]
+) -> Token:
+    decoded = decode_signed(signed)
+    if decoded.signed_size != len(signed):
+        raise TokenError("malformed token")
+    token = Token(
+        token_id=decoded.token_id,
+        permissions=frozenset(decoded.permissions),
+        exp=datetime.fromtimestamp(decoded.exp, timezone.utc),
+        aud=decoded.aud,
+        caveats=resolve_caveats(decoded.caveat_ids, caveat_resolver),
+        holder_key_fingerprint=decoded.holder_key_fingerprint,
+        alg=ALG_HMAC_SHA256_BINARY,
+        signature=signature,
+    )
+    object.__setattr__(token, "_signing_input", signed)
+    return token
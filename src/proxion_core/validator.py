@@ -3,10 +3,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Optional
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
+from .cache import VerifiedTokenCache
+from .chain import ChainedToken
 from .context import RequestContext
-from .tokens import Token, verify_integrity
+from .metrics import MetricsSink
+from .parsing import Buffer, LazyToken
+from .tokens import CaveatResolver, Token, verify_integrity
 from .revocation import RevocationList
 
 
@@ -31,57 +37,482 @@ def _default_pop_check(token: Token, proof: object) -> bool:
     return proof_key == token.holder_key_fingerprint
 
 
+def _verify(
+    token: Token,
+    signing_key: bytes,
+    ctx: RequestContext,
+    integrity_cache: Optional[VerifiedTokenCache],
+) -> None:
+    if integrity_cache is not None:
+        integrity_cache.verify(token, signing_key, ctx.now)
+    else:
+        verify_integrity(token, signing_key)
+
+
+def _check_caveats(token: Token, ctx: RequestContext) -> Decision:
+    # Built-in caveats are folded into one check per token; others run as-is.
+    compiled = token.compiled_caveats()
+    if not compiled.allows(ctx):
+        return _deny("caveat_failed")
+    for caveat in compiled.rest:
+        try:
+            if not caveat.evaluate(ctx):
+                return _deny("caveat_failed")
+        except Exception:
+            return _deny("caveat_error")
+    return ALLOW
+
+
+ProofVerifier = Callable[[Token, RequestContext, object], bool]
+
+
+class ValidationEnv:
+    """Per-call settings and services handed to every pipeline stage."""
+
+    __slots__ = ("signing_key", "revocation_list", "proof_verifier", "integrity_cache", "metrics")
+
+    def __init__(
+        self,
+        signing_key: bytes,
+        revocation_list: Optional[RevocationList] = None,
+        proof_verifier: Optional[ProofVerifier] = None,
+        integrity_cache: Optional[VerifiedTokenCache] = None,
+        metrics: Optional[MetricsSink] = None,
+    ) -> None:
+        self.signing_key = signing_key
+        self.revocation_list = revocation_list
+        self.proof_verifier = proof_verifier
+        self.integrity_cache = integrity_cache
+        self.metrics = metrics
+
+    def is_revoked(self, token: Token, ctx: RequestContext) -> bool:
+        if isinstance(token, ChainedToken):
+            queries = [(revocation_id, ctx.now) for revocation_id in token.revocation_ids()]
+            return any(self.revocation_list.is_revoked_many(queries))
+        return self.revocation_list.is_revoked(token, ctx.now)
+
+    def verify(self, token: Token, ctx: RequestContext) -> None:
+        _verify(token, self.signing_key, ctx, self.integrity_cache)
+
+
+Stage = Callable[[Token, RequestContext, object, ValidationEnv], Optional[Decision]]
+
+
+def _stage_expiry(
+    token: Token, ctx: RequestContext, proof: object, env: ValidationEnv
+) -> Optional[Decision]:
+    if ctx.now >= token.exp:
+        return _deny("expired")
+    return None
+
+
+def _stage_audience(
+    token: Token, ctx: RequestContext, proof: object, env: ValidationEnv
+) -> Optional[Decision]:
+    if token.aud != ctx.aud:
+        return _deny("audience_mismatch")
+    return None
+
+
+def _stage_permission(
+    token: Token, ctx: RequestContext, proof: object, env: ValidationEnv
+) -> Optional[Decision]:
+    # Exact, "/"-terminated prefix, or root wildcard.
+    if not token.permission_index().allows(ctx.action, ctx.resource):
+        return _deny("permission_missing")
+    return None
+
+
+def _stage_revocation(
+    token: Token, ctx: RequestContext, proof: object, env: ValidationEnv
+) -> Optional[Decision]:
+    if env.revocation_list is None:
+        return None
+    try:
+        revoked = env.is_revoked(token, ctx)
+    except Exception:
+        return _deny("revocation_error")
+    if revoked:
+        if env.integrity_cache is not None:
+            env.integrity_cache.discard(token)
+        return _deny("revoked")
+    return None
+
+
+def _stage_integrity(
+    token: Token, ctx: RequestContext, proof: object, env: ValidationEnv
+) -> Optional[Decision]:
+    env.verify(token, ctx)
+    return None
+
+
+def _stage_proof(
+    token: Token, ctx: RequestContext, proof: object, env: ValidationEnv
+) -> Optional[Decision]:
+    if env.proof_verifier is not None:
+        ok = env.proof_verifier(token, ctx, proof)
+    else:
+        ok = _default_pop_check(token, proof)
+    return None if ok else _deny("invalid_proof")
+
+
+def _stage_caveats(
+    token: Token, ctx: RequestContext, proof: object, env: ValidationEnv
+) -> Optional[Decision]:
+    decision = _check_caveats(token, ctx)
+    return None if decision.allowed else decision
+
+
+BUILTIN_STAGES: Dict[str, Stage] = {
+    "expiry": _stage_expiry,
+    "audience": _stage_audience,
+    "permission": _stage_permission,
+    "revocation": _stage_revocation,
+    "integrity": _stage_integrity,
+    "proof": _stage_proof,
+    "caveats": _stage_caveats,
+}
+
+
+class ValidationPipeline:
+    """Ordered, named validation stages; the first stage to deny decides.
+
+    Each stage returns a deny ``Decision`` or ``None`` to continue; an
+    exception denies with ``"error"``. Every built-in stage must stay in the
+    pipeline so it remains fail-closed; they can be reordered and custom
+    stages added.
+    """
+
+    __slots__ = ("_stages",)
+
+    def __init__(self, stages: Iterable[Tuple[str, Stage]]) -> None:
+        stages = tuple(stages)
+        names = [name for name, _ in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("stage names must be unique")
+        missing = [name for name in BUILTIN_STAGES if name not in names]
+        if missing:
+            raise ValueError(f"pipeline is missing required stages: {', '.join(missing)}")
+        self._stages = stages
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "ValidationPipeline":
+        stages = []
+        for name in names:
+            stage = BUILTIN_STAGES.get(name)
+            if stage is None:
+                raise ValueError(f"unknown stage: {name}")
+            stages.append((name, stage))
+        return cls(stages)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(name for name, _ in self._stages)
+
+    def reordered(self, names: Sequence[str]) -> "ValidationPipeline":
+        """Same stages in the order given by ``names``."""
+        by_name = dict(self._stages)
+        if sorted(names) != sorted(by_name):
+            raise ValueError("reordering must name every stage exactly once")
+        return ValidationPipeline((name, by_name[name]) for name in names)
+
+    def with_stage(
+        self,
+        name: str,
+        stage: Stage,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+    ) -> "ValidationPipeline":
+        """Add ``stage`` before or after a named stage (default: last)."""
+        if before is not None and after is not None:
+            raise ValueError("pass at most one of before/after")
+        names = self.names
+        if before is not None:
+            index = names.index(before)
+        elif after is not None:
+            index = names.index(after) + 1
+        else:
+            index = len(names)
+        stages = list(self._stages)
+        stages.insert(index, (name, stage))
+        return ValidationPipeline(stages)
+
+    def _split(self, name: str) -> Tuple[Tuple[Tuple[str, Stage], ...], Tuple[Tuple[str, Stage], ...]]:
+        index = self.names.index(name)
+        return self._stages[:index], self._stages[index:]
+
+    def run(self, token: Token, ctx: RequestContext, proof: object, env: ValidationEnv) -> Decision:
+        return _run_stages(self._stages, token, ctx, proof, env) or ALLOW
+
+
+def _run_stages(
+    stages: Sequence[Tuple[str, Stage]],
+    token: Token,
+    ctx: RequestContext,
+    proof: object,
+    env: ValidationEnv,
+) -> Optional[Decision]:
+    if env.metrics is not None:
+        return _run_stages_timed(stages, token, ctx, proof, env, env.metrics)
+    try:
+        for _, stage in stages:
+            denied = stage(token, ctx, proof, env)
+            if denied is not None:
+                return denied
+    except Exception:
+        return _deny("error")
+    return None
+
+
+def _run_stages_timed(
+    stages: Sequence[Tuple[str, Stage]],
+    token: Token,
+    ctx: RequestContext,
+    proof: object,
+    env: ValidationEnv,
+    metrics: MetricsSink,
+) -> Optional[Decision]:
+    for name, stage in stages:
+        started = perf_counter()
+        try:
+            denied = stage(token, ctx, proof, env)
+        except Exception as exc:
+            _record_stage(metrics, name, perf_counter() - started, exc)
+            return _deny("error")
+        _record_stage(metrics, name, perf_counter() - started)
+        if denied is not None:
+            return denied
+    return None
+
+
+def _record_stage(
+    metrics: MetricsSink, name: str, elapsed: float, error: Optional[Exception] = None
+) -> None:
+    # A failing sink must never change a decision.
+    try:
+        metrics.stage(name, elapsed)
+    except Exception:
+        pass
+    if error is not None:
+        try:
+            metrics.stage_error(name, error)
+        except Exception:
+            pass
+
+
+def _record(metrics: MetricsSink, token: Token, decision: Decision) -> None:
+    try:
+        metrics.token_shape(len(token.permissions), len(token.caveats))
+    except Exception:
+        pass
+    try:
+        metrics.decision(decision.allowed, decision.reason)
+    except Exception:
+        pass
+
+
+# Cheap structural checks first so expired or misdirected junk never costs a
+# revocation hash or an HMAC; they read only attacker-supplied fields, so the
+# deny reason reveals nothing the caller did not already know.
+DEFAULT_PIPELINE = ValidationPipeline.from_names(
+    ["expiry", "audience", "permission", "revocation", "integrity", "proof", "caveats"]
+)
+# Order used before pipelines existed: revocation and integrity first.
+LEGACY_PIPELINE = ValidationPipeline.from_names(
+    ["revocation", "integrity", "expiry", "audience", "proof", "permission", "caveats"]
+)
+
+
 def validate_request(
     token: Token,
     ctx: RequestContext,
     proof: object,
     signing_key: bytes,
     revocation_list: Optional[RevocationList] = None,
-    proof_verifier: Optional[Callable[[Token, RequestContext, object], bool]] = None,
+    proof_verifier: Optional[ProofVerifier] = None,
+    integrity_cache: Optional[VerifiedTokenCache] = None,
+    pipeline: Optional[ValidationPipeline] = None,
+    metrics: Optional[MetricsSink] = None,
+) -> Decision:
+    env = ValidationEnv(signing_key, revocation_list, proof_verifier, integrity_cache, metrics)
+    decision = (pipeline or DEFAULT_PIPELINE).run(token, ctx, proof, env)
+    if metrics is not None:
+        _record(metrics, token, decision)
+    return decision
+
+
+def validate_serialized(
+    data: Buffer,
+    ctx: RequestContext,
+    proof: object,
+    signing_key: bytes,
+    revocation_list: Optional[RevocationList] = None,
+    proof_verifier: Optional[Callable[[Union[Token, LazyToken], RequestContext, object], bool]] = None,
+    caveat_resolver: Optional[CaveatResolver] = None,
+    metrics: Optional[MetricsSink] = None,
+) -> Decision:
+    """Validate an ``encode_token`` buffer without materializing a ``Token``.
+
+    Runs ``DEFAULT_PIPELINE`` over a ``LazyToken`` view, so every deny reason
+    matches ``validate_request``. Expiry and audience are read from the raw
+    bytes, so stale or misdirected tokens are rejected without decoding
+    grants or caveats. ``proof_verifier`` receives
+    the ``LazyToken`` view. ``metrics`` receives the decision only, since
+    recording token shape would force a full decode.
+    """
+    decision = _validate_serialized(
+        data, ctx, proof, signing_key, revocation_list, proof_verifier, caveat_resolver
+    )
+    if metrics is not None:
+        try:
+            metrics.decision(decision.allowed, decision.reason)
+        except Exception:
+            pass
+    return decision
+
+
+class _SerializedEnv(ValidationEnv):
+    """``ValidationEnv`` for ``LazyToken`` views of ``encode_token`` buffers."""
+
+    __slots__ = ()
+
+    def is_revoked(self, token: LazyToken, ctx: RequestContext) -> bool:
+        return self.revocation_list.is_revoked(token.revocation_id(), ctx.now)
+
+    def verify(self, token: LazyToken, ctx: RequestContext) -> None:
+        token.verify(self.signing_key)
+
+
+def _validate_serialized(
+    data: Buffer,
+    ctx: RequestContext,
+    proof: object,
+    signing_key: bytes,
+    revocation_list: Optional[RevocationList],
+    proof_verifier: Optional[Callable[[Union[Token, LazyToken], RequestContext, object], bool]],
+    caveat_resolver: Optional[CaveatResolver],
 ) -> Decision:
     try:
-        if revocation_list is not None:
-            try:
-                if revocation_list.is_revoked(token, ctx.now):
-                    return _deny("revoked")
-            except Exception:
-                return _deny("revocation_error")
-        verify_integrity(token, signing_key)
-        if ctx.now >= token.exp:
-            return _deny("expired")
-        if token.aud != ctx.aud:
-            return _deny("audience_mismatch")
-        if proof_verifier is not None:
-            if not proof_verifier(token, ctx, proof):
-                return _deny("invalid_proof")
-        else:
-            if not _default_pop_check(token, proof):
-                return _deny("invalid_proof")
-        # Permission Check (with Prefix Support)
-        allowed_by_permission = False
-        for p_action, p_resource in token.permissions:
-            if p_action == ctx.action:
-                if p_resource == ctx.resource:
-                    allowed_by_permission = True
-                    break
-                # Hierarchical check: if permission is for /data/ and resource is /data/photos
-                if p_resource.endswith("/") and ctx.resource.startswith(p_resource):
-                    allowed_by_permission = True
-                    break
-                # Root wildcard
-                if p_resource == "/":
-                    allowed_by_permission = True
-                    break
-
-        if not allowed_by_permission:
-            return _deny("permission_missing")
-        for caveat in token.caveats:
+        token = LazyToken(data, caveat_resolver)
+    except Exception:
+        return _deny("error")
+    env = _SerializedEnv(signing_key, revocation_list, proof_verifier)
+    return DEFAULT_PIPELINE.run(token, ctx, proof, env)
+
+
+class _RevocationLookupFailed(Exception):
+    pass
+
+
+def _integrity_key(token: Token) -> Tuple:
+    """Everything ``verify`` checks, so equal tokens decoded separately share
+    one result and a copied signature on other content never does."""
+    if isinstance(token, ChainedToken):
+        links = token.links()
+        return (
+            token.alg,
+            links[0].parent.revocation_id(),
+            tuple(link.link_bytes() for link in links),
+            token.signature,
+        )
+    # The revocation id hashes the complete signed bytes.
+    return (token.alg, token.revocation_id(), token.signature)
+
+
+def _revocation_ids(revocation_list: RevocationList, token: Token) -> List[str]:
+    # A chained token is revoked with its root or any link above it.
+    if isinstance(token, ChainedToken):
+        return token.revocation_ids()
+    return [revocation_list.revocation_id(token)]
+
+
+class _BatchEnv(ValidationEnv):
+    """``ValidationEnv`` that answers revocation from one prefetched pass and
+    verifies each distinct token content at most once."""
+
+    __slots__ = ("_revoked", "_verified")
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # (revocation id, ctx.now) -> revoked, or None if the lookup failed
+        self._revoked: Dict[Tuple[str, datetime], Optional[bool]] = {}
+        self._verified: Dict[Tuple, Optional[BaseException]] = {}
+
+    def prefetch(self, items: Sequence[Tuple[Token, RequestContext, object]]) -> None:
+        if self.revocation_list is None:
+            return
+        queries: Dict[Tuple[str, datetime], None] = {}
+        for token, ctx, _ in items:
             try:
-                if not caveat.evaluate(ctx):
-                    return _deny("caveat_failed")
+                revocation_ids = _revocation_ids(self.revocation_list, token)
             except Exception:
-                return _deny("caveat_error")
-        return ALLOW
-    except Exception as exc:
-        _ = exc
-        return _deny("error")
+                # Left for ``is_revoked`` to report through the normal path.
+                continue
+            for revocation_id in revocation_ids:
+                queries[(revocation_id, ctx.now)] = None
+        keys = list(queries)
+        try:
+            revoked = self.revocation_list.is_revoked_many(keys)
+        except Exception:
+            revoked = [None] * len(keys)
+        self._revoked.update(zip(keys, revoked))
+
+    def is_revoked(self, token: Token, ctx: RequestContext) -> bool:
+        keys = [(revocation_id, ctx.now) for revocation_id in _revocation_ids(self.revocation_list, token)]
+        if not all(key in self._revoked for key in keys):
+            return super().is_revoked(token, ctx)
+        answers = [self._revoked[key] for key in keys]
+        if None in answers:
+            raise _RevocationLookupFailed()
+        return any(answers)
+
+    def verify(self, token: Token, ctx: RequestContext) -> None:
+        try:
+            key = _integrity_key(token)
+        except Exception:
+            super().verify(token, ctx)
+            return
+        if key in self._verified:
+            failure = self._verified[key]
+            if failure is not None:
+                raise failure
+            return
+        try:
+            super().verify(token, ctx)
+        except Exception as exc:
+            self._verified[key] = exc
+            raise
+        self._verified[key] = None
+
+
+def validate_many(
+    requests: Iterable[Tuple[Token, RequestContext, object]],
+    signing_key: bytes,
+    revocation_list: Optional[RevocationList] = None,
+    proof_verifier: Optional[ProofVerifier] = None,
+    integrity_cache: Optional[VerifiedTokenCache] = None,
+    pipeline: Optional[ValidationPipeline] = None,
+    metrics: Optional[MetricsSink] = None,
+) -> List[Decision]:
+    """Validate a burst of ``(token, ctx, proof)`` triples.
+
+    Each item gets the same decision ``validate_request`` would return, but
+    integrity is verified once per distinct token content (equal tokens
+    decoded separately count once) and revocation is answered in a single
+    pass over ``revocation_list`` for the items that reach the revocation
+    stage.
+    """
+    items = list(requests)
+    pipeline = pipeline or DEFAULT_PIPELINE
+    env = _BatchEnv(signing_key, revocation_list, proof_verifier, integrity_cache, metrics)
+    head, tail = pipeline._split("revocation")
+    decisions: List[Optional[Decision]] = [
+        _run_stages(head, token, ctx, proof, env) for token, ctx, proof in items
+    ]
+    env.prefetch([item for item, decision in zip(items, decisions) if decision is None])
+    for index, (token, ctx, proof) in enumerate(items):
+        if decisions[index] is None:
+            decisions[index] = _run_stages(tail, token, ctx, proof, env) or ALLOW
+        if metrics is not None:
+            _record(metrics, token, decisions[index])
+    return decisions
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.async_validator import ThreadOffload, async_validate_many, async_validate_request
+from proxion_core.context import RequestContext
+from proxion_core.revocation import RevocationList
+from proxion_core.tokens import issue_token
+from proxion_core.validator import validate_request
+
+
+class _AsyncRevocations:
+    def __init__(self, revoked):
+        self.revoked = revoked
+
+    async def is_revoked(self, token, now):
+        await asyncio.sleep(0)
+        return token.revocation_id() in self.revoked
+
+
+class AsyncValidatorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.signing_key = b"test-key"
+        self.now = datetime.now(timezone.utc)
+        self.exp = self.now + timedelta(minutes=5)
+        self.token = issue_token(
+            permissions={("read", "resource")},
+            exp=self.exp,
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=self.signing_key,
+            now=self.now,
+        )
+        self.proof = {"holder_key_fingerprint": "fp1"}
+
+    def test_matches_sync_reasons(self) -> None:
+        revocations = RevocationList()
+        contexts = [
+            RequestContext("read", "resource", "aud1", self.now),
+            RequestContext("write", "resource", "aud1", self.now),
+            RequestContext("read", "resource", "aud2", self.now),
+            RequestContext("read", "resource", "aud1", self.exp),
+        ]
+        for ctx in contexts:
+            for offload in (None, ThreadOffload()):
+                expected = validate_request(self.token, ctx, self.proof, self.signing_key, revocations)
+                actual = asyncio.run(
+                    async_validate_request(
+                        self.token, ctx, self.proof, self.signing_key, revocations, offload=offload
+                    )
+                )
+                self.assertEqual(actual, expected)
+
+    def test_async_backend_and_verifier(self) -> None:
+        ctx = RequestContext("read", "resource", "aud1", self.now)
+
+        async def verifier(token, ctx, proof):
+            await asyncio.sleep(0)
+            return proof == "signed"
+
+        backend = _AsyncRevocations(set())
+        ok = asyncio.run(async_validate_request(self.token, ctx, "signed", self.signing_key, backend, verifier))
+        bad = asyncio.run(async_validate_request(self.token, ctx, "forged", self.signing_key, backend, verifier))
+        self.assertTrue(ok.allowed)
+        self.assertEqual(bad.reason, "invalid_proof")
+        backend.revoked.add(self.token.revocation_id())
+        revoked = asyncio.run(async_validate_request(self.token, ctx, "signed", self.signing_key, backend, verifier))
+        self.assertEqual(revoked.reason, "revoked")
+
+    def test_failing_backend_fails_closed(self) -> None:
+        class Broken:
+            async def is_revoked(self, token, now):
+                raise RuntimeError("backend down")
+
+        ctx = RequestContext("read", "resource", "aud1", self.now)
+        decision = asyncio.run(async_validate_request(self.token, ctx, self.proof, self.signing_key, Broken()))
+        self.assertEqual(decision.reason, "revocation_error")
+
+    def test_validate_many_preserves_order(self) -> None:
+        requests = [
+            (self.token, RequestContext("read", "resource", "aud1", self.now), self.proof),
+            (self.token, RequestContext("read", "resource", "aud1", self.now), None),
+        ] * 5
+        decisions = asyncio.run(
+            async_validate_many(requests, self.signing_key, offload=ThreadOffload(), concurrency=3)
+        )
+        self.assertEqual([d.allowed for d in decisions], [True, False] * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
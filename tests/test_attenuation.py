@@ -5,10 +5,12 @@ from datetime import datetime, timezone, timedelta
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
 
-from proxion_core.attenuation import derive_token
-from proxion_core.context import Caveat
+from proxion_core.attenuation import derive_token, normalize_caveats
+from proxion_core.caveats import cidr_allowlist, ip_allowlist, nonce_matches, time_window
+from proxion_core.context import Caveat, RequestContext
 from proxion_core.errors import AttenuationError
 from proxion_core.tokens import issue_token
+from proxion_core.validator import validate_request
 
 
 class AttenuationTests(unittest.TestCase):
@@ -35,5 +37,65 @@ class AttenuationTests(unittest.TestCase):
             )
 
 
+class CaveatNormalizationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.signing_key = b"test-key"
+        self.now = datetime.now(timezone.utc)
+        self.ts = self.now.timestamp()
+        self.root = issue_token(
+            permissions={("read", "/data/")},
+            exp=self.now + timedelta(minutes=5),
+            aud="aud1",
+            caveats=[time_window(self.ts - 60, self.ts + 60), ip_allowlist({"10.0.0.1", "10.0.0.2"})],
+            holder_key_fingerprint="fp1",
+            signing_key=self.signing_key,
+            now=self.now,
+        )
+
+    def _derive(self, parent, extra):
+        return derive_token(parent, {("read", "/data/")}, extra, self.now, self.signing_key)
+
+    def test_deep_chain_stays_bounded(self) -> None:
+        custom = Caveat("custom", lambda ctx: True)
+        token = self.root
+        for hop in range(6):
+            token = self._derive(
+                token,
+                [time_window(self.ts - 50 + hop, self.ts + 50 - hop), ip_allowlist({"10.0.0.1"}), custom],
+            )
+        self.assertEqual(
+            [c.id for c in token.caveats],
+            [time_window(self.ts - 45, self.ts + 45).id, ip_allowlist({"10.0.0.1"}).id, "custom"],
+        )
+        proof = {"holder_key_fingerprint": "fp1"}
+        ok = RequestContext("read", "/data/x", "aud1", self.now, ip="10.0.0.1")
+        self.assertTrue(validate_request(token, ok, proof, self.signing_key).allowed)
+        bad = RequestContext("read", "/data/x", "aud1", self.now, ip="10.0.0.2")
+        self.assertEqual(validate_request(token, bad, proof, self.signing_key).reason, "caveat_failed")
+
+    def test_single_caveats_are_kept_verbatim(self) -> None:
+        nonce = nonce_matches("n1")
+        normalized = normalize_caveats([nonce, nonce, self.root.caveats[0]])
+        self.assertIs(normalized[0], self.root.caveats[0])
+        self.assertIs(normalized[1], nonce)
+
+    def test_ip_allowlist_filtered_by_cidr(self) -> None:
+        token = self._derive(self.root, [cidr_allowlist(["10.0.0.0/31"]), cidr_allowlist(["10.0.0.1/32"])])
+        self.assertEqual([c.id for c in token.caveats][1], ip_allowlist({"10.0.0.1"}).id)
+        self.assertEqual(len(token.caveats), 2)
+
+    def test_contradictions_raise(self) -> None:
+        for extra in (
+            [ip_allowlist({"10.9.9.9"})],
+            [time_window(self.ts + 100, self.ts + 200)],
+            [nonce_matches("a"), nonce_matches("b")],
+            [cidr_allowlist(["192.168.0.0/16"])],
+        ):
+            with self.assertRaises(AttenuationError):
+                self._derive(self.root, extra)
+        with self.assertRaises(AttenuationError):
+            normalize_caveats([time_window(self.ts - 20, self.ts - 10)], now=self.now)
+
+
 if __name__ == "__main__":
     unittest.main()
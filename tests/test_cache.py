@@ -0,0 +1,118 @@
+import os
+import sys
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.cache import VerifiedTokenCache
+from proxion_core.context import RequestContext
+from proxion_core.errors import TokenError
+from proxion_core.revocation import RevocationList
+from proxion_core.tokens import issue_token
+from proxion_core.validator import validate_request
+
+
+class VerifiedTokenCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.signing_key = b"test-key"
+        self.now = datetime.now(timezone.utc)
+        self.exp = self.now + timedelta(minutes=5)
+
+    def _issue(self, resource: str = "resource"):
+        return issue_token(
+            permissions={("read", resource)},
+            exp=self.exp,
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=self.signing_key,
+            now=self.now,
+        )
+
+    def test_repeat_verification_hits(self) -> None:
+        cache = VerifiedTokenCache()
+        token = self._issue()
+        cache.verify(token, self.signing_key, self.now)
+        cache.verify(token, self.signing_key, self.now)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+
+    def test_forged_payload_with_copied_signature_rejected(self) -> None:
+        cache = VerifiedTokenCache()
+        token = self._issue()
+        cache.verify(token, self.signing_key, self.now)
+        forged = replace(token, permissions=frozenset({("write", "resource")}))
+        with self.assertRaises(TokenError):
+            cache.verify(forged, self.signing_key, self.now)
+
+    def test_failed_verification_keeps_entry(self) -> None:
+        cache = VerifiedTokenCache()
+        token = self._issue()
+        cache.verify(token, self.signing_key, self.now)
+        forged = replace(token, permissions=frozenset({("write", "resource")}))
+        for _ in range(3):
+            with self.assertRaises(TokenError):
+                cache.verify(forged, self.signing_key, self.now)
+        self.assertEqual(len(cache), 1)
+        cache.verify(token, self.signing_key, self.now)
+        self.assertEqual(cache.stats().hits, 1)
+
+    def test_other_key_misses(self) -> None:
+        cache = VerifiedTokenCache()
+        token = self._issue()
+        cache.verify(token, self.signing_key, self.now)
+        with self.assertRaises(TokenError):
+            cache.verify(token, b"other-key", self.now)
+
+    def test_entries_expire_with_token(self) -> None:
+        cache = VerifiedTokenCache()
+        token = self._issue()
+        cache.verify(token, self.signing_key, self.now)
+        self.assertEqual(cache.purge(self.exp), 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_bounds(self) -> None:
+        cache = VerifiedTokenCache(max_entries=2)
+        tokens = [self._issue(f"r{i}") for i in range(3)]
+        for token in tokens:
+            cache.verify(token, self.signing_key, self.now)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats().evictions, 1)
+        small = VerifiedTokenCache(max_bytes=1)
+        small.verify(tokens[0], self.signing_key, self.now)
+        self.assertEqual(len(small), 0)
+
+    def test_discard_probes_each_key(self) -> None:
+        cache = VerifiedTokenCache()
+        token = self._issue()
+        others = [self._issue(f"r{i}") for i in range(50)]
+        for other in others:
+            cache.verify(other, self.signing_key, self.now)
+        cache.verify(token, self.signing_key, self.now)
+        self.assertEqual(cache.discard(token), 1)
+        self.assertEqual(cache.discard(token), 0)
+        self.assertEqual(len(cache), 50)
+        for other in others:
+            cache.discard(other)
+        self.assertEqual(cache._entry_key_ids, {})
+
+    def test_revoked_token_dropped_from_cache(self) -> None:
+        cache = VerifiedTokenCache()
+        token = self._issue()
+        ctx = RequestContext("read", "resource", "aud1", self.now)
+        proof = {"holder_key_fingerprint": "fp1"}
+        revocations = RevocationList()
+        self.assertTrue(
+            validate_request(token, ctx, proof, self.signing_key, revocations, integrity_cache=cache).allowed
+        )
+        self.assertEqual(len(cache), 1)
+        revocations.revoke(token, self.now)
+        decision = validate_request(token, ctx, proof, self.signing_key, revocations, integrity_cache=cache)
+        self.assertEqual(decision.reason, "revoked")
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
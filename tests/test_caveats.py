@@ -5,8 +5,15 @@ from datetime import datetime, timezone, timedelta
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
 
-from proxion_core.caveats import ip_allowlist, time_window, nonce_matches
-from proxion_core.context import RequestContext
+from proxion_core.caveats import (
+    caveat_from_id,
+    cidr_allowlist,
+    compile_caveats,
+    ip_allowlist,
+    nonce_matches,
+    time_window,
+)
+from proxion_core.context import Caveat, RequestContext
 from proxion_core.tokens import issue_token
 from proxion_core.validator import validate_request
 
@@ -50,6 +57,17 @@ class CaveatTests(unittest.TestCase):
         decision = validate_request(token, ctx, {"holder_key_fingerprint": "fp1"}, self.signing_key)
         self.assertFalse(decision.allowed)
 
+    def test_cidr_allowlist_allows_ranges(self) -> None:
+        caveat = cidr_allowlist(["10.0.0.0/22", "2001:db8::/32"])
+        token = self._issue(caveat)
+        proof = {"holder_key_fingerprint": "fp1"}
+        for ip, allowed in (("10.0.2.7", True), ("2001:db8::9", True), ("10.0.4.1", False), ("bogus", False)):
+            ctx = RequestContext("read", "resource", "aud1", self.now, ip=ip)
+            self.assertEqual(validate_request(token, ctx, proof, self.signing_key).allowed, allowed)
+        rebuilt = caveat_from_id(caveat.id)
+        self.assertEqual(rebuilt.id, caveat.id)
+        self.assertTrue(rebuilt.evaluate(RequestContext("read", "resource", "aud1", self.now, ip="10.0.1.1")))
+
     def test_caveat_false_denies(self) -> None:
         token = self._issue(ip_allowlist(set()))
         ctx = RequestContext("read", "resource", "aud1", self.now, ip="127.0.0.1")
@@ -57,5 +75,88 @@ class CaveatTests(unittest.TestCase):
         self.assertFalse(decision.allowed)
 
 
+class CompiledCaveatTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = datetime.now(timezone.utc)
+        self.ts = self.now.timestamp()
+
+    def _ctx(self, **overrides) -> RequestContext:
+        values = dict(action="read", resource="r", aud="aud1", now=self.now, ip="10.0.0.1", device_nonce="n1")
+        values.update(overrides)
+        return RequestContext(**values)
+
+    def test_stacked_builtins_fold_into_one_check(self) -> None:
+        caveats = [time_window(self.ts - 100 + i, self.ts + 100 - i) for i in range(20)]
+        caveats += [ip_allowlist({"10.0.0.1", "10.0.0.2"}), ip_allowlist({"10.0.0.1", "10.0.0.3"})]
+        caveats += [nonce_matches("n1"), nonce_matches("n1")]
+        compiled = compile_caveats(caveats)
+        self.assertEqual((compiled.not_before, compiled.not_after), (self.ts - 81, self.ts + 81))
+        self.assertEqual(compiled.allowed_ips, frozenset({"10.0.0.1"}))
+        self.assertEqual(compiled.rest, ())
+        self.assertTrue(compiled.allows(self._ctx()))
+        self.assertFalse(compiled.allows(self._ctx(ip="10.0.0.2")))
+        self.assertFalse(compiled.allows(self._ctx(device_nonce="n2")))
+        self.assertFalse(compiled.allows(self._ctx(now=self.now + timedelta(seconds=90))))
+
+    def test_matches_individual_evaluation(self) -> None:
+        caveats = [
+            time_window(self.ts - 5, self.ts + 5),
+            ip_allowlist({"10.0.0.1"}),
+            nonce_matches("n1"),
+        ]
+        compiled = compile_caveats(caveats)
+        for ctx in (
+            self._ctx(),
+            self._ctx(ip=None),
+            self._ctx(device_nonce=None),
+            self._ctx(now=self.now.replace(tzinfo=None)),
+            self._ctx(now=self.now - timedelta(seconds=6)),
+            self._ctx(now="not-a-datetime"),
+        ):
+            expected = all(c.evaluate(ctx) for c in caveats)
+            self.assertEqual(compiled.allows(ctx), expected)
+
+    def test_cidr_ranges_fold_with_allowlists(self) -> None:
+        compiled = compile_caveats([cidr_allowlist(["10.0.0.0/8"]), cidr_allowlist(["10.1.0.0/16"])])
+        self.assertTrue(compiled.allows(self._ctx(ip="10.1.2.3")))
+        self.assertFalse(compiled.allows(self._ctx(ip="10.2.0.1")))
+        compiled = compile_caveats([cidr_allowlist(["10.0.0.0/8"]), ip_allowlist({"10.0.0.1", "11.0.0.1"})])
+        self.assertEqual(compiled.allowed_ips, frozenset({"10.0.0.1"}))
+        self.assertIsNone(compiled.ip_ranges)
+
+    def test_contradictions_never_allow(self) -> None:
+        for caveats in (
+            [time_window(self.ts - 10, self.ts - 5), time_window(self.ts, self.ts + 5)],
+            [ip_allowlist({"10.0.0.1"}), ip_allowlist({"10.0.0.2"})],
+            [nonce_matches("n1"), nonce_matches("n2")],
+            [cidr_allowlist(["10.0.0.0/24"]), cidr_allowlist(["10.0.1.0/24"])],
+            [cidr_allowlist(["10.0.0.0/24"]), ip_allowlist({"10.0.1.1"})],
+        ):
+            compiled = compile_caveats(caveats)
+            self.assertTrue(compiled.unsatisfiable)
+            self.assertFalse(compiled.allows(self._ctx()))
+
+    def test_custom_caveats_fall_through(self) -> None:
+        custom = Caveat(id="custom", predicate=lambda ctx: ctx.method == "GET")
+        compiled = compile_caveats([nonce_matches("n1"), custom])
+        self.assertEqual(compiled.rest, (custom,))
+        signing_key = b"test-key"
+        token = issue_token(
+            permissions={("read", "r")},
+            exp=self.now + timedelta(minutes=5),
+            aud="aud1",
+            caveats=[nonce_matches("n1"), custom],
+            holder_key_fingerprint="fp1",
+            signing_key=signing_key,
+            now=self.now,
+        )
+        proof = {"holder_key_fingerprint": "fp1"}
+        self.assertTrue(validate_request(token, self._ctx(method="GET"), proof, signing_key).allowed)
+        self.assertEqual(
+            validate_request(token, self._ctx(method="PUT"), proof, signing_key).reason, "caveat_failed"
+        )
+        self.assertIs(token.compiled_caveats(), token.compiled_caveats())
+
+
 if __name__ == "__main__":
     unittest.main()
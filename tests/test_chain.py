@@ -0,0 +1,167 @@
+import asyncio
+import base64
+import os
+import sys
+import unittest
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.async_validator import async_validate_request
+from proxion_core.attenuation import attenuate, derive_token
+from proxion_core.cache import VerifiedTokenCache
+from proxion_core.caveats import ip_allowlist, nonce_matches
+from proxion_core.chain import (
+    ChainedToken,
+    ChainPrefixCache,
+    decode_chain,
+    encode_chain,
+    extend_chain,
+    verify_chain,
+)
+from proxion_core.context import RequestContext
+from proxion_core.errors import AttenuationError, TokenError
+from proxion_core.revocation import RevocationList
+from proxion_core.tokens import ALG_HMAC_SHA256_BINARY, issue_token, verify_integrity
+from proxion_core.validator import validate_many, validate_request
+
+
+def _raw(signature: str) -> bytes:
+    return base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4))
+
+
+class ChainedTokenTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.signing_key = b"test-key"
+        self.now = datetime.now(timezone.utc)
+        self.root = issue_token(
+            permissions={("read", "/data/"), ("write", "/data/"), ("read", "/docs/")},
+            exp=self.now + timedelta(minutes=5),
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=self.signing_key,
+            now=self.now,
+        )
+        self.proof = {"holder_key_fingerprint": "fp1"}
+
+    def test_offline_attenuation_validates(self) -> None:
+        child = attenuate(self.root, {("read", "/data/"), ("read", "/docs/")}, [ip_allowlist({"10.0.0.1"})], self.now)
+        grandchild = attenuate(child, {("read", "/data/")}, [nonce_matches("n1")], self.now)
+        self.assertEqual(grandchild.token_id, self.root.token_id)
+        self.assertEqual(len(grandchild.caveats), 2)
+        self.assertTrue(verify_integrity(grandchild, self.signing_key))
+        ok = RequestContext("read", "/data/a", "aud1", self.now, ip="10.0.0.1", device_nonce="n1")
+        self.assertTrue(validate_request(grandchild, ok, self.proof, self.signing_key).allowed)
+        denied = RequestContext("read", "/docs/a", "aud1", self.now, ip="10.0.0.1", device_nonce="n1")
+        self.assertEqual(
+            validate_request(grandchild, denied, self.proof, self.signing_key).reason, "permission_missing"
+        )
+
+    def test_binary_root(self) -> None:
+        root = issue_token(
+            permissions={("read", "/data/")},
+            exp=self.now + timedelta(minutes=5),
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=self.signing_key,
+            now=self.now,
+            alg=ALG_HMAC_SHA256_BINARY,
+        )
+        child = attenuate(root, {("read", "/data/")}, [nonce_matches("n1")], self.now)
+        self.assertTrue(verify_chain(child, self.signing_key))
+
+    def test_tampering_is_detected(self) -> None:
+        child = attenuate(self.root, {("read", "/data/")}, [ip_allowlist({"10.0.0.1"})], self.now)
+        stripped = ChainedToken(self.root, child.permissions, (), child.signature)
+        with self.assertRaises(TokenError):
+            verify_chain(stripped, self.signing_key)
+        with self.assertRaises(TokenError):
+            verify_chain(child, b"wrong-key")
+        # A holder can MAC any link, so a widening link must fail verification.
+        widened = extend_chain(child, frozenset({("write", "/data/")}), ())
+        with self.assertRaises(TokenError):
+            verify_chain(widened, self.signing_key)
+        with self.assertRaises(AttenuationError):
+            attenuate(child, {("write", "/data/")}, [], self.now)
+
+    def test_derive_token_rejects_chained_parent(self) -> None:
+        child = attenuate(self.root, {("read", "/data/")}, [], self.now)
+        with self.assertRaisesRegex(AttenuationError, "attenuate"):
+            derive_token(child, {("read", "/data/")}, [], self.now, self.signing_key)
+
+    def test_wire_round_trip_without_intermediate_signatures(self) -> None:
+        child = attenuate(self.root, {("read", "/data/"), ("read", "/docs/")}, [nonce_matches("n1")], self.now)
+        grandchild = attenuate(child, {("read", "/data/")}, [ip_allowlist({"10.0.0.1"})], self.now)
+        wire = encode_chain(grandchild)
+        for signature in (child.signature, self.root.signature):
+            self.assertNotIn(_raw(signature), wire)
+        rebuilt = decode_chain(wire)
+        self.assertTrue(verify_chain(rebuilt, self.signing_key))
+        self.assertEqual(rebuilt.revocation_ids(), grandchild.revocation_ids())
+        tampered = bytearray(wire)
+        tampered[-1] ^= 1
+        with self.assertRaises(TokenError):
+            verify_chain(decode_chain(tampered), self.signing_key)
+        with self.assertRaises(TokenError):
+            decode_chain(wire[:-40])
+
+    def test_prefix_cache_shares_parent_work(self) -> None:
+        parent = attenuate(self.root, {("read", "/data/"), ("read", "/docs/")}, [], self.now)
+        wires = [
+            encode_chain(attenuate(parent, {("read", "/data/")}, [nonce_matches(f"n{i}")], self.now))
+            for i in range(3)
+        ]
+        prefixes = ChainPrefixCache()
+        first = decode_chain(wires[0], prefixes=prefixes)
+        verify_chain(first, self.signing_key, prefixes)
+        self.assertEqual(len(prefixes), 3)
+        for wire in wires[1:]:
+            sibling = decode_chain(wire, prefixes=prefixes)
+            self.assertIs(sibling.parent, first.parent)
+            verify_chain(sibling, self.signing_key, prefixes)
+        self.assertEqual(len(prefixes), 5)
+        siblings = [decode_chain(wire) for wire in wires]
+        cache = VerifiedTokenCache()
+        for sibling in siblings:
+            self.assertTrue(cache.verify(sibling, self.signing_key, self.now))
+        self.assertEqual(cache.stats().misses, 3)
+
+    def test_revoking_root_revokes_chain(self) -> None:
+        child = attenuate(self.root, {("read", "/data/")}, [], self.now)
+        revocations = RevocationList()
+        revocations.revoke(self.root, self.now)
+        ctx = RequestContext("read", "/data/a", "aud1", self.now)
+        decision = validate_request(child, ctx, self.proof, self.signing_key, revocation_list=revocations)
+        self.assertEqual(decision.reason, "revoked")
+
+    def test_revoking_child_leaves_root_and_siblings_valid(self) -> None:
+        child = attenuate(self.root, {("read", "/data/")}, [], self.now)
+        sibling = attenuate(self.root, {("read", "/data/")}, [nonce_matches("n1")], self.now)
+        grandchild = attenuate(child, {("read", "/data/")}, [nonce_matches("n2")], self.now)
+        self.assertEqual(len({self.root.revocation_id(), child.revocation_id(), sibling.revocation_id()}), 3)
+        revocations = RevocationList()
+        revocations.revoke(child, self.now)
+        ctx = RequestContext("read", "/data/a", "aud1", self.now, device_nonce="n1")
+        grandchild_ctx = RequestContext("read", "/data/a", "aud1", self.now, device_nonce="n2")
+        requests = [
+            (self.root, ctx, self.proof),
+            (sibling, ctx, self.proof),
+            (child, ctx, self.proof),
+            (decode_chain(encode_chain(grandchild)), grandchild_ctx, self.proof),
+        ]
+        expected = [None, None, "revoked", "revoked"]
+        decisions = [
+            validate_request(t, c, p, self.signing_key, revocation_list=revocations) for t, c, p in requests
+        ]
+        self.assertEqual([d.reason for d in decisions], expected)
+        batch = validate_many(requests, self.signing_key, revocation_list=revocations)
+        self.assertEqual([d.reason for d in batch], expected)
+        for (token, ctx, proof), reason in zip(requests, expected):
+            decision = asyncio.run(async_validate_request(token, ctx, proof, self.signing_key, revocations))
+            self.assertEqual(decision.reason, reason)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import unittest
+from dataclasses import replace
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.attenuation import derive_token
+from proxion_core.caveats import caveat_from_id, ip_allowlist, nonce_matches, time_window
+from proxion_core.context import Caveat, RequestContext
+from proxion_core.errors import TokenError
+from proxion_core.tokens import (
+    ALG_HMAC_SHA256_BINARY,
+    decode_token,
+    encode_token,
+    issue_token,
+    upgrade_token,
+    verify_integrity,
+)
+from proxion_core.validator import validate_request
+
+
+class BinaryEncodingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.signing_key = b"test-key"
+        self.now = datetime.now(timezone.utc)
+        self.exp = self.now + timedelta(minutes=5)
+        self.caveats = [
+            ip_allowlist({"127.0.0.1", "10.0.0.1"}),
+            time_window(self.now.timestamp() - 5, self.now.timestamp() + 60),
+            nonce_matches("n:1"),
+        ]
+
+    def _issue(self, alg=ALG_HMAC_SHA256_BINARY, caveats=None):
+        return issue_token(
+            permissions={("read", "/data/"), ("write", "/data/x"), ("read", "/docs/")},
+            exp=self.exp,
+            aud="aud1",
+            caveats=self.caveats if caveats is None else caveats,
+            holder_key_fingerprint="fp1",
+            signing_key=self.signing_key,
+            now=self.now,
+            alg=alg,
+        )
+
+    def test_round_trip_verifies_and_validates(self) -> None:
+        token = self._issue()
+        self.assertEqual(token.exp.microsecond, 0)
+        decoded = decode_token(memoryview(encode_token(token)))
+        self.assertEqual(decoded.permissions, token.permissions)
+        self.assertEqual([c.id for c in decoded.caveats], [c.id for c in token.caveats])
+        self.assertEqual(decoded.revocation_id(), token.revocation_id())
+        self.assertTrue(verify_integrity(decoded, self.signing_key))
+        ctx = RequestContext("read", "/data/a", "aud1", self.now, ip="127.0.0.1", device_nonce="n:1")
+        self.assertTrue(validate_request(decoded, ctx, {"holder_key_fingerprint": "fp1"}, self.signing_key).allowed)
+
+    def test_encoding_is_deterministic(self) -> None:
+        a = self._issue()
+        b = replace(a)
+        self.assertEqual(a.signing_input(), b.signing_input())
+
+    def test_tampering_detected(self) -> None:
+        data = bytearray(encode_token(self._issue()))
+        data[data.index(b"aud1")] ^= 1
+        with self.assertRaises(TokenError):
+            verify_integrity(decode_token(bytes(data)), self.signing_key)
+        with self.assertRaises(TokenError):
+            decode_token(b"PXT\x01garbage" + bytes(32))
+
+    def test_unknown_caveat_needs_resolver(self) -> None:
+        custom = Caveat("custom", lambda ctx: True)
+        data = encode_token(self._issue(caveats=[custom]))
+        with self.assertRaises(TokenError):
+            decode_token(data)
+        decoded = decode_token(data, caveat_resolver=lambda cid: custom if cid == "custom" else None)
+        self.assertIs(decoded.caveats[0], custom)
+
+    def test_upgrade_json_token_is_one_way(self) -> None:
+        legacy = self._issue(alg="HMAC-SHA256")
+        with self.assertRaises(TokenError):
+            encode_token(legacy)
+        upgraded = upgrade_token(legacy, self.signing_key, now=self.now)
+        self.assertEqual(upgraded.alg, ALG_HMAC_SHA256_BINARY)
+        self.assertEqual(upgraded.token_id, legacy.token_id)
+        self.assertTrue(verify_integrity(decode_token(encode_token(upgraded)), self.signing_key))
+
+    def test_derived_token_keeps_binary_form(self) -> None:
+        child = derive_token(self._issue(), {("read", "/docs/")}, [], self.now, self.signing_key)
+        self.assertEqual(child.alg, ALG_HMAC_SHA256_BINARY)
+
+    def test_caveat_from_id_keeps_id(self) -> None:
+        self.assertEqual(caveat_from_id("time_window:1:2").id, "time_window:1:2")
+        self.assertIsNone(caveat_from_id("custom"))
+        self.assertIsNone(caveat_from_id("time_window:x"))
+
+
+if __name__ == "__main__":
+    unittest.main()
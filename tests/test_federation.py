@@ -1,6 +1,19 @@
+import hashlib
+import hmac
+import os
+import sys
 import unittest
 import json
-from proxion_core.federation import FederationInvite, InviteAcceptance, RelationshipCertificate, Capability
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.federation import (
+    Capability,
+    FederationInvite,
+    InviteAcceptance,
+    RelationshipCertificate,
+    verify_many,
+)
 
 class MockKey:
     def sign(self, data):
@@ -9,6 +22,14 @@ class MockKey:
 def mock_verifier(pubkey, sig, data):
     return sig == b"mock_signature"
 
+class MessageKey:
+    """Signs the message itself, so verification depends on the content."""
+    def sign(self, data):
+        return hmac.new(b"identity", data, hashlib.sha256).digest()
+
+def message_verifier(pubkey, sig, data):
+    return hmac.compare_digest(sig, MessageKey().sign(data))
+
 class TestFederation(unittest.TestCase):
     def test_invite_creation(self):
         key = MockKey()
@@ -46,6 +67,113 @@ class TestFederation(unittest.TestCase):
         )
         cert.sign(MockKey())
         self.assertTrue(cert.signature)
+    def test_canonical_bytes_cached_and_invalidated(self):
+        cert = RelationshipCertificate(
+            issuer="alice",
+            subject="bob",
+            capabilities=[Capability(with_="stash://alice/shared/bob", can="crud/read")],
+            wireguard={"ip": "10.99.0.2"}
+        )
+        data = cert.to_dict()
+        del data["signature"]
+        self.assertEqual(cert.canonical_bytes(), json.dumps(data, sort_keys=True).encode())
+        first = cert.canonical_bytes()
+        cert.sign(MockKey())
+        self.assertIs(cert.canonical_bytes(), first)
+
+        cert.subject = "carol"
+        self.assertIn(b'"carol"', cert.canonical_bytes())
+        cert.capabilities.append(Capability(with_="stash://alice/photos", can="crud/read"))
+        self.assertNotIn(b"photos", cert.canonical_bytes())
+        cert.invalidate()
+        self.assertIn(b"photos", cert.canonical_bytes())
+
+    def test_nested_mutation_after_signing_fails_verification(self):
+        cert = RelationshipCertificate(
+            issuer="alice",
+            subject="bob",
+            capabilities=[Capability(with_="stash://alice/shared/bob", can="crud/read")],
+            wireguard={"ip": "10.99.0.2"}
+        )
+        cert.sign(MessageKey())
+        self.assertTrue(cert.verify(message_verifier))
+        cert.capabilities.append(Capability(with_="stash://alice/private", can="crud/write"))
+        self.assertFalse(cert.verify(message_verifier))
+        self.assertEqual(verify_many([cert], verifier=message_verifier)[0].reason, "bad_signature")
+        cert.capabilities.pop()
+        cert.capabilities[0].can = "crud/*"
+        self.assertFalse(cert.verify(message_verifier))
+        cert.capabilities[0].can = "crud/read"
+        cert.wireguard["ip"] = "10.99.0.3"
+        self.assertFalse(cert.verify(message_verifier))
+        cert.wireguard["ip"] = "10.99.0.2"
+        self.assertTrue(cert.verify(message_verifier))
+
+        invite = FederationInvite(
+            issuer={"public_key": "alice_pub", "did": "did:key:alice"},
+            endpoint_hints=["udp://1.2.3.4"],
+            capabilities=[Capability(with_="stash://alice/files", can="read", caveats={"quota": 100})]
+        )
+        invite.sign(MessageKey())
+        invite.capabilities[0].caveats["quota"] = 10_000
+        self.assertFalse(invite.verify(message_verifier))
+
+    def test_acceptance_and_certificate_verify(self):
+        acc = InviteAcceptance(
+            invitation_id="123",
+            responder={"public_key": "bob_pub"},
+            challenge_response="signed_marker"
+        )
+        self.assertFalse(acc.verify(mock_verifier))
+        acc.sign(MockKey())
+        seen = []
+        self.assertTrue(acc.verify(lambda pub, sig, data: seen.append(pub) or True))
+        self.assertEqual(seen, ["bob_pub"])
+
+    def test_verify_many(self):
+        now = 1_700_000_000
+        def cert(**kwargs):
+            c = RelationshipCertificate(
+                issuer="alice", subject="bob", capabilities=[], wireguard={},
+                created_at=now, expires_at=now + 60, **kwargs
+            )
+            c.sign(MockKey())
+            return c
+
+        good = cert()
+        expired = cert()
+        expired.expires_at = now
+        unsigned = cert()
+        unsigned.signature = None
+        forged = cert()
+        forged.signature = b"forged".hex()
+        garbled = cert()
+        garbled.signature = "zz"
+        items = [good, expired, unsigned, forged, garbled]
+
+        calls = []
+        def batch(requests):
+            calls.append(len(requests))
+            return [mock_verifier(*r) for r in requests]
+
+        results = verify_many(items, batch_verifier=batch, now=now)
+        self.assertEqual(
+            [r.reason for r in results],
+            [None, "expired", "unsigned", "bad_signature", "malformed"],
+        )
+        self.assertEqual([r.valid for r in results], [True, False, False, False, False])
+        self.assertEqual(calls, [2])
+        self.assertEqual(
+            verify_many(items, verifier=mock_verifier, now=now),
+            results,
+        )
+
+        def broken(requests):
+            return [True]
+        self.assertEqual([r.reason for r in verify_many([good, forged], batch_verifier=broken, now=now)],
+                         ["error", "error"])
+        with self.assertRaises(ValueError):
+            verify_many(items, now=now)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.federation import Capability
+from proxion_core.federation_matcher import CapabilityMatcher
+
+
+class CapabilityMatcherTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.shared = Capability(with_="stash://alice/shared/", can="crud/read")
+        self.inbox = Capability(with_="stash://*/inbox", can="crud/*")
+        self.bob = Capability(with_="stash://alice/*/bob", can="*")
+        self.matcher = CapabilityMatcher([self.shared, self.inbox, self.bob])
+
+    def test_resource_coverage(self) -> None:
+        matcher = self.matcher
+        self.assertTrue(matcher.allows("crud/read", "stash://alice/shared"))
+        self.assertTrue(matcher.allows("crud/read", "stash://alice/shared/bob/notes.txt"))
+        self.assertFalse(matcher.allows("crud/read", "stash://alice/sharedx"))
+        self.assertFalse(matcher.allows("crud/read", "stash://alice"))
+        self.assertFalse(matcher.allows("crud/read", "https://alice/shared"))
+
+    def test_wildcards_and_namespaces(self) -> None:
+        matcher = self.matcher
+        self.assertTrue(matcher.allows("crud/write", "stash://carol/inbox/1"))
+        self.assertTrue(matcher.allows("crud/a/b", "stash://carol/inbox"))
+        self.assertFalse(matcher.allows("crudx", "stash://carol/inbox"))
+        self.assertFalse(matcher.allows("crud/write", "stash://carol/outbox"))
+        self.assertTrue(matcher.allows("share", "stash://alice/photos/bob"))
+        self.assertFalse(matcher.allows("share", "stash://alice/photos/carol"))
+
+    def test_literal_mode(self) -> None:
+        matcher = CapabilityMatcher([self.inbox, self.bob], patterns=False)
+        self.assertFalse(matcher.allows("crud/read", "stash://carol/inbox"))
+        self.assertTrue(matcher.allows("crud/*", "stash://*/inbox/1"))
+        self.assertFalse(matcher.allows("share", "stash://alice/photos/bob"))
+        self.assertTrue(matcher.allows("*", "stash://alice/*/bob"))
+        self.assertTrue(matcher.discard(self.bob))
+        self.assertTrue(matcher.discard(self.inbox))
+        self.assertTrue(matcher._root.is_empty())
+
+    def test_bulk_queries(self) -> None:
+        self.assertEqual(
+            self.matcher.matching("stash://alice/shared/bob/x"), [self.shared, self.bob]
+        )
+        self.assertEqual(
+            self.matcher.matching_many(
+                ["stash://alice/shared/bob", "stash://dave/inbox", "stash://alice/shared/bob"],
+                action="crud/read",
+            ),
+            [[self.shared, self.bob], [self.inbox], [self.shared, self.bob]],
+        )
+
+    def test_unsafe_segments_never_match(self) -> None:
+        matcher = self.matcher
+        for resource in (
+            "stash://alice/shared/../private",
+            "stash://alice/shared/./x",
+            "stash://alice/shared/%2e%2E/private",
+            "stash://alice/shared/.%2e",
+            "stash://alice/shared/x%2F..%2F..%2Fprivate",
+            "stash://alice/shared/x%2f..%2fprivate",
+            "stash://alice/shared/x%5C..%5cprivate",
+            "stash://alice/shared/x\\..\\private",
+            "stash://alice//shared/x",
+            "stash://alice/shared//x",
+            "stash://../shared/x",
+        ):
+            self.assertFalse(matcher.allows("crud/read", resource), resource)
+            self.assertEqual(matcher.matching(resource), [], resource)
+        self.assertTrue(matcher.allows("crud/read", "stash://alice/shared/..x"))
+        self.assertTrue(matcher.allows("crud/read", "stash://alice/shared/a%20b"))
+
+    def test_add_rejects_unsafe_resources(self) -> None:
+        matcher = CapabilityMatcher()
+        for resource in ("stash://alice/shared/..", "stash://alice/./shared", "stash://alice//shared"):
+            unsafe = Capability(with_=resource, can="crud/read")
+            with self.assertRaises(ValueError):
+                matcher.add(unsafe)
+            self.assertFalse(matcher.discard(unsafe))
+        self.assertEqual(len(matcher), 0)
+
+    def test_values_and_discard(self) -> None:
+        matcher = CapabilityMatcher()
+        matcher.add(self.inbox, "cert-1")
+        matcher.add(self.inbox, "cert-2")
+        self.assertEqual(matcher.matching("stash://x/inbox", "crud/read"), ["cert-1", "cert-2"])
+        self.assertTrue(matcher.discard(self.inbox, "cert-1"))
+        self.assertFalse(matcher.discard(self.inbox, "cert-1"))
+        self.assertEqual(matcher.matching("stash://x/inbox"), ["cert-2"])
+        self.assertTrue(matcher.discard(self.inbox, "cert-2"))
+        self.assertEqual(len(matcher), 0)
+        self.assertTrue(matcher._root.is_empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
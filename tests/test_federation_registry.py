@@ -0,0 +1,127 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.federation import Capability, RelationshipCertificate
+from proxion_core.federation_registry import CertificateRegistry
+
+NOW = 1_700_000_000
+
+
+def _cert(issuer, subject, grants, expires_in=3600, **kwargs):
+    return RelationshipCertificate(
+        issuer=issuer,
+        subject=subject,
+        capabilities=[Capability(with_=resource, can=action) for action, resource in grants],
+        wireguard={"ip": "10.99.0.2"},
+        created_at=NOW,
+        expires_at=NOW + expires_in,
+        **kwargs,
+    )
+
+
+class CertificateRegistryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = CertificateRegistry()
+        self.shared = _cert("alice", "bob", [("crud/read", "stash://alice/shared/")])
+        self.photos = _cert("carol", "bob", [("crud/write", "stash://carol/photos")], expires_in=60)
+        self.other = _cert("alice", "dave", [("crud/read", "stash://alice/")])
+        self.registry.add_many([self.shared, self.photos, self.other])
+
+    def test_literal_matching_by_default(self) -> None:
+        registry = self.registry
+        registry.add(_cert("erin", "bob", [("crud/*", "stash://erin/*/public"), ("*", "stash://erin/")]))
+        self.assertFalse(registry.allows("bob", "crud/delete", "stash://erin/pics/public/1", now=NOW))
+        self.assertFalse(registry.allows("bob", "crud/*", "stash://erin/pics/public/1", now=NOW))
+        self.assertTrue(registry.allows("bob", "crud/*", "stash://erin/*/public/1", now=NOW))
+        self.assertFalse(registry.allows("bob", "crud/read", "stash://erin/x", now=NOW))
+        self.assertTrue(registry.allows("bob", "*", "stash://erin/x", now=NOW))
+
+    def test_wildcards_and_action_namespaces(self) -> None:
+        registry = CertificateRegistry(patterns=True)
+        registry.add(_cert("erin", "bob", [("crud/*", "stash://erin/*/public")]))
+        self.assertTrue(registry.allows("bob", "crud/delete", "stash://erin/pics/public/1", now=NOW))
+        self.assertFalse(registry.allows("bob", "share", "stash://erin/pics/public/1", now=NOW))
+        self.assertFalse(registry.allows("bob", "crud/read", "stash://erin/pics/private", now=NOW))
+        restored = CertificateRegistry.restore(registry.snapshot(), patterns=True)
+        self.assertTrue(restored.allows("bob", "crud/delete", "stash://erin/pics/public/1", now=NOW))
+        self.assertFalse(
+            CertificateRegistry.restore(registry.snapshot()).allows(
+                "bob", "crud/delete", "stash://erin/pics/public/1", now=NOW
+            )
+        )
+
+    def test_allows_by_subject_action_and_prefix(self) -> None:
+        registry = self.registry
+        self.assertTrue(registry.allows("bob", "crud/read", "stash://alice/shared/bob", now=NOW))
+        self.assertTrue(registry.allows("bob", "crud/read", "stash://alice/shared", now=NOW))
+        self.assertFalse(registry.allows("bob", "crud/read", "stash://alice/sharedx", now=NOW))
+        self.assertFalse(registry.allows("bob", "crud/write", "stash://alice/shared/x", now=NOW))
+        self.assertFalse(registry.allows("bob", "crud/read", "stash://alice/private", now=NOW))
+        self.assertTrue(registry.allows("dave", "crud/read", "stash://alice/private", now=NOW))
+        self.assertFalse(
+            registry.allows("bob", "crud/read", "stash://alice/shared/x", now=NOW, issuer="carol")
+        )
+        self.assertEqual(
+            registry.certificates_for("bob", "crud/write", "stash://carol/photos/2024", now=NOW),
+            [self.photos],
+        )
+
+    def test_dot_segments_never_widen_a_grant(self) -> None:
+        registry = self.registry
+        for resource in (
+            "stash://alice/shared/../private",
+            "stash://alice/shared/./x",
+            "stash://alice//shared/x",
+            "stash://alice/shared/x%2F..%2F..%2Fprivate",
+        ):
+            self.assertFalse(registry.allows("bob", "crud/read", resource, now=NOW), resource)
+        unsafe = _cert("alice", "erin", [("crud/read", "stash://alice/shared/../private")])
+        with self.assertRaises(ValueError):
+            registry.add(unsafe)
+        self.assertNotIn(unsafe.certificate_id, registry)
+        self.assertEqual(registry.by_subject("erin"), [])
+
+    def test_issuer_and_subject_indexes(self) -> None:
+        self.assertEqual(
+            {c.certificate_id for c in self.registry.by_issuer("alice")},
+            {self.shared.certificate_id, self.other.certificate_id},
+        )
+        self.assertEqual(len(self.registry.by_subject("bob")), 2)
+        self.assertTrue(self.registry.remove(self.shared.certificate_id))
+        self.assertEqual(self.registry.by_issuer("alice"), [self.other])
+        self.assertFalse(self.registry.allows("bob", "crud/read", "stash://alice/shared/x", now=NOW))
+
+    def test_expiry(self) -> None:
+        later = NOW + 120
+        self.assertFalse(self.registry.allows("bob", "crud/write", "stash://carol/photos", now=later))
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(self.registry.evict_expired(later), 1)
+        self.assertNotIn(self.photos.certificate_id, self.registry)
+        self.assertEqual(self.registry.by_issuer("carol"), [])
+
+    def test_replacing_keeps_indexes_consistent(self) -> None:
+        renewed = _cert(
+            "carol", "bob", [("crud/read", "stash://carol/photos")],
+            expires_in=7200, certificate_id=self.photos.certificate_id,
+        )
+        self.registry.add(renewed)
+        self.assertEqual(len(self.registry), 3)
+        self.assertFalse(self.registry.allows("bob", "crud/write", "stash://carol/photos", now=NOW))
+        self.assertEqual(self.registry.evict_expired(NOW + 120), 0)
+        self.assertTrue(self.registry.allows("bob", "crud/read", "stash://carol/photos", now=NOW + 120))
+
+    def test_snapshot_round_trip(self) -> None:
+        self.shared.signature = "aa" * 32
+        restored = CertificateRegistry.restore(self.registry.snapshot(), now=NOW + 120)
+        self.assertEqual(len(restored), 2)
+        self.assertTrue(restored.allows("bob", "crud/read", "stash://alice/shared/bob", now=NOW))
+        copy = restored.get(self.shared.certificate_id)
+        self.assertEqual(copy.signature, self.shared.signature)
+        self.assertEqual(copy.canonical_bytes(), self.shared.canonical_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.ipranges import IpRangeSet
+
+
+class IpRangeSetTests(unittest.TestCase):
+    def test_membership_across_families(self) -> None:
+        ranges = IpRangeSet(["10.0.0.0/22", "192.168.1.5", "2001:db8::/32"])
+        self.assertIn("10.0.3.255", ranges)
+        self.assertNotIn("10.0.4.0", ranges)
+        self.assertIn("192.168.1.5", ranges)
+        self.assertNotIn("192.168.1.6", ranges)
+        self.assertIn("2001:db8:ffff::1", ranges)
+        self.assertNotIn("2001:db9::1", ranges)
+        self.assertIn("::ffff:10.0.0.1", ranges)
+        self.assertNotIn("not-an-ip", ranges)
+        with self.assertRaises(ValueError):
+            ranges.contains("not-an-ip")
+
+    def test_adjacent_ranges_collapse(self) -> None:
+        ranges = IpRangeSet(["10.0.0.0/23", "10.0.2.0/23", "10.0.1.0/24"])
+        self.assertEqual(len(ranges), 1)
+        self.assertEqual([str(n) for n in ranges.networks()], ["10.0.0.0/22"])
+
+    def test_intersection(self) -> None:
+        a = IpRangeSet(["10.0.0.0/16", "2001:db8::/32"])
+        b = IpRangeSet(["10.0.5.0/24", "10.1.0.0/16", "2001:db8:1::/48"])
+        self.assertEqual(a.intersection(b), IpRangeSet(["10.0.5.0/24", "2001:db8:1::/48"]))
+        self.assertFalse(a.intersection(IpRangeSet(["172.16.0.0/12"])))
+
+    def test_encode_round_trip_is_compact(self) -> None:
+        ranges = IpRangeSet(f"10.{i // 256}.{i % 256}.0/24" for i in range(0, 20_000, 2))
+        text = ranges.encode()
+        self.assertEqual(IpRangeSet.decode(text), ranges)
+        self.assertLess(len(text), 10 * len(ranges))
+        for bad in ("", "AAAA", text + "AA"):
+            with self.assertRaises(ValueError):
+                IpRangeSet.decode(bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
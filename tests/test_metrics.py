@@ -0,0 +1,152 @@
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.async_validator import async_validate_request
+from proxion_core.caveats import nonce_matches
+from proxion_core.context import RequestContext
+from proxion_core.metrics import Histogram, InMemoryMetrics
+from proxion_core.tokens import issue_token
+from proxion_core.validator import (
+    DEFAULT_PIPELINE,
+    validate_many,
+    validate_request,
+)
+
+SIGNING_KEY = b"test-key"
+PROOF = {"holder_key_fingerprint": "fp1"}
+
+
+def _token(now, caveats=()):
+    return issue_token(
+        permissions={("read", "resource"), ("write", "resource")},
+        exp=now + timedelta(minutes=5),
+        aud="aud1",
+        caveats=list(caveats),
+        holder_key_fingerprint="fp1",
+        signing_key=SIGNING_KEY,
+        now=now,
+    )
+
+
+class HistogramTests(unittest.TestCase):
+    def test_buckets_and_quantiles(self) -> None:
+        histogram = Histogram((1, 10, 100))
+        for value in (0, 1, 5, 50, 500):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot.counts, (2, 1, 1, 1))
+        self.assertEqual(snapshot.count, 5)
+        self.assertEqual(snapshot.total, 556)
+        self.assertEqual(snapshot.quantile(0.4), 1)
+        self.assertEqual(snapshot.quantile(0.8), 100)
+        self.assertEqual(snapshot.quantile(1.0), float("inf"))
+
+
+class ValidatorMetricsTests(unittest.TestCase):
+    def test_allow_records_every_stage(self) -> None:
+        now = datetime.now(timezone.utc)
+        metrics = InMemoryMetrics()
+        ctx = RequestContext("read", "resource", "aud1", now)
+        decision = validate_request(_token(now), ctx, PROOF, SIGNING_KEY, metrics=metrics)
+        self.assertTrue(decision.allowed)
+        self.assertEqual(set(metrics.stage_latency()), set(DEFAULT_PIPELINE.names))
+        self.assertEqual(metrics.decisions(), {"allow": 1})
+        self.assertEqual(metrics.permission_counts().count, 1)
+        self.assertEqual(metrics.permission_counts().total, 2)
+
+    def test_deny_reasons_are_counted(self) -> None:
+        now = datetime.now(timezone.utc)
+        metrics = InMemoryMetrics()
+        token = _token(now, [nonce_matches("n-1")])
+        requests = [
+            (token, RequestContext("read", "resource", "aud1", now, device_nonce="n-1"), PROOF),
+            (token, RequestContext("read", "resource", "other", now, device_nonce="n-1"), PROOF),
+            (token, RequestContext("read", "resource", "aud1", now, device_nonce="n-2"), PROOF),
+        ]
+        decisions = validate_many(requests, SIGNING_KEY, metrics=metrics)
+        self.assertEqual(
+            metrics.decisions(),
+            {"allow": 1, decisions[1].reason: 1, decisions[2].reason: 1},
+        )
+        self.assertEqual(metrics.caveat_counts().total, 3)
+        # The audience mismatch stops before the integrity stage.
+        self.assertEqual(metrics.stage_latency()["integrity"].count, 2)
+
+    def test_stage_errors_are_typed(self) -> None:
+        now = datetime.now(timezone.utc)
+        metrics = InMemoryMetrics()
+
+        def broken(token, ctx, proof, env):
+            raise KeyError("boom")
+
+        pipeline = DEFAULT_PIPELINE.with_stage("broken", broken, before="revocation")
+        ctx = RequestContext("read", "resource", "aud1", now)
+        decision = validate_request(
+            _token(now), ctx, PROOF, SIGNING_KEY, pipeline=pipeline, metrics=metrics
+        )
+        self.assertEqual(decision.reason, "error")
+        self.assertEqual(metrics.stage_errors(), {("broken", "KeyError"): 1})
+        self.assertEqual(metrics.decisions(), {"error": 1})
+
+    def test_failing_sink_does_not_change_decisions(self) -> None:
+        now = datetime.now(timezone.utc)
+
+        class Exploding(InMemoryMetrics):
+            def decision(self, allowed, reason):
+                raise RuntimeError("sink down")
+
+        ctx = RequestContext("read", "resource", "aud1", now)
+        decision = validate_request(_token(now), ctx, PROOF, SIGNING_KEY, metrics=Exploding())
+        self.assertTrue(decision.allowed)
+
+    def test_failing_stage_sink_does_not_change_decisions(self) -> None:
+        now = datetime.now(timezone.utc)
+
+        class Exploding(InMemoryMetrics):
+            def stage(self, name, seconds):
+                raise RuntimeError("sink down")
+
+            def stage_error(self, name, exc):
+                raise RuntimeError("sink down")
+
+        def broken(token, ctx, proof, env):
+            raise KeyError("boom")
+
+        token = _token(now)
+        allowed = RequestContext("read", "resource", "aud1", now)
+        denied = RequestContext("delete", "resource", "aud1", now)
+        metrics = Exploding()
+        self.assertTrue(validate_request(token, allowed, PROOF, SIGNING_KEY, metrics=metrics).allowed)
+        self.assertEqual(
+            validate_request(token, denied, PROOF, SIGNING_KEY, metrics=metrics).reason,
+            "permission_missing",
+        )
+        pipeline = DEFAULT_PIPELINE.with_stage("broken", broken)
+        self.assertEqual(
+            validate_request(token, allowed, PROOF, SIGNING_KEY, pipeline=pipeline, metrics=metrics).reason,
+            "error",
+        )
+        decisions = validate_many(
+            [(token, allowed, PROOF), (token, denied, PROOF)], SIGNING_KEY, metrics=metrics
+        )
+        self.assertEqual([d.reason for d in decisions], [None, "permission_missing"])
+        self.assertEqual(metrics.decisions(), {"allow": 2, "permission_missing": 2, "error": 1})
+
+    def test_async_records_decision(self) -> None:
+        now = datetime.now(timezone.utc)
+        metrics = InMemoryMetrics()
+        ctx = RequestContext("read", "resource", "other", now)
+        decision = asyncio.run(
+            async_validate_request(_token(now), ctx, PROOF, SIGNING_KEY, metrics=metrics)
+        )
+        self.assertFalse(decision.allowed)
+        self.assertEqual(metrics.decisions(), {decision.reason: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
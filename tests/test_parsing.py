@@ -0,0 +1,125 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.caveats import ip_allowlist
+from proxion_core.context import RequestContext
+from proxion_core.errors import TokenError
+from proxion_core.parsing import LazyToken, parse_token
+from proxion_core.revocation import RevocationList
+from proxion_core.tokens import ALG_HMAC_SHA256_BINARY, encode_token, issue_token
+from proxion_core.validator import validate_request, validate_serialized
+
+
+class LazyParsingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.signing_key = b"test-key"
+        self.now = datetime.now(timezone.utc)
+        self.token = issue_token(
+            permissions={("read", "/data/"), ("write", "/data/x")},
+            exp=self.now + timedelta(minutes=5),
+            aud="aud1",
+            caveats=[ip_allowlist({"127.0.0.1"})],
+            holder_key_fingerprint="fp1",
+            signing_key=self.signing_key,
+            now=self.now,
+            alg=ALG_HMAC_SHA256_BINARY,
+        )
+        self.wire = encode_token(self.token)
+        self.proof = {"holder_key_fingerprint": "fp1"}
+
+    def _ctx(self, **overrides) -> RequestContext:
+        values = dict(action="read", resource="/data/a", aud="aud1", now=self.now, ip="127.0.0.1")
+        values.update(overrides)
+        return RequestContext(**values)
+
+    def test_parse_matches_issued_token(self) -> None:
+        lazy = parse_token(memoryview(self.wire), self.signing_key, now=self.now, aud="aud1")
+        self.assertEqual(lazy.exp, self.token.exp)
+        self.assertEqual(lazy.token_id, self.token.token_id)
+        self.assertEqual(lazy.permissions, self.token.permissions)
+        self.assertEqual([c.id for c in lazy.caveats], [c.id for c in self.token.caveats])
+        self.assertEqual(lazy.revocation_id(), self.token.revocation_id())
+        token = lazy.to_token()
+        self.assertEqual(token.signature, self.token.signature)
+        self.assertEqual(token.signing_input(), self.token.signing_input())
+
+    def test_fields_decode_on_first_access(self) -> None:
+        lazy = LazyToken(self.wire)
+        self.assertIsNone(lazy._head)
+        self.assertEqual(lazy.aud, "aud1")
+        self.assertIsNone(lazy._permissions)
+        self.assertIsNone(lazy._caveats)
+
+    def test_rejects_before_decoding_grants(self) -> None:
+        with self.assertRaises(TokenError):
+            parse_token(self.wire, self.signing_key, now=self.now + timedelta(hours=1))
+        with self.assertRaises(TokenError):
+            parse_token(self.wire, self.signing_key, aud="other")
+        tampered = bytearray(self.wire)
+        tampered[-1] ^= 1
+        with self.assertRaises(TokenError):
+            parse_token(tampered, self.signing_key)
+        with self.assertRaises(TokenError):
+            parse_token(b"garbage" * 10, self.signing_key)
+
+    def test_validate_serialized(self) -> None:
+        self.assertTrue(validate_serialized(self.wire, self._ctx(), self.proof, self.signing_key).allowed)
+        cases = [
+            (self._ctx(now=self.now + timedelta(hours=1)), "expired"),
+            (self._ctx(aud="other"), "audience_mismatch"),
+            (self._ctx(action="delete"), "permission_missing"),
+            (self._ctx(ip="10.0.0.9"), "caveat_failed"),
+        ]
+        for ctx, reason in cases:
+            self.assertEqual(
+                validate_serialized(self.wire, ctx, self.proof, self.signing_key).reason, reason
+            )
+        self.assertEqual(
+            validate_serialized(self.wire, self._ctx(), {}, self.signing_key).reason, "invalid_proof"
+        )
+        self.assertEqual(
+            validate_serialized(self.wire, self._ctx(), self.proof, b"wrong").reason, "error"
+        )
+        revocations = RevocationList()
+        revocations.revoke(self.token, self.now)
+        self.assertEqual(
+            validate_serialized(
+                self.wire, self._ctx(), self.proof, self.signing_key, revocation_list=revocations
+            ).reason,
+            "revoked",
+        )
+
+
+    def test_validate_serialized_matches_validate_request(self) -> None:
+        revocations = RevocationList()
+        revocations.revoke(self.token, self.now)
+        cases = [
+            (self._ctx(action="delete"), self.proof, revocations),
+            (self._ctx(action="delete"), {}, None),
+            (self._ctx(), {}, revocations),
+            (self._ctx(ip="10.0.0.9"), {}, None),
+            (self._ctx(now=self.now + timedelta(hours=1), action="delete"), {}, revocations),
+        ]
+        for ctx, proof, revocation_list in cases:
+            expected = validate_request(
+                self.token, ctx, proof, self.signing_key, revocation_list=revocation_list
+            )
+            actual = validate_serialized(
+                self.wire, ctx, proof, self.signing_key, revocation_list=revocation_list
+            )
+            self.assertEqual(actual, expected)
+        self.assertEqual(
+            [
+                validate_serialized(self.wire, ctx, proof, self.signing_key, revocation_list=r).reason
+                for ctx, proof, r in cases
+            ],
+            ["permission_missing", "permission_missing", "revoked", "invalid_proof", "expired"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
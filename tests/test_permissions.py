@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.permissions import PermissionIndex
+
+
+def _linear_allows(permissions, action, resource):
+    for p_action, p_resource in permissions:
+        if p_action == action:
+            if p_resource == resource:
+                return True
+            if p_resource.endswith("/") and resource.startswith(p_resource):
+                return True
+            if p_resource == "/":
+                return True
+    return False
+
+
+class PermissionIndexTests(unittest.TestCase):
+    def test_hierarchical_semantics(self) -> None:
+        index = PermissionIndex({("read", "/data/"), ("read", "/docs/a.txt"), ("write", "/")})
+        self.assertTrue(index.allows("read", "/data/photos/1.jpg"))
+        self.assertTrue(index.allows("read", "/data/"))
+        self.assertFalse(index.allows("read", "/data"))
+        self.assertFalse(index.allows("read", "/database/x"))
+        self.assertTrue(index.allows("read", "/docs/a.txt"))
+        self.assertFalse(index.allows("read", "/docs/a.txt/more"))
+        self.assertTrue(index.allows("write", "anything"))
+        self.assertFalse(index.allows("delete", "/data/x"))
+
+    def test_matches_linear_scan(self) -> None:
+        rng = random.Random(7)
+        segments = ["", "a", "b", "data", "x"]
+
+        def path(depth):
+            return "/".join(rng.choice(segments) for _ in range(depth))
+
+        for _ in range(200):
+            perms = set()
+            for _ in range(rng.randint(1, 6)):
+                resource = path(rng.randint(1, 4))
+                if rng.random() < 0.5:
+                    resource += "/"
+                perms.add((rng.choice(["read", "write"]), resource))
+            index = PermissionIndex(perms)
+            for _ in range(20):
+                action = rng.choice(["read", "write"])
+                resource = path(rng.randint(1, 5))
+                self.assertEqual(
+                    index.allows(action, resource),
+                    _linear_allows(perms, action, resource),
+                    (perms, action, resource),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
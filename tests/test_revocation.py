@@ -0,0 +1,111 @@
+import os
+import sys
+import threading
+import unittest
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.bloom import BloomFilter
+from proxion_core.revocation import RevocationList
+
+
+class RevocationListTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = datetime.now(timezone.utc)
+
+    def test_purge_only_removes_expired(self) -> None:
+        revocations = RevocationList(shards=4)
+        for i in range(20):
+            revocations.revoke(f"id-{i}", self.now, ttl_seconds=i + 1)
+        removed = revocations.purge(self.now + timedelta(seconds=10))
+        self.assertEqual(removed, 10)
+        self.assertEqual(len(revocations), 10)
+        self.assertFalse(revocations.is_revoked("id-0", self.now))
+        self.assertTrue(revocations.is_revoked("id-19", self.now))
+
+    def test_rerevocation_keeps_latest_expiry(self) -> None:
+        revocations = RevocationList()
+        revocations.revoke("id", self.now, ttl_seconds=5)
+        revocations.revoke("id", self.now, ttl_seconds=60)
+        self.assertEqual(revocations.purge(self.now + timedelta(seconds=10)), 0)
+        self.assertTrue(revocations.is_revoked("id", self.now + timedelta(seconds=10)))
+        self.assertEqual(revocations.purge(self.now + timedelta(seconds=61)), 1)
+
+    def test_expired_entry_not_revoked_before_purge(self) -> None:
+        revocations = RevocationList()
+        revocations.revoke("id", self.now, ttl_seconds=1)
+        later = self.now + timedelta(seconds=2)
+        self.assertFalse(revocations.is_revoked("id", later))
+        self.assertEqual(revocations.is_revoked_many([("id", self.now), ("id", later)]), [True, False])
+
+    def test_concurrent_revoke_and_read(self) -> None:
+        revocations = RevocationList(shards=8)
+        errors = []
+
+        def writer(offset: int) -> None:
+            for i in range(500):
+                revocations.revoke(f"w{offset}-{i}", self.now, ttl_seconds=60)
+
+        def reader() -> None:
+            for i in range(2000):
+                if revocations.is_revoked(f"absent-{i}", self.now):
+                    errors.append(i)
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+        threads += [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(revocations), 2000)
+
+
+class PrefilterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = datetime.now(timezone.utc)
+
+    def test_bloom_has_no_false_negatives_and_bounded_fp(self) -> None:
+        bloom = BloomFilter(capacity=2000, fp_rate=0.01)
+        for i in range(2000):
+            bloom.add(f"in-{i}")
+        self.assertTrue(all(f"in-{i}" in bloom for i in range(2000)))
+        false_positives = sum(f"out-{i}" in bloom for i in range(20000))
+        self.assertLess(false_positives / 20000, 0.03)
+        self.assertAlmostEqual(bloom.false_positive_rate(), 0.01, delta=0.005)
+
+    def test_bloom_round_trip(self) -> None:
+        bloom = BloomFilter(capacity=100, fp_rate=0.001)
+        bloom.add("revoked")
+        restored = BloomFilter.from_bytes(bloom.to_bytes())
+        self.assertIn("revoked", restored)
+        self.assertEqual(restored.size_bytes, bloom.size_bytes)
+        with self.assertRaises(ValueError):
+            BloomFilter.from_bytes(b"junk")
+
+    def test_bloom_hash_count_fits_header(self) -> None:
+        self.assertEqual(BloomFilter(capacity=10, fp_rate=2.0 ** -250).hash_count, 250)
+        with self.assertRaises(ValueError):
+            BloomFilter(capacity=10, fp_rate=1e-80)
+
+    def test_prefiltered_list_answers_like_plain_list(self) -> None:
+        revocations = RevocationList(prefilter_capacity=8)
+        for i in range(50):
+            revocations.revoke(f"id-{i}", self.now, ttl_seconds=i + 1)
+        self.assertTrue(all(revocations.is_revoked(f"id-{i}", self.now) for i in range(50)))
+        self.assertFalse(revocations.is_revoked("absent", self.now))
+        self.assertGreaterEqual(revocations.prefilter.size_bytes, 1)
+        revocations.purge(self.now + timedelta(seconds=45))
+        self.assertEqual(len(revocations.prefilter), 5)
+        self.assertTrue(revocations.is_revoked("id-49", self.now))
+
+    def test_exported_prefilter_matches_revocation_ids(self) -> None:
+        revocations = RevocationList(prefilter_capacity=100)
+        token_id = revocations.revoke("some-token", self.now, ttl_seconds=60)
+        edge = BloomFilter.from_bytes(revocations.export_prefilter())
+        self.assertIn(token_id, edge)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.context import RequestContext
+from proxion_core.revocation_store import FileRevocationList, fcntl
+from proxion_core.tokens import issue_token
+from proxion_core.validator import validate_request
+
+
+class FileRevocationListTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "revocations")
+        self.now = datetime.now(timezone.utc)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_revocations_visible_across_instances(self) -> None:
+        with FileRevocationList(self.path) as writer, FileRevocationList(self.path) as reader:
+            writer.revoke("token-a", self.now, ttl_seconds=60)
+            self.assertTrue(reader.is_revoked("token-a", self.now))
+            self.assertFalse(reader.is_revoked("token-b", self.now))
+            reader.revoke("token-b", self.now, ttl_seconds=60)
+            self.assertEqual(writer.is_revoked_many([("token-a", self.now), ("token-b", self.now)]), [True, True])
+
+    def test_purge_compacts_and_survives_reopen(self) -> None:
+        with FileRevocationList(self.path) as store, FileRevocationList(self.path) as other:
+            for i in range(40):
+                store.revoke(f"id-{i}", self.now, ttl_seconds=i + 1)
+            self.assertEqual(store.purge(self.now + timedelta(seconds=30)), 30)
+            self.assertEqual(len(other), 10)
+            self.assertTrue(other.is_revoked("id-39", self.now))
+            self.assertFalse(other.is_revoked("id-0", self.now))
+            other.revoke("late", self.now, ttl_seconds=60)
+        with FileRevocationList(self.path) as reopened:
+            self.assertTrue(reopened.is_revoked("late", self.now))
+            self.assertTrue(reopened.is_revoked("id-35", self.now))
+            self.assertEqual(len(reopened), 11)
+
+    def test_auto_compaction(self) -> None:
+        with FileRevocationList(self.path, compact_after=8) as store:
+            for i in range(20):
+                store.revoke(f"id-{i}", self.now, ttl_seconds=60)
+            self.assertTrue(all(store.is_revoked(f"id-{i}", self.now) for i in range(20)))
+            self.assertEqual(len(store), 20)
+
+    @unittest.skipUnless(hasattr(os, "fork") and fcntl is not None, "needs fork and flock")
+    def test_forked_child_takes_its_own_file_lock(self) -> None:
+        store = FileRevocationList(self.path)
+        ready_r, ready_w = os.pipe()
+        done_r, done_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - child
+            try:
+                store.is_revoked("warm-up", self.now)
+                with store._file_lock(exclusive=True):
+                    os.write(ready_w, b"x")
+                    os.read(done_r, 1)
+            finally:
+                os._exit(0)
+        try:
+            os.read(ready_r, 1)
+            with self.assertRaises(BlockingIOError):
+                fcntl.flock(store._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        finally:
+            os.write(done_w, b"x")
+            os.waitpid(pid, 0)
+            for fd in (ready_r, ready_w, done_r, done_w):
+                os.close(fd)
+            store.close()
+
+    @unittest.skipUnless(hasattr(os, "fork") and fcntl is not None, "needs fork and flock")
+    def test_forked_revocations_survive_concurrent_purge(self) -> None:
+        store = FileRevocationList(self.path)
+        count = 300
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - child
+            code = 1
+            try:
+                for i in range(count):
+                    store.revoke(f"child-{i}", self.now, ttl_seconds=3600)
+                code = 0
+            finally:
+                os._exit(code)
+        try:
+            while True:
+                done, status = os.waitpid(pid, os.WNOHANG)
+                if done:
+                    break
+                store.purge(self.now)
+        finally:
+            store.close()
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        with FileRevocationList(self.path) as reopened:
+            missing = [i for i in range(count) if not reopened.is_revoked(f"child-{i}", self.now)]
+        self.assertEqual(missing, [])
+
+    def test_validator_uses_file_store(self) -> None:
+        signing_key = b"test-key"
+        token = issue_token(
+            permissions={("read", "resource")},
+            exp=self.now + timedelta(minutes=5),
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=signing_key,
+            now=self.now,
+        )
+        ctx = RequestContext("read", "resource", "aud1", self.now)
+        with FileRevocationList(self.path) as store:
+            store.revoke(token, self.now)
+            decision = validate_request(token, ctx, {"holder_key_fingerprint": "fp1"}, signing_key, store)
+        self.assertEqual(decision.reason, "revoked")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+
+jwt = pytest.importorskip("jwt")
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core import serialization
+from proxion_core.serialization import BatchResult, TokenSerializer
+from proxion_core.tokens import issue_token
+
+
+class _Unserializable:
+    """Token stand-in whose payload JSON encoding fails inside the worker."""
+
+    token_id = "unserializable"
+    exp = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    def payload(self) -> dict:
+        return {"token_id": self.token_id, "extra": {"not", "json"}}
+
+
+class _Broken:
+    token_id = "broken"
+    exp = datetime.now(timezone.utc) + timedelta(minutes=5)
+
+    def payload(self) -> dict:
+        raise RuntimeError("no payload")
+
+
+class BatchSerializationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.private_key = Ed25519PrivateKey.generate()
+        self.public_key = self.private_key.public_key()
+        self.serializer = TokenSerializer("issuer.example")
+        self.now = datetime.now(timezone.utc)
+        serialization._KEY_CACHE.clear()
+
+    def _token(self, resource: str = "/data/", now: Optional[datetime] = None):
+        now = now or self.now
+        return issue_token(
+            permissions={("read", resource)},
+            exp=now + timedelta(minutes=5),
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=b"hmac-key",
+            now=now,
+        )
+
+    def _sign(self, *resources: str) -> list:
+        tokens = [self._token(resource) for resource in resources]
+        return [result.value for result in self.serializer.sign_batch(tokens, self.private_key)]
+
+    def test_real_token_round_trip(self) -> None:
+        token = self._token()
+        claims = self.serializer.verify(self.serializer.sign(token, self.private_key), self.public_key)
+        self.assertEqual(claims["exp"], int(token.exp.timestamp()))
+        self.assertEqual((claims["jti"], claims["aud"]), (token.token_id, "aud1"))
+
+    def test_sign_batch_reports_errors_per_item(self) -> None:
+        good = self._token("/a/")
+        last = self._token("/b/")
+        results = self.serializer.sign_batch(
+            [good, _Broken(), _Unserializable(), last], self.private_key, chunk_size=2
+        )
+        self.assertEqual([result.ok for result in results], [True, False, False, True])
+        self.assertTrue(results[1].error.startswith("RuntimeError: "))
+        self.assertTrue(results[2].error.startswith("TypeError: "))
+        self.assertIsNone(results[1].value)
+        claims = self.serializer.verify(results[3].value, self.public_key)
+        self.assertEqual((claims["jti"], claims["iss"]), (last.token_id, "issuer.example"))
+
+    def test_verify_batch_mixed_valid_and_invalid(self) -> None:
+        good, other = self._sign("/good/", "/other/")
+        header, _, signature = good.split(".")
+        tampered = ".".join((header, other.split(".")[1], signature))
+        expired = self.serializer.sign(
+            self._token(now=self.now - timedelta(minutes=10)), self.private_key
+        )
+        results = self.serializer.verify_batch(
+            [good, tampered, expired, "not-a-jwt", other], self.public_key, chunk_size=2
+        )
+        self.assertEqual([result.ok for result in results], [True, False, False, False, True])
+        self.assertEqual(results[0].value["permissions"], [["read", "/good/"]])
+        self.assertEqual(results[4].value["permissions"], [["read", "/other/"]])
+        self.assertTrue(results[1].error.startswith("InvalidSignatureError: "))
+        self.assertTrue(results[2].error.startswith("ExpiredSignatureError: "))
+        self.assertTrue(results[3].error.startswith("DecodeError: "))
+        self.assertEqual(results[1], BatchResult(error=results[1].error))
+
+    def test_key_cache_reused_across_chunks_and_calls(self) -> None:
+        tokens = self._sign("/a/", "/b/", "/c/")
+        self.assertEqual(len(serialization._KEY_CACHE), 1)
+        self.serializer.verify_batch(tokens, self.public_key, chunk_size=1)
+        self.assertEqual(len(serialization._KEY_CACHE), 2)
+        material = serialization._key_material(self.public_key)
+        prepared = serialization._KEY_CACHE[material]
+        results = self.serializer.verify_batch(tokens, self.public_key, chunk_size=1)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertIs(serialization._KEY_CACHE[material], prepared)
+        self.assertEqual(len(serialization._KEY_CACHE), 2)
+
+    def test_key_cache_is_bounded(self) -> None:
+        for _ in range(serialization._KEY_CACHE_LIMIT + 1):
+            serialization._prepared_key(
+                serialization._key_material(Ed25519PrivateKey.generate().public_key())
+            )
+        self.assertLessEqual(len(serialization._KEY_CACHE), serialization._KEY_CACHE_LIMIT)
+
+    def test_process_pool_preserves_order(self) -> None:
+        tokens = [self._token(f"/t{i}/") for i in range(10)]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            signed = self.serializer.sign_batch(tokens, self.private_key, executor=executor, chunk_size=3)
+            verified = self.serializer.verify_batch(
+                [result.value for result in signed], self.public_key, executor=executor, chunk_size=3
+            )
+        self.assertEqual([result.value["jti"] for result in verified], [t.token_id for t in tokens])
+
+    def test_chunk_size_must_be_positive(self) -> None:
+        with self.assertRaises(ValueError):
+            self.serializer.verify_batch([], self.public_key, chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from proxion_core.errors import TicketError
+from proxion_core.ticket_store import SQLiteTicketStore
+from proxion_core.tickets import mint_ticket, redeem_ticket, set_ticket_store, sweep_tickets
+
+
+def _redeem_all(path, ticket_ids, results):
+    now = datetime.now(timezone.utc)
+    won = 0
+    with SQLiteTicketStore(path) as store:
+        for ticket_id in ticket_ids:
+            try:
+                won += store.redeem(ticket_id, f"rp-{os.getpid()}", now)
+            except TicketError:
+                pass
+    results.put(won)
+
+
+class SQLiteTicketStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tickets.db")
+        self.now = datetime.now(timezone.utc)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_redeem_once_with_reasons(self) -> None:
+        with SQLiteTicketStore(self.path) as store, SQLiteTicketStore(self.path) as other:
+            ticket = store.mint(30, now=self.now)
+            self.assertTrue(other.redeem(ticket.ticket_id, "rp_key", self.now))
+            with self.assertRaisesRegex(TicketError, "already redeemed"):
+                store.redeem(ticket.ticket_id, "rp_key", self.now)
+            with self.assertRaisesRegex(TicketError, "not found"):
+                store.redeem("missing", "rp_key", self.now)
+            late = store.mint(1, now=self.now)
+            with self.assertRaisesRegex(TicketError, "expired"):
+                store.redeem(late.ticket_id, "rp_key", self.now + timedelta(seconds=1))
+
+    def test_mint_many_and_sweep(self) -> None:
+        with SQLiteTicketStore(self.path) as store:
+            short = store.mint_many(50, 10, now=self.now)
+            store.mint_many(5, 3600, now=self.now)
+            self.assertEqual(len({t.ticket_id for t in short}), 50)
+            store.redeem(short[0].ticket_id, "rp_key", self.now)
+            self.assertEqual(store.sweep(self.now), 0)
+            later = self.now + timedelta(seconds=11)
+            self.assertEqual(store.sweep(later, limit=20), 20)
+            self.assertEqual(store.sweep(later), 30)
+            self.assertEqual(len(store), 5)
+
+    def test_concurrent_threads_redeem_once(self) -> None:
+        with SQLiteTicketStore(self.path) as store:
+            ticket = store.mint(30, now=self.now)
+            wins = []
+
+            def worker() -> None:
+                try:
+                    wins.append(store.redeem(ticket.ticket_id, "rp_key", self.now))
+                except TicketError:
+                    pass
+
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(wins, [True])
+
+    def test_processes_redeem_each_ticket_once(self) -> None:
+        with SQLiteTicketStore(self.path) as store:
+            ids = [t.ticket_id for t in store.mint_many(200, 60)]
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        workers = [ctx.Process(target=_redeem_all, args=(self.path, ids, results)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        total = sum(results.get(timeout=60) for _ in workers)
+        for worker in workers:
+            worker.join()
+        self.assertEqual(total, 200)
+
+    def test_close_fails_cleanly_in_other_threads(self) -> None:
+        store = SQLiteTicketStore(self.path)
+        ticket = store.mint(30, now=self.now)
+        connected = threading.Event()
+        closed = threading.Event()
+        errors = []
+
+        def worker() -> None:
+            store._connection()
+            connected.set()
+            closed.wait(10)
+            try:
+                store.redeem(ticket.ticket_id, "rp_key", self.now)
+            except Exception as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        connected.wait(10)
+        store.close()
+        closed.set()
+        thread.join()
+        self.assertEqual([(type(e), str(e)) for e in errors], [(TicketError, "ticket store is closed")])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_forked_child_opens_its_own_connection(self) -> None:
+        with SQLiteTicketStore(self.path) as store:
+            first, second = store.mint_many(2, 60, now=self.now)
+            parent_conn = store._connection()
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover - child
+                code = 1
+                try:
+                    if store._connection() is not parent_conn:
+                        code = 0 if store.redeem(first.ticket_id, "rp-child", self.now) else 2
+                finally:
+                    os._exit(code)
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+            self.assertIs(store._connection(), parent_conn)
+            with self.assertRaisesRegex(TicketError, "already redeemed"):
+                store.redeem(first.ticket_id, "rp-parent", self.now)
+            self.assertTrue(store.redeem(second.ticket_id, "rp-parent", self.now))
+
+    def test_module_functions_use_configured_store(self) -> None:
+        with SQLiteTicketStore(self.path) as store:
+            previous = set_ticket_store(store)
+            try:
+                ticket = mint_ticket(1)
+                self.assertEqual(len(store), 1)
+                self.assertTrue(redeem_ticket(ticket.ticket_id, "rp_key", self.now))
+                self.assertEqual(sweep_tickets(ticket.expires_at), 1)
+            finally:
+                set_ticket_store(previous)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,15 @@ from datetime import datetime, timezone, timedelta
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
 
 from proxion_core.errors import TicketError
-from proxion_core.tickets import mint_ticket, redeem_ticket
+from proxion_core.tickets import (
+    MemoryTicketStore,
+    TicketBatch,
+    mint_ticket,
+    mint_tickets,
+    redeem_ticket,
+    set_ticket_store,
+    stream_tickets,
+)
 from proxion_core.validator import Decision
 
 
@@ -33,6 +41,66 @@ class TicketTests(unittest.TestCase):
         decision = _redeem_decision(ticket.ticket_id, "rp_key", expired_at)
         self.assertFalse(decision.allowed)
 
+    def test_sweep_reclaims_expired_and_redeemed(self) -> None:
+        store = MemoryTicketStore(shards=4)
+        now = datetime.now(timezone.utc)
+        short = [store.mint(10, now=now) for _ in range(5)]
+        store.mint(3600, now=now)
+        store.redeem(short[0].ticket_id, "rp_key", now)
+        self.assertEqual(store.sweep(now), 0)
+        self.assertEqual(store.sweep(now + timedelta(seconds=11)), 5)
+        self.assertEqual(len(store), 1)
+
+    def test_rejects_non_positive_shards(self) -> None:
+        with self.assertRaises(ValueError):
+            MemoryTicketStore(shards=0)
+
+    def test_mint_sweeps_incrementally(self) -> None:
+        store = MemoryTicketStore(shards=1)
+        now = datetime.now(timezone.utc)
+        for _ in range(10):
+            store.mint(1, now=now)
+        later = now + timedelta(seconds=2)
+        for _ in range(3):
+            store.mint(3600, now=later)
+        self.assertEqual(len(store), 3)
+
+
+class BulkMintTests(unittest.TestCase):
+    def test_mint_many_is_redeemable(self) -> None:
+        store = MemoryTicketStore(shards=4)
+        now = datetime.now(timezone.utc)
+        batch = store.mint_many(1000, 30, now=now)
+        self.assertIsInstance(batch, TicketBatch)
+        self.assertEqual(len(batch), 1000)
+        self.assertEqual(len(store), 1000)
+        ids = list(batch.ticket_ids())
+        self.assertEqual(len(set(ids)), 1000)
+        self.assertTrue(all(len(ticket_id) == 32 for ticket_id in ids))
+        self.assertEqual(batch[-1].ticket_id, ids[-1])
+        self.assertEqual(batch[-1].expires_at, now + timedelta(seconds=30))
+        self.assertEqual(list(batch[10:20].ticket_ids()), ids[10:20])
+        self.assertEqual([t.ticket_id for t in batch[::250]], ids[::250])
+        self.assertTrue(store.redeem(batch[3].ticket_id, "rp_key", now))
+        with self.assertRaises(TicketError):
+            store.redeem(batch[3].ticket_id, "rp_key", now)
+        self.assertEqual(store.sweep(now + timedelta(seconds=31)), 1000)
+
+    def test_module_level_batch_and_stream(self) -> None:
+        store = MemoryTicketStore()
+        previous = set_ticket_store(store)
+        try:
+            self.assertEqual(len(mint_tickets(10, 30)), 10)
+            stream = stream_tickets(25, 30, chunk_size=10)
+            first = next(stream)
+            self.assertEqual(len(store), 20)
+            rest = list(stream)
+            self.assertEqual(len(rest), 24)
+            self.assertEqual(len(store), 35)
+            self.assertTrue(redeem_ticket(first.ticket_id, "rp_key", datetime.now(timezone.utc)))
+        finally:
+            set_ticket_store(previous)
+
 
 if __name__ == "__main__":
     unittest.main()
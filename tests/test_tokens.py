@@ -7,7 +7,16 @@ from dataclasses import replace
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
 
 from proxion_core.context import Caveat, RequestContext
-from proxion_core.tokens import issue_token
+from proxion_core.attenuation import derive_token
+from proxion_core.caveats import nonce_matches
+from proxion_core.tokens import (
+    ALG_HMAC_SHA256_BINARY,
+    _canonical_json,
+    decode_token,
+    encode_token,
+    issue_token,
+    token_canonical_bytes,
+)
 from proxion_core.validator import validate_request
 
 
@@ -61,6 +70,59 @@ class TokenTests(unittest.TestCase):
         decision = validate_request(bad, ctx, {"holder_key_fingerprint": "fp1"}, self.signing_key)
         self.assertFalse(decision.allowed)
 
+    def test_canonical_bytes_seeded_and_memoized(self) -> None:
+        expected = _canonical_json(self.token.payload())
+        self.assertEqual(self.token.canonical_bytes(), expected)
+        self.assertIs(token_canonical_bytes(self.token), self.token.canonical_bytes())
+        self.assertIs(self.token.revocation_id(), self.token.revocation_id())
+
+    def test_replace_drops_memoized_values(self) -> None:
+        narrowed = replace(self.token, permissions=frozenset({("write", "resource")}))
+        self.assertNotEqual(narrowed.canonical_bytes(), self.token.canonical_bytes())
+        self.assertNotEqual(narrowed.revocation_id(), self.token.revocation_id())
+
+
+class TokenMemoryTests(unittest.TestCase):
+    def _issue(self, resource: str, caveats=()):
+        now = datetime.now(timezone.utc)
+        return issue_token(
+            permissions={("read", resource), ("write", resource)},
+            exp=now + timedelta(minutes=5),
+            aud="".join(["aud", "1"]),
+            caveats=list(caveats),
+            holder_key_fingerprint="fp1",
+            signing_key=b"test-key",
+            now=now,
+            alg=ALG_HMAC_SHA256_BINARY,
+        )
+
+    def test_tokens_are_slotted(self) -> None:
+        self.assertFalse(hasattr(self._issue("/data/"), "__dict__"))
+
+    def test_equal_grants_share_one_set_and_strings(self) -> None:
+        first = self._issue("/da" + "ta/")
+        second = self._issue("/dat" + "a/")
+        third = self._issue("/other/")
+        self.assertIs(first.permissions, second.permissions)
+        self.assertIsNot(first.permissions, third.permissions)
+        self.assertIs(first.aud, second.aud)
+        resources = {id(resource) for _, resource in first.permissions | second.permissions}
+        self.assertEqual(len(resources), 1)
+
+    def test_decoded_tokens_share_caveats(self) -> None:
+        token = self._issue("/data/", [nonce_matches("n1")])
+        first = decode_token(encode_token(token))
+        second = decode_token(encode_token(token))
+        self.assertIs(first.caveats, second.caveats)
+        self.assertIs(first.permissions, token.permissions)
+
+    def test_derived_token_shares_parent_caveats(self) -> None:
+        parent = self._issue("/data/", [nonce_matches("n1")])
+        child = derive_token(
+            parent, {("read", "/data/")}, [], datetime.now(timezone.utc), b"test-key"
+        )
+        self.assertIs(child.caveats, parent.caveats)
+
 
 if __name__ == "__main__":
     unittest.main()
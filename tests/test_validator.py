@@ -7,8 +7,16 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..",
 
 from proxion_core.context import RequestContext
 from proxion_core.revocation import RevocationList
-from proxion_core.tokens import issue_token
-from proxion_core.validator import validate_request
+from proxion_core.cache import VerifiedTokenCache
+from proxion_core.tokens import ALG_HMAC_SHA256_BINARY, decode_token, encode_token, issue_token
+from proxion_core.validator import (
+    DEFAULT_PIPELINE,
+    LEGACY_PIPELINE,
+    ValidationPipeline,
+    _deny,
+    validate_many,
+    validate_request,
+)
 
 
 class ValidatorTests(unittest.TestCase):
@@ -132,6 +140,153 @@ class ValidatorTests(unittest.TestCase):
         )
         self.assertFalse(decision.allowed)
 
+    def test_validate_many_matches_validate_request(self) -> None:
+        signing_key = b"test-key"
+        now = datetime.now(timezone.utc)
+        exp = now + timedelta(minutes=5)
+
+        def issue(resource):
+            return issue_token(
+                permissions={("read", resource)},
+                exp=exp,
+                aud="aud1",
+                caveats=[],
+                holder_key_fingerprint="fp1",
+                signing_key=signing_key,
+                now=now,
+            )
+
+        shared, revoked = issue("resource"), issue("other")
+        revocations = RevocationList()
+        revocations.revoke(revoked, now)
+
+        class MalformedToken:
+            pass
+
+        proof = {"holder_key_fingerprint": "fp1"}
+        requests = [
+            (shared, RequestContext("read", "resource", "aud1", now), proof),
+            (shared, RequestContext("write", "resource", "aud1", now), proof),
+            (shared, RequestContext("read", "resource", "aud2", now), proof),
+            (shared, RequestContext("read", "resource", "aud1", exp), proof),
+            (revoked, RequestContext("read", "other", "aud1", now), proof),
+            (MalformedToken(), RequestContext("read", "resource", "aud1", now), proof),
+            (shared, RequestContext("read", "resource", "aud1", now), None),
+        ]
+        expected = [
+            validate_request(t, c, p, signing_key, revocation_list=revocations) for t, c, p in requests
+        ]
+        decisions = validate_many(requests, signing_key, revocation_list=revocations)
+        self.assertEqual(decisions, expected)
+        self.assertEqual(
+            [d.reason for d in decisions],
+            [None, "permission_missing", "audience_mismatch", "expired", "revoked",
+             "error", "invalid_proof"],
+        )
+
+
+    def test_validate_many_verifies_equal_tokens_once(self) -> None:
+        signing_key = b"test-key"
+        now = datetime.now(timezone.utc)
+        token = issue_token(
+            permissions={("read", "resource")},
+            exp=now + timedelta(minutes=5),
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=signing_key,
+            now=now,
+            alg=ALG_HMAC_SHA256_BINARY,
+        )
+        data = encode_token(token)
+        first, second = decode_token(data), decode_token(data)
+        self.assertIsNot(first, second)
+
+        class CountingCache(VerifiedTokenCache):
+            calls = 0
+
+            def verify(self, token, signing_key, now):
+                CountingCache.calls += 1
+                return super().verify(token, signing_key, now)
+
+        proof = {"holder_key_fingerprint": "fp1"}
+        requests = [
+            (first, RequestContext("read", "resource", "aud1", now), proof),
+            (second, RequestContext("read", "resource", "aud1", now), proof),
+        ]
+        decisions = validate_many(
+            requests, signing_key, revocation_list=RevocationList(), integrity_cache=CountingCache()
+        )
+        self.assertTrue(all(d.allowed for d in decisions))
+        self.assertEqual(CountingCache.calls, 1)
+
+
+class ValidationPipelineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.signing_key = b"test-key"
+        self.now = datetime.now(timezone.utc)
+        self.exp = self.now + timedelta(minutes=5)
+        self.token = issue_token(
+            permissions={("read", "resource")},
+            exp=self.exp,
+            aud="aud1",
+            caveats=[],
+            holder_key_fingerprint="fp1",
+            signing_key=self.signing_key,
+            now=self.now,
+        )
+        self.proof = {"holder_key_fingerprint": "fp1"}
+
+    def test_cheap_checks_run_before_crypto(self) -> None:
+        # A wrong key would fail integrity; the default order never gets there.
+        for ctx, reason in (
+            (RequestContext("read", "resource", "aud1", self.exp), "expired"),
+            (RequestContext("read", "resource", "aud2", self.now), "audience_mismatch"),
+            (RequestContext("write", "resource", "aud1", self.now), "permission_missing"),
+        ):
+            self.assertEqual(validate_request(self.token, ctx, self.proof, b"wrong").reason, reason)
+            legacy = validate_request(self.token, ctx, self.proof, b"wrong", pipeline=LEGACY_PIPELINE)
+            self.assertEqual(legacy.reason, "error")
+
+        class CountingRevocations(RevocationList):
+            calls = 0
+
+            def is_revoked(self, token, now):
+                CountingRevocations.calls += 1
+                return super().is_revoked(token, now)
+
+        expired = RequestContext("read", "resource", "aud1", self.exp)
+        validate_request(self.token, expired, self.proof, self.signing_key, CountingRevocations())
+        self.assertEqual(CountingRevocations.calls, 0)
+
+    def test_reorder_and_custom_stages(self) -> None:
+        def business_hours(token, ctx, proof, env):
+            return _deny("outside_hours") if ctx.method == "night" else None
+
+        pipeline = DEFAULT_PIPELINE.with_stage("business_hours", business_hours, before="integrity")
+        self.assertEqual(pipeline.names.index("business_hours"), pipeline.names.index("integrity") - 1)
+        ctx = RequestContext("read", "resource", "aud1", self.now, method="night")
+        self.assertEqual(
+            validate_request(self.token, ctx, self.proof, b"wrong", pipeline=pipeline).reason,
+            "outside_hours",
+        )
+        reordered = pipeline.reordered(("integrity",) + tuple(n for n in pipeline.names if n != "integrity"))
+        self.assertEqual(
+            validate_request(self.token, ctx, self.proof, b"wrong", pipeline=reordered).reason, "error"
+        )
+        decisions = validate_many([(self.token, ctx, self.proof)] * 2, self.signing_key, pipeline=pipeline)
+        self.assertEqual([d.reason for d in decisions], ["outside_hours"] * 2)
+
+    def test_builtin_stages_are_required(self) -> None:
+        with self.assertRaises(ValueError):
+            ValidationPipeline.from_names(["expiry", "audience", "permission", "proof", "caveats"])
+        with self.assertRaises(ValueError):
+            DEFAULT_PIPELINE.reordered(["expiry"])
+
+    def test_from_names_rejects_unknown_stage(self) -> None:
+        with self.assertRaisesRegex(ValueError, "unknown stage: expirey"):
+            ValidationPipeline.from_names(["expirey"] + list(DEFAULT_PIPELINE.names))
+
 
 if __name__ == "__main__":
     unittest.main()